@@ -1,6 +1,17 @@
+import click
 from flask import Flask
 from .config import Config
 from .extensions import jwt, cors, db, migrate, socketio
+from .utils.auth_utils import membership_cache
+from .utils.analytics_utils import analytics_cache
+from .utils.leaderboard_utils import leaderboard_cache
+from .utils.badge_utils import badge_catalog_cache
+from .utils.db_utils import group_commit
+from .utils.notification_utils import notification_dispatcher
+from .utils.presence_utils import presence
+from .utils.scheduler_utils import scheduler
+from .utils.typing_utils import typing_aggregator
+from .utils.message_queue_utils import LocalBrokerManager, run_local_broker
 
 
 def create_app():
@@ -26,6 +37,33 @@ def create_app():
     )
     db.init_app(app)
     migrate.init_app(app, db)
+    membership_cache.configure(
+        app.config["MEMBERSHIP_CACHE_SIZE"], app.config["MEMBERSHIP_CACHE_TTL"]
+    )
+    analytics_cache.configure(
+        app.config["ANALYTICS_CACHE_SIZE"], app.config["ANALYTICS_CACHE_TTL"]
+    )
+    leaderboard_cache.configure(
+        app.config["LEADERBOARD_CACHE_SIZE"], app.config["LEADERBOARD_CACHE_TTL"]
+    )
+    badge_catalog_cache.configure(1, app.config["BADGE_CATALOG_TTL"])
+    notification_dispatcher.init_app(app)
+    presence.init_app(app)
+    typing_aggregator.init_app(app)
+    group_commit.init_app(app)
+    scheduler.init_app(app)
+
+    # Emits go through the message queue so every worker reaches its own rooms
+    message_queue = app.config["SOCKETIO_MESSAGE_QUEUE"]
+    queue_options = {}
+    if message_queue and message_queue.startswith("local://"):
+        queue_options["client_manager"] = LocalBrokerManager(
+            message_queue, channel=app.config["SOCKETIO_CHANNEL"]
+        )
+    elif message_queue:
+        queue_options["message_queue"] = message_queue
+        queue_options["channel"] = app.config["SOCKETIO_CHANNEL"]
+
     socketio.init_app(
         app,
         cors_allowed_origins=app.config["CORS_ORIGINS"],
@@ -33,6 +71,7 @@ def create_app():
         ping_interval=app.config["SOCKETIO_PING_INTERVAL"],
         logger=app.config["SOCKETIO_LOGGER"],
         engineio_logger=app.config["SOCKETIO_ENGINEIO_LOGGER"],
+        **queue_options,
     )
 
     # Register blueprints
@@ -45,6 +84,7 @@ def create_app():
     from .routes.household_routes import household_bp
     from .routes.notification_routes import notification_bp
     from .routes.poll_routes import poll_bp
+    from .routes.admin_routes import admin_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(chat_bp)
@@ -55,6 +95,7 @@ def create_app():
     app.register_blueprint(household_bp)
     app.register_blueprint(notification_bp)
     app.register_blueprint(poll_bp)
+    app.register_blueprint(admin_bp)
 
     # Setup JWT error handlers and loaders
     @jwt.user_identity_loader
@@ -72,6 +113,54 @@ def create_app():
     def expired_token_callback(jwt_header, jwt_payload):
         return {"error": "Token has expired"}, 401
 
+    # Maintenance commands
+    @app.cli.command("backfill-streaks")
+    def backfill_streaks_command():
+        """Rebuild user streak state from completed tasks."""
+        from .utils.streak_utils import backfill_streaks
+
+        print(f"Backfilled streak state for {backfill_streaks()} users")
+
+    @app.cli.command("recount-open-tasks")
+    def recount_open_tasks_command():
+        """Recompute every member's open task count used by auto-assignment."""
+        from .utils.assignment_utils import recount_open_tasks
+
+        updated = recount_open_tasks()
+        db.session.commit()
+        print(f"Recounted open tasks for {updated} memberships")
+
+    @app.cli.command("dispatch-notifications")
+    def dispatch_notifications_command():
+        """Deliver every queued notification outbox entry."""
+        print(f"Dispatched {notification_dispatcher.drain()} outbox entries")
+
+    @app.cli.command("run-job")
+    @click.argument("name", type=click.Choice(sorted(scheduler.jobs)))
+    def run_job_command(name):
+        """Run a scheduled job now, unless another process holds its lease."""
+        rows = scheduler.run_job(name, force=True)
+        if rows is None:
+            print(f"{name} is leased by another process")
+        else:
+            print(f"{name} touched {rows} rows")
+
+    @app.cli.command("rebuild-message-search")
+    def rebuild_message_search_command():
+        """Rebuild the chat search index, e.g. after VACUUM."""
+        from .utils.message_utils import rebuild_message_search
+
+        rebuild_message_search()
+        print("Rebuilt the chat message search index")
+
+    @app.cli.command("socketio-broker")
+    @click.option("--host", default="127.0.0.1")
+    @click.option("--port", default=5680)
+    def socketio_broker_command(host, port):
+        """Run the local Socket.IO message broker for development and tests."""
+        print(f"Relaying Socket.IO messages on local://{host}:{port}")
+        run_local_broker(host, port)
+
     # Setup database migration support
     with app.app_context():
         if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
@@ -9,12 +9,90 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///dev.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Disable overhead
 
+    # Household membership cache (entries per process, seconds before expiry).
+    # Changes are invalidated only in the worker that made them; other workers
+    # can act on a removed or demoted member's old role for up to the TTL.
+    MEMBERSHIP_CACHE_SIZE = int(os.getenv("MEMBERSHIP_CACHE_SIZE", 10000))
+    MEMBERSHIP_CACHE_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL", 30))
+
+    # Household analytics windows (days of daily completion history)
+    ANALYTICS_TREND_DAYS = int(os.getenv("ANALYTICS_TREND_DAYS", 10))
+    ANALYTICS_HEATMAP_DAYS = int(os.getenv("ANALYTICS_HEATMAP_DAYS", 30))
+    # Household-wide aggregates are cached per process (entries, seconds)
+    ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", 1024))
+    ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", 60))
+
+    # Leaderboard snapshots per process (entries, seconds before a forced refresh)
+    LEADERBOARD_CACHE_SIZE = int(os.getenv("LEADERBOARD_CACHE_SIZE", 1024))
+    LEADERBOARD_CACHE_TTL = int(os.getenv("LEADERBOARD_CACHE_TTL", 300))
+
+    # Badge catalog is cached per process; creating a badge refreshes it
+    BADGE_CATALOG_TTL = int(os.getenv("BADGE_CATALOG_TTL", 3600))
+
+    # Notification outbox workers (greenlets per process, entries per batch)
+    NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", 2))
+    NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", 100))
+    NOTIFICATION_POLL_INTERVAL = float(os.getenv("NOTIFICATION_POLL_INTERVAL", 1.0))
+    NOTIFICATION_LEASE_SECONDS = int(os.getenv("NOTIFICATION_LEASE_SECONDS", 60))
+    NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5))
+
+    # Socket presence: "memory" for one worker, "database" to share between workers
+    PRESENCE_BACKEND = os.getenv("PRESENCE_BACKEND", "memory")
+    PRESENCE_SERVER_ID = os.getenv("PRESENCE_SERVER_ID")  # Defaults to host:pid
+    PRESENCE_TTL = int(os.getenv("PRESENCE_TTL", 90))
+    PRESENCE_HEARTBEAT_INTERVAL = int(os.getenv("PRESENCE_HEARTBEAT_INTERVAL", 30))
+
+    # Group commit: how long the first chat message waits for others to share
+    # its transaction, the most messages committed together, and the batch
+    # size below which it does not wait at all
+    GROUP_COMMIT_DELAY_MS = float(os.getenv("GROUP_COMMIT_DELAY_MS", 5))
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", 50))
+    GROUP_COMMIT_WAIT_THRESHOLD = int(os.getenv("GROUP_COMMIT_WAIT_THRESHOLD", 16))
+
+    # Typing indicators: broadcast tick and how long a typing_start lasts
+    TYPING_TICK_INTERVAL = float(os.getenv("TYPING_TICK_INTERVAL", 0.3))
+    TYPING_TTL = float(os.getenv("TYPING_TTL", 5))
+
+    # Lists computed against the current time (overdue tasks, active polls)
+    # get new ETags at least this often, in seconds
+    ETAG_TIME_WINDOW = int(os.getenv("ETAG_TIME_WINDOW", 60))
+
+    # Scheduled jobs: enable the per-process scheduler, how long a lease on a
+    # job lasts, and how often each job runs, in seconds
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "True") == "True"
+    SCHEDULER_LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", 120))
+    JOB_RECURRING_TASKS_INTERVAL = int(os.getenv("JOB_RECURRING_TASKS_INTERVAL", 300))
+    JOB_OVERDUE_TASKS_INTERVAL = int(os.getenv("JOB_OVERDUE_TASKS_INTERVAL", 60))
+    JOB_CLOSED_POLLS_INTERVAL = int(os.getenv("JOB_CLOSED_POLLS_INTERVAL", 60))
+    JOB_NOTIFICATION_RETENTION_INTERVAL = int(
+        os.getenv("JOB_NOTIFICATION_RETENTION_INTERVAL", 3600)
+    )
+
+    # Read notifications are deleted after this many days
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 90))
+
+    # Recurring task occurrences get a task row this many hours before due
+    RECURRING_TASK_HORIZON_HOURS = float(os.getenv("RECURRING_TASK_HORIZON_HOURS", 24))
+
+    # Most task operations accepted by one bulk request
+    BULK_TASK_LIMIT = int(os.getenv("BULK_TASK_LIMIT", 2000))
+
+    # Auto-assignment counts a task a member likes as this many fewer open tasks
+    ASSIGNMENT_PREFERENCE_WEIGHT = int(os.getenv("ASSIGNMENT_PREFERENCE_WEIGHT", 1))
+
+    # Chat search ranks only this many of the newest matching messages
+    MESSAGE_SEARCH_WINDOW = int(os.getenv("MESSAGE_SEARCH_WINDOW", 500))
+
     # SocketIO configuration
     SOCKETIO_PING_TIMEOUT = int(os.getenv("SOCKETIO_PING_TIMEOUT", 20))
     SOCKETIO_PING_INTERVAL = int(os.getenv("SOCKETIO_PING_INTERVAL", 25))
     SOCKETIO_ASYNC_MODE = "gevent"
     SOCKETIO_LOGGER = DEBUG
     SOCKETIO_ENGINEIO_LOGGER = DEBUG
+    # Share rooms between worker processes, e.g. redis://localhost:6379/0, or
+    # local://127.0.0.1:5680 for the broker started by `flask socketio-broker`
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "flask-socketio")
 
     # Add JWT configuration for refresh tokens
     JWT_REFRESH_TOKEN_EXPIRES = int(
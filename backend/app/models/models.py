@@ -14,6 +14,12 @@ user_households = db.Table(
     ),
     db.Column("role", db.String(50)),  # 'admin' or 'member'
     db.Column("joined_at", db.DateTime, default=datetime.utcnow),
+    # Open tasks assigned to the member in the household; see assignment_utils
+    db.Column("open_tasks", db.Integer, nullable=False, default=0, server_default="0"),
+    # When the member last got a task; auto-assignment rotates from the oldest
+    db.Column("last_assigned_at", db.DateTime),
+    # Member lists by household; the primary key only covers lookups by user
+    db.Index("ix_user_households_household", "household_id"),
 )
 
 user_badges = db.Table(
@@ -73,6 +79,10 @@ class Household(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write to the household's lists; the source of their ETags
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Last sequence number given to a chat change in this household
+    message_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     tasks = db.relationship("Task", backref="household")
@@ -88,6 +98,30 @@ class Household(db.Model):
 
 class Task(db.Model):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Household task lists, status filters and overdue scans
+        db.Index(
+            "ix_tasks_household_completed_due", "household_id", "completed", "due_date"
+        ),
+        # Household completion history (analytics series, leaderboard window)
+        db.Index("ix_tasks_household_completed_at", "household_id", "completed_at"),
+        # Per-assignee completion history (streaks, leaderboard, badges)
+        db.Index(
+            "ix_tasks_assignee_completed_at",
+            "assigned_to",
+            "completed",
+            "completed_at",
+        ),
+        # One row per occurrence of a recurring task
+        db.Index(
+            "ix_tasks_recurrence_parent_due",
+            "recurrence_parent_id",
+            "due_date",
+            unique=True,
+        ),
+        # Tasks of every household that fell due in a time window
+        db.Index("ix_tasks_completed_due", "completed", "due_date"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(100), nullable=False)
@@ -103,6 +137,8 @@ class Task(db.Model):
     )
     created_by = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
     assigned_to = db.Column(db.String(36), db.ForeignKey("users.id"))
+    # Set on materialized occurrences of a recurring task
+    recurrence_parent_id = db.Column(db.String(36), db.ForeignKey("tasks.id"))
 
     # Relationships
     recurring_rule = db.relationship("RecurringTaskRule", uselist=False, backref="task")
@@ -115,17 +151,31 @@ class RecurringTaskRule(db.Model):
     interval_days = db.Column(db.Integer)  # 7 for weekly
     anchor_date = db.Column(db.DateTime)  # First occurrence
     end_date = db.Column(db.DateTime)
+    # Due date of the first occurrence without a task row; None once the rule ends
+    next_due_at = db.Column(db.DateTime, index=True)
 
     task_id = db.Column(db.String(36), db.ForeignKey("tasks.id"), unique=True)
 
 
 class Message(db.Model):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination of chat history: WHERE household_id = ? ORDER BY created_at, id
+        db.Index(
+            "ix_messages_household_created_id", "household_id", "created_at", "id"
+        ),
+        # Reconnect sync: WHERE household_id = ? AND seq > ? ORDER BY seq
+        db.Index("ix_messages_household_seq", "household_id", "seq", unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     content = db.Column(db.Text, nullable=False)
     is_announcement = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    edited_at = db.Column(db.DateTime)
+    deleted_at = db.Column(db.DateTime)  # Set on deleted messages kept as tombstones
+    # Household sequence number of the latest insert, edit or delete
+    seq = db.Column(db.Integer)
 
     # Foreign Keys
     household_id = db.Column(
@@ -136,6 +186,11 @@ class Message(db.Model):
 
 class Poll(db.Model):
     __tablename__ = "polls"
+    __table_args__ = (
+        db.Index("ix_polls_household_created", "household_id", "created_at"),
+        # Polls of every household that closed in a time window
+        db.Index("ix_polls_expires_at", "expires_at"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     question = db.Column(db.String(255), nullable=False)
@@ -154,6 +209,10 @@ class Poll(db.Model):
 
 class Vote(db.Model):
     __tablename__ = "votes"
+    __table_args__ = (
+        # The primary key is (poll_id, user_id); this covers a user's votes
+        db.Index("ix_votes_user", "user_id"),
+    )
 
     poll_id = db.Column(db.String(36), db.ForeignKey("polls.id"), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), primary_key=True)
@@ -162,6 +221,9 @@ class Vote(db.Model):
 
 class Event(db.Model):
     __tablename__ = "events"
+    __table_args__ = (
+        db.Index("ix_events_household_start", "household_id", "start_time"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(100), nullable=False)
@@ -207,6 +269,14 @@ class Badge(db.Model):
 
 class Notification(db.Model):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Notification feed and unread counts per user
+        db.Index(
+            "ix_notifications_user_read_created", "user_id", "is_read", "created_at"
+        ),
+        # Retention: read notifications older than a cutoff
+        db.Index("ix_notifications_read_created", "is_read", "created_at"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     type = db.Column(
@@ -271,3 +341,77 @@ class NotificationSettings(db.Model):
     user = db.relationship(
         "User", backref=db.backref("notification_settings", uselist=False)
     )
+
+
+class UserStreak(db.Model):
+    __tablename__ = "user_streaks"
+
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), primary_key=True)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)
+    longest_streak = db.Column(db.Integer, default=0, nullable=False)
+    last_completion_date = db.Column(db.Date)  # UTC day of the latest completion
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # Relationships
+    user = db.relationship("User", backref=db.backref("streak", uselist=False))
+
+
+class NotificationOutbox(db.Model):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Workers claim the oldest available entries first
+        db.Index("ix_notification_outbox_available", "available_at", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    type = db.Column(db.String(50), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    reference_type = db.Column(db.String(50))
+    reference_id = db.Column(db.String(36))
+    exclude_user_ids = db.Column(db.JSON, default=list)  # Members not to notify
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # A claimed entry is hidden until its lease expires, then retried
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = db.Column(db.String(36))
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+
+    # Not a foreign key, so queued entries never block deleting a household;
+    # entries for a deleted household fan out to nobody
+    household_id = db.Column(db.String(36), nullable=False)
+
+
+class NotificationCounter(db.Model):
+    __tablename__ = "notification_counters"
+
+    # Unread notifications per (user, household); a user's total is the sum
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), primary_key=True)
+    household_id = db.Column(db.String(36), primary_key=True)
+    unread = db.Column(db.Integer, default=0, nullable=False)
+
+
+class PresenceConnection(db.Model):
+    __tablename__ = "presence_connections"
+    __table_args__ = (
+        # Online users per household and connection counts per user
+        db.Index("ix_presence_household_user", "household_id", "user_id"),
+    )
+
+    # One row per socket, plus one per household the socket joined
+    sid = db.Column(db.String(64), primary_key=True)
+    household_id = db.Column(db.String(36), primary_key=True)  # "" for the socket
+    user_id = db.Column(db.String(36), nullable=False)
+    server_id = db.Column(db.String(255), nullable=False, index=True)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ScheduledJob(db.Model):
+    __tablename__ = "scheduled_jobs"
+
+    # One row per periodic job; only the holder of an unexpired lease runs it
+    name = db.Column(db.String(100), primary_key=True)
+    leased_by = db.Column(db.String(255))
+    lease_expires_at = db.Column(db.DateTime)
+    last_run_at = db.Column(db.DateTime)  # End of the window the last run covered
@@ -0,0 +1,18 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..models.models import User
+from ..utils.scheduler_utils import scheduler
+
+admin_bp = Blueprint("admin", __name__)
+
+
+@admin_bp.route("/admin/jobs", methods=["GET"])
+@jwt_required()
+def get_job_metrics():
+    """Lease holders, run times and row counts of scheduled jobs (admin only)"""
+    user = User.query.get(get_jwt_identity())
+
+    if user.role != "admin":
+        return jsonify({"error": "Admin privileges required"}), 403
+
+    return jsonify(scheduler.metrics())
@@ -1,10 +1,14 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
 
-from ..utils.auth_utils import check_household_permission
-from ..models.models import Task, User, Household, Badge
-from ..utils.badge_utils import calculate_streak, check_streak_badges, check_contribution_badges
+from ..utils.auth_utils import check_household_permission, is_household_member
+from ..models.models import User
+from ..utils.analytics_utils import (
+    count_household_members,
+    count_user_badges,
+    get_household_aggregates,
+)
+from ..utils.streak_utils import get_streak_summary
 
 analytics_bp = Blueprint("analytics", __name__)
 
@@ -13,70 +17,44 @@ analytics_bp = Blueprint("analytics", __name__)
 @jwt_required()
 def get_analytics(household_id):
     user = User.query.get(get_jwt_identity())
-    household = Household.query.get(household_id)
 
-    if not household or user not in household.members:
+    if not is_household_member(user, household_id):
         return jsonify({"error": "Not a household member"}), 403
 
-    # Calculate completion rates
-    tasks = Task.query.filter_by(household_id=household_id).all()
-    completed = sum(1 for t in tasks if t.completed)
-    completion_rate = (completed / len(tasks)) * 100 if tasks else 0
-
-    # Calculate overdue tasks
-    now = datetime.utcnow()
-    overdue = sum(
-        1 for t in tasks if not t.completed and t.due_date and t.due_date < now
-    )
-
-    # Calculate average completion time
-    completed_tasks = [t for t in tasks if t.completed and t.completed_at]
-    avg_completion_time = 0
-    if completed_tasks:
-        completion_times = [
-            (t.completed_at - t.created_at).total_seconds() / 3600
-            for t in completed_tasks
-        ]
-        avg_completion_time = sum(completion_times) / len(completion_times)
-
-    # User-specific analytics
-    user_tasks = [t for t in tasks if t.assigned_to == user.id]
-    user_completed = sum(1 for t in user_tasks if t.completed)
-
-    # Calculate streak
-    current_streak = calculate_streak(user.id)
-
-    # Get badges earned (placeholder logic)
-    badges = (
-        Badge.query.join(user_badges).filter(user_badges.c.user_id == user.id).all()
-    )
-
-    # Household member analytics
-    members = household.members
-    active_members = len(set(t.assigned_to for t in tasks if t.assigned_to))
-
-    # Find most active member
-    member_completions = {}
-    for t in tasks:
-        if t.completed and t.assigned_to:
-            member_completions[t.assigned_to] = (
-                member_completions.get(t.assigned_to, 0) + 1
-            )
+    # Task totals, per-member completions and the daily completion series
+    aggregates = get_household_aggregates(household_id)
+    summary = aggregates["summary"]
+    completed = summary["completed"]
+    completion_rate = (completed / summary["total"]) * 100 if summary["total"] else 0
+
+    # Completions per member, most active first (bounded by household size)
+    member_completions = aggregates["member_completions"]
+    user_completed = 0
+    rank_in_household = len(member_completions) + 1
+    for rank, (member_id, count) in enumerate(member_completions, start=1):
+        if member_id == user.id:
+            user_completed = count
+            rank_in_household = rank
+            break
+
+    # Streak state is maintained incrementally on task completion
+    streaks = get_streak_summary(user.id)
 
     most_active_member = {"user_id": "", "email": "", "tasks_completed": 0}
 
     if member_completions:
-        most_active_id = max(member_completions, key=member_completions.get)
+        most_active_id, most_active_count = member_completions[0]
         most_active_user = User.query.get(most_active_id)
         if most_active_user:
             most_active_member = {
                 "user_id": most_active_user.id,
                 "email": most_active_user.email,
-                "tasks_completed": member_completions[most_active_id],
+                "tasks_completed": most_active_count,
             }
 
-    # Award badges (keep existing logic)
-    check_contribution_badges(household_id)
+    # The shorter trend series is a suffix of the heatmap window
+    daily = aggregates["daily_completions"]
+    trend_days = min(current_app.config["ANALYTICS_TREND_DAYS"], len(daily))
 
     # Return comprehensive analytics data
     return (
@@ -85,44 +63,38 @@ def get_analytics(household_id):
                 # Task analytics
                 "task_analytics": {
                     "completion_rate": completion_rate,
-                    "total_tasks": len(tasks),
+                    "total_tasks": summary["total"],
                     "completed_tasks": completed,
-                    "overdue_tasks": overdue,
-                    "average_completion_time": avg_completion_time,  # in hours
+                    "overdue_tasks": summary["overdue"],
+                    "average_completion_time": summary[
+                        "avg_completion_hours"
+                    ],  # in hours
                 },
                 # User analytics
                 "user_analytics": {
                     "tasks_completed": user_completed,
-                    "current_streak": current_streak,
-                    "longest_streak": current_streak + 2,  # Placeholder
-                    "badges_earned": len(badges),
+                    "current_streak": streaks["current_streak"],
+                    "longest_streak": streaks["longest_streak"],
+                    "badges_earned": count_user_badges(user.id),
                     "contribution_score": user_completed
                     * 10,  # Placeholder calculation
-                    "rank_in_household": 1,  # Placeholder
+                    "rank_in_household": rank_in_household,
                 },
                 # Household analytics
                 "household_analytics": {
-                    "total_members": len(members),
-                    "active_members": active_members,
-                    "total_tasks_created": len(tasks),
+                    "total_members": count_household_members(household_id),
+                    "active_members": summary["active_members"],
+                    "total_tasks_created": summary["total"],
                     "total_tasks_completed": completed,
                     "average_completion_rate": completion_rate,
                     "most_active_member": most_active_member,
                 },
-                # Simple activity data - should be expanded in production
                 "activity_over_time": [
-                    {
-                        "date": (datetime.utcnow() - timedelta(days=i)).isoformat(),
-                        "value": int(i % 5),
-                    }
-                    for i in range(10)
+                    {"date": date.isoformat(), "value": count}
+                    for date, count in daily[-trend_days:]
                 ],
                 "activity_heatmap": [
-                    {
-                        "date": (datetime.utcnow() - timedelta(days=i)).isoformat(),
-                        "count": int(i % 7),
-                    }
-                    for i in range(30)
+                    {"date": date.isoformat(), "count": count} for date, count in daily
                 ],
             }
         ),
@@ -1,8 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.models import Badge, User, user_badges, Notification
+from ..models.models import Badge, User, user_badges
 from ..utils.auth_utils import check_household_permission
-from ..utils.badge_utils import check_badge_eligibility
+from ..utils.badge_utils import (
+    BADGE_RULES,
+    award_badges,
+    evaluate_badges,
+    get_badge_catalog,
+    get_badge_counters,
+    invalidate_badge_catalog,
+)
+from ..utils.leaderboard_utils import get_leaderboard_snapshot
 from ..extensions import db
 
 badge_bp = Blueprint("badges", __name__)
@@ -140,6 +148,7 @@ def create_badge():
         )
         db.session.add(new_badge)
         db.session.commit()
+        invalidate_badge_catalog()
 
         return jsonify({"message": "Badge created", "badge_id": new_badge.id}), 201
 
@@ -176,21 +185,8 @@ def award_badge():
         return jsonify({"error": "Badge already awarded to this user"}), 409
 
     try:
-        # Award badge
-        db.session.execute(
-            user_badges.insert().values(user_id=user_id, badge_id=badge_id)
-        )
-
-        # Create notification
-        notification = Notification(
-            type="badge_awarded",
-            content=f"You've earned the {badge.name} badge!",
-            user_id=user_id,
-            reference_type="badge",
-            reference_id=badge_id,
-        )
-        db.session.add(notification)
-
+        # Award badge and notify the user
+        award_badges(user_id, [badge], data.get("household_id"))
         db.session.commit()
 
         return (
@@ -212,13 +208,19 @@ def award_badge():
 @badge_bp.route("/users/check-badges", methods=["POST"])
 @jwt_required()
 def check_badges():
-    """Check and award badges based on user activity"""
+    """
+    Check and award badges based on user activity.
+
+    Badges are also evaluated automatically when tasks are completed,
+    messages are sent and votes are cast; this re-checks every rule.
+    """
     current_user_id = get_jwt_identity()
     user = User.query.get(current_user_id)
+    data = request.get_json(silent=True) or {}
 
     try:
-        # This would call helper functions to check various achievements
-        awarded_badges = check_badge_eligibility(user)
+        awarded_badges = evaluate_badges(user.id, data.get("household_id"))
+        db.session.commit()
 
         return (
             jsonify(
@@ -238,6 +240,7 @@ def check_badges():
         )
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
@@ -249,77 +252,42 @@ def get_badge_progress():
     user = User.query.get(current_user_id)
 
     # Get badges the user doesn't have yet
-    user_badge_ids = (
-        db.session.query(user_badges.c.badge_id).filter_by(user_id=user.id).all()
+    user_badge_ids = {
+        badge_id
+        for (badge_id,) in db.session.query(user_badges.c.badge_id).filter_by(
+            user_id=user.id
+        )
+    }
+    unearned_badges = [
+        badge
+        for badge in get_badge_catalog().values()
+        if badge.id not in user_badge_ids and badge.type in BADGE_RULES
+    ]
+
+    # Read every counter the remaining rules need in one pass
+    counters = get_badge_counters(
+        user.id, {BADGE_RULES[badge.type][0] for badge in unearned_badges}
     )
-    user_badge_ids = [b[0] for b in user_badge_ids]
-
-    unearned_badges = Badge.query.filter(Badge.id.notin_(user_badge_ids)).all()
 
-    # Calculate progress for each badge
     progress_data = []
     for badge in unearned_badges:
-        # The progress calculation would depend on badge type
-        # Here's a placeholder implementation
-        progress = calculate_badge_progress(user, badge)
-
-        if progress:
-            progress_data.append(
-                {
-                    "badge_id": badge.id,
-                    "badge_name": badge.name,
-                    "badge_type": badge.type,
-                    "description": badge.description,
-                    "progress": progress["current"],
-                    "target": progress["target"],
-                    "percentage": (
-                        round((progress["current"] / progress["target"]) * 100, 2)
-                        if progress["target"] > 0
-                        else 0
-                    ),
-                }
-            )
+        counter, target = BADGE_RULES[badge.type]
+        current = counters[counter]
+        progress_data.append(
+            {
+                "badge_id": badge.id,
+                "badge_name": badge.name,
+                "badge_type": badge.type,
+                "description": badge.description,
+                "progress": current,
+                "target": target,
+                "percentage": (round((current / target) * 100, 2) if target > 0 else 0),
+            }
+        )
 
     return jsonify({"badge_progress": progress_data}), 200
 
 
-def calculate_badge_progress(user, badge):
-    """Calculate progress toward earning a specific badge"""
-    # Different badge types require different progress calculations
-    from ..models.models import Task
-
-    if badge.type == "5_day_streak":
-        # Get current streak
-        from ..utils.task_utils import calculate_streak
-
-        current_streak = calculate_streak(user.id)
-        return {"current": current_streak, "target": 5}
-
-    elif badge.type == "10_day_streak":
-        from ..utils.task_utils import calculate_streak
-
-        current_streak = calculate_streak(user.id)
-        return {"current": current_streak, "target": 10}
-
-    elif badge.type == "task_master":
-        # Count completed tasks
-        completed_tasks = Task.query.filter_by(
-            assigned_to=user.id, completed=True
-        ).count()
-        return {
-            "current": completed_tasks,
-            "target": 50,
-        }  # Example: 50 tasks to earn badge
-
-    elif badge.type == "top_contributor":
-        # This might need household context to determine if user has most tasks
-        # For now, just return null progress
-        return None
-
-    # Default case
-    return None
-
-
 @badge_bp.route("/households/<household_id>/leaderboard", methods=["GET"])
 @jwt_required()
 def get_household_leaderboard(household_id):
@@ -330,62 +298,5 @@ def get_household_leaderboard(household_id):
     if not check_household_permission(user, household_id, "member"):
         return jsonify({"error": "Not a household member"}), 403
 
-    # Get leaderboard data
-    from ..models.models import Task, Household
-
-    # Get all household members
-    members_query = (
-        db.session.query(User)
-        .join(user_households, User.id == user_households.c.user_id)
-        .filter(user_households.c.household_id == household_id)
-        .all()
-    )
-
-    leaderboard_data = []
-    for member in members_query:
-        # Count tasks completed in the last 30 days
-        from datetime import datetime, timedelta
-
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-
-        completed_tasks = Task.query.filter(
-            Task.assigned_to == member.id,
-            Task.household_id == household_id,
-            Task.completed == True,
-            Task.completed_at >= thirty_days_ago,
-        ).count()
-
-        # Count badges earned
-        badge_count = db.session.query(user_badges).filter_by(user_id=member.id).count()
-
-        # Calculate streak
-        from ..utils.task_utils import calculate_streak
-
-        current_streak = calculate_streak(member.id)
-
-        leaderboard_data.append(
-            {
-                "user_id": member.id,
-                "email": member.email,
-                "name": getattr(member, "name", member.email.split("@")[0]),
-                "tasks_completed": completed_tasks,
-                "badge_count": badge_count,
-                "current_streak": current_streak,
-                "rank": 0,  # Will be calculated after sorting
-            }
-        )
-
-    # Sort by tasks completed and assign ranks
-    leaderboard_data.sort(key=lambda x: x["tasks_completed"], reverse=True)
-    for i, entry in enumerate(leaderboard_data):
-        entry["rank"] = i + 1
-
-    return (
-        jsonify(
-            {
-                "leaderboard": leaderboard_data,
-                "update_time": datetime.utcnow().isoformat(),
-            }
-        ),
-        200,
-    )
+    # Served from the household's snapshot; writes that change it invalidate it
+    return jsonify(get_leaderboard_snapshot(household_id)), 200
@@ -2,7 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 
-from ..utils.auth_utils import check_household_permission
+from ..utils.auth_utils import check_household_permission, get_household_role
+from ..utils.etag_utils import etag_response, household_etag, not_modified
+from ..utils.notification_utils import enqueue_notification
 from ..models.models import Event, User, Household
 from ..extensions import db
 
@@ -16,7 +18,7 @@ def create_event(household_id):
     user = User.query.get(current_user_id)
     household = Household.query.get(household_id)
 
-    if not household or user not in household.members:
+    if not household or not get_household_role(user.id, household_id):
         return jsonify({"error": "Not a household member"}), 403
 
     data = request.get_json()
@@ -51,9 +53,10 @@ def create_event(household_id):
     )
 
     db.session.add(new_event)
-    db.session.commit()
+    db.session.flush()
 
     notify_members(household, user, new_event)
+    db.session.commit()
 
     return jsonify({"message": "Event created", "event_id": new_event.id}), 201
 
@@ -63,7 +66,6 @@ def create_event(household_id):
 def get_household_events(household_id):
     current_user_id = get_jwt_identity()
     user = User.query.get(current_user_id)
-    household = Household.query.get(household_id)
 
     # Get date range parameters
     start_date = request.args.get("start_date")
@@ -71,10 +73,17 @@ def get_household_events(household_id):
 
     query = Event.query.filter_by(household_id=household_id)
 
-    if not household or user not in household.members:
+    role = get_household_role(user.id, household_id)
+    if not role:
         return jsonify({"error": "Not a household member"}), 403
 
-    if not check_household_permission(user, household_id, "admin"):
+    # Answer revalidations from the household version alone
+    etag = household_etag(household_id, user.id)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if role != "admin":
         query = query.filter((Event.privacy == "public") | (Event.user_id == user.id))
 
     # Apply date range filter if provided
@@ -108,7 +117,7 @@ def get_household_events(household_id):
 
     events = query.order_by(Event.start_time.asc()).all()
 
-    return (
+    return etag_response(
         jsonify(
             [
                 {
@@ -124,7 +133,7 @@ def get_household_events(household_id):
                 for e in events
             ]
         ),
-        200,
+        etag,
     )
 
 
@@ -255,19 +264,12 @@ def create_recurring_events(data, household, user):
 
 
 def notify_members(household, creator, event):
-    """Notify household members about a new event"""
-    from ..models.models import Notification
-
-    for member in household.members:
-        if member.id != creator.id:  # Don't notify creator
-            notification = Notification(
-                type="new_event",
-                content=f"New event: {event.title} on {event.start_time.strftime('%Y-%m-%d %H:%M')}",
-                user_id=member.id,
-                household_id=household.id,
-                reference_type="event",
-                reference_id=event.id,
-            )
-            db.session.add(notification)
-
-    db.session.commit()
+    """Queue notifications about a new event in the caller's transaction"""
+    enqueue_notification(
+        household.id,
+        "new_event",
+        f"New event: {event.title} on {event.start_time.strftime('%Y-%m-%d %H:%M')}",
+        reference_type="event",
+        reference_id=event.id,
+        exclude_user_ids=[creator.id],  # Don't notify creator
+    )
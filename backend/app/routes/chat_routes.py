@@ -1,36 +1,63 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, session
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_socketio import emit, join_room, leave_room
-from datetime import datetime
-from ..models.models import Message, Poll, Vote, User, Household, user_households
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+import base64
+from ..models.models import Message, User, Household, user_households
+from ..utils.auth_utils import (
+    check_household_permission,
+    get_user_household_roles,
+    is_household_member,
+    role_satisfies,
+)
+from ..utils.badge_utils import evaluate_badges
+from ..utils.db_utils import group_commit
+from ..utils.etag_utils import etag_response, household_etag, not_modified
+from ..utils.message_utils import get_message_changes, search_messages
+from ..utils.notification_utils import enqueue_notification
+from ..utils.presence_utils import presence
+from ..utils.typing_utils import typing_aggregator
 from ..extensions import db, socketio
 
 chat_bp = Blueprint("chat", __name__)
 
-online_users = {}
+# Upper bound on a single page of cursor-paginated chat history
+MAX_MESSAGES_PER_PAGE = 200
 
 
 # WebSocket Event Handlers
 @socketio.on("connect")
-def handle_connect():
-    pass
+def handle_connect(auth=None):
+    # Clients may authenticate up front with io(url, {auth: {token}})
+    token = (auth or {}).get("token")
+    if not token:
+        return
+
+    try:
+        if authenticate_socket(token) is None:
+            return False
+    except Exception:
+        return False
 
 
 @socketio.on("join")
 def handle_join(data):
-    # Authenticate using token passed in data
     try:
-        token = data.get("token")
-        # Verify token and get user_id
-        user_id = verify_jwt_token(token)  # Implement this function
-        user = User.query.get(user_id)
+        user_id = get_socket_user_id(data)
+        if not user_id:
+            return
 
-        if not user:
-            emit("error", {"message": "User not found"})
+        # Membership may have changed since the socket authenticated
+        refresh_socket_households()
+        if not socket_has_role(data["household_id"]):
+            emit("error", {"message": "Not a household member"})
             return
 
         room = f"household_{data['household_id']}"
         join_room(room)
+        presence.join(request.sid, data["household_id"])
         emit("joined", {"message": f"Joined {room}"})
     except Exception as e:
         emit("error", {"message": str(e)})
@@ -38,89 +65,57 @@ def handle_join(data):
 
 @socketio.on("disconnect")
 def handle_disconnect():
-    # Find user in online_users and mark as disconnected
-    for user_id, data in online_users.items():
-        if data.get("sid") == request.sid:
-            online_users[user_id]["connected"] = False
-
-            # Notify household members
-            for household_id in data.get("households", []):
-                emit(
-                    "user_offline",
-                    {"user_id": user_id},
-                    room=f"household_{household_id}",
-                    broadcast=True,
-                )
-            break
+    # Drop this connection; other tabs keep the user online
+    user_id, offline_households, _ = presence.disconnect(request.sid)
+
+    # Notify households the user has no connections left in
+    for household_id in offline_households:
+        typing_aggregator.stop_typing(household_id, user_id)
+        emit(
+            "user_offline",
+            {"user_id": user_id},
+            room=f"household_{household_id}",
+            broadcast=True,
+        )
 
 
 @socketio.on("send_message")
 def handle_send_message(data):
     try:
-        token = data.get("token")
-        if not token:
-            emit("error", {"message": "Token required"})
-            return
-
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
-
-        if not user:
-            emit("error", {"message": "User not found"})
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
         household_id = data.get("household_id")
-        household = Household.query.get(household_id)
-
-        if not household:
-            emit("error", {"message": "Household not found"})
-            return
-
-        # Check membership
-        is_member = (
-            db.session.query(user_households)
-            .filter_by(user_id=user_id, household_id=household_id)
-            .first()
-        )
 
-        if not is_member:
+        # Membership may have changed since the socket authenticated
+        refresh_socket_households()
+        if not socket_has_role(household_id):
             emit("error", {"message": "Not a household member"})
             return
 
-        new_message = Message(
-            content=data["content"],
-            is_announcement=data.get("is_announcement", False),
-            household_id=household_id,
-            user_id=user_id,
+        # Committed together with messages from concurrent senders
+        payload, awarded_badges = group_commit.submit(
+            store_message,
+            household_id,
+            user_id,
+            session["email"],
+            data["content"],
+            data.get("is_announcement", False),
         )
-        db.session.add(new_message)
-        db.session.commit()
+
+        if awarded_badges:
+            emit("badges_awarded", {"badges": awarded_badges})
 
         # Broadcast to all in the room
-        room = f"household_{household_id}"
-        emit(
-            "new_message",
-            {
-                "id": new_message.id,
-                "content": new_message.content,
-                "sender_id": user_id,
-                "sender_email": user.email,
-                "is_announcement": new_message.is_announcement,
-                "created_at": new_message.created_at.isoformat(),
-            },
-            room=room,
-        )
+        emit("new_message", payload, room=f"household_{household_id}")
+        typing_aggregator.stop_typing(household_id, user_id)
 
-        # Create notifications for offline users
-        notify_offline_users(
-            household_id,
-            user_id,
-            "new_message",
-            f"New message from {user.email}: {data['content'][:30]}...",
-            new_message.id,
-        )
+        # Acknowledge once the message is durable
+        return {"id": payload["id"], "created_at": payload["created_at"]}
 
     except Exception as e:
+        db.session.rollback()
         emit("error", {"message": str(e)})
 
 
@@ -132,20 +127,11 @@ def handle_authenticate(data):
             emit("error", {"message": "Token required"})
             return
 
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
-
-        if not user:
+        user_id = authenticate_socket(token)
+        if not user_id:
             emit("error", {"message": "User not found"})
             return
 
-        # Track online status
-        online_users[user_id] = {
-            "sid": request.sid,
-            "connected": True,
-            "households": [],
-        }
-
         emit("authenticated", {"user_id": user_id})
     except Exception as e:
         emit("error", {"message": str(e)})
@@ -154,34 +140,19 @@ def handle_authenticate(data):
 @socketio.on("join_household")
 def join_household(data):
     try:
-        token = data.get("token")
         household_id = data.get("household_id")
 
-        if not token or not household_id:
-            emit("error", {"message": "Token and household_id required"})
-            return
-
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
-
-        if not user:
-            emit("error", {"message": "User not found"})
+        if not household_id:
+            emit("error", {"message": "Household ID required"})
             return
 
-        # Check household membership
-        household = Household.query.get(household_id)
-        if not household:
-            emit("error", {"message": "Household not found"})
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
-        # This should use the association table to check membership
-        is_member = (
-            db.session.query(user_households)
-            .filter_by(user_id=user_id, household_id=household_id)
-            .first()
-        )
-
-        if not is_member:
+        # Membership may have changed since the socket authenticated
+        refresh_socket_households()
+        if not socket_has_role(household_id):
             emit("error", {"message": "Not a household member"})
             return
 
@@ -190,14 +161,12 @@ def join_household(data):
         join_room(room)
 
         # Update online status
-        if user_id in online_users:
-            if household_id not in online_users[user_id].get("households", []):
-                online_users[user_id]["households"].append(household_id)
+        presence.join(request.sid, household_id)
 
         # Notify other members
         emit(
             "user_joined",
-            {"user_id": user_id, "email": user.email},
+            {"user_id": user_id, "email": session["email"]},
             room=room,
             broadcast=True,
             include_self=False,
@@ -225,11 +194,7 @@ def leave_household(data):
         leave_room(room)
 
         # Update online status
-        for user_id, data in online_users.items():
-            if data.get("sid") == request.sid:
-                if household_id in data.get("households", []):
-                    data["households"].remove(household_id)
-                break
+        presence.leave(request.sid, household_id)
 
         emit("left_household", {"household_id": household_id})
     except Exception as e:
@@ -247,52 +212,215 @@ def verify_jwt_token(token):
         raise Exception(f"Invalid token: {str(e)}")
 
 
+def authenticate_socket(token):
+    """
+    Resolve a JWT once and keep the principal in the Socket.IO session.
+
+    Later events on the connection read the user and their household roles
+    from the session instead of decoding the token and querying again.
+
+    Returns:
+        str: The authenticated user_id, or None if the user does not exist
+    """
+    user_id = verify_jwt_token(token)
+    user = User.query.get(user_id)
+    if not user:
+        return None
+
+    session["user_id"] = user.id
+    session["email"] = user.email
+    session["households"] = get_user_household_roles(user.id)
+
+    # Personal room for pushes meant only for this user's sockets
+    join_room(f"user_{user.id}")
+
+    # Track online status
+    presence.connect(request.sid, user.id)
+
+    return user.id
+
+
+def get_socket_user_id(data):
+    """
+    Return the user_id authenticated on this connection.
+
+    Connections that skipped connect/authenticate are authenticated from
+    the event's token the first time; errors are emitted to the client.
+    """
+    user_id = session.get("user_id")
+    if user_id:
+        return user_id
+
+    token = (data or {}).get("token")
+    if not token:
+        emit("error", {"message": "Token required"})
+        return None
+
+    user_id = authenticate_socket(token)
+    if not user_id:
+        emit("error", {"message": "User not found"})
+    return user_id
+
+
+def refresh_socket_households():
+    """Reload the connection's household roles from the database"""
+    session["households"] = get_user_household_roles(session["user_id"])
+
+
+def socket_has_role(household_id, required_role="member"):
+    """
+    Check the connection's cached household role; no database access.
+
+    The cache is only as fresh as the last refresh_socket_households();
+    handlers that write, read chat history or broadcast typing refresh it
+    first.
+    """
+    return role_satisfies(
+        session.get("households", {}).get(household_id), required_role
+    )
+
+
+def message_to_dict(message, compact=False):
+    if message.deleted_at:
+        # Tombstone: enough for a syncing client to drop its copy
+        return {"id": message.id, "seq": message.seq, "deleted": True}
+
+    edited_at = message.edited_at.isoformat() if message.edited_at else None
+    if compact:
+        # Sender details live in "users"; optional fields are only sent when set
+        serialized = {
+            "id": message.id,
+            "seq": message.seq,
+            "content": message.content,
+            "sender_id": message.user_id,
+            "created_at": message.created_at.isoformat(),
+        }
+        if message.is_announcement:
+            serialized["is_announcement"] = True
+        if edited_at:
+            serialized["edited_at"] = edited_at
+        return serialized
+
+    return {
+        "id": message.id,
+        "seq": message.seq,
+        "content": message.content,
+        "sender": message.sender.email,
+        "is_announcement": message.is_announcement,
+        "created_at": message.created_at.isoformat(),
+        "edited_at": edited_at,
+    }
+
+
+def messages_to_dict(messages, compact=False):
+    """
+    Serialize a page of messages.
+
+    The compact shape refers to senders by id and lists each sender once
+    under "users" instead of repeating their details in every message.
+    """
+    serialized = {"messages": [message_to_dict(m, compact) for m in messages]}
+    if compact:
+        serialized["users"] = {
+            m.sender.id: {
+                "email": m.sender.email,
+                "first_name": m.sender.first_name,
+                "last_name": m.sender.last_name,
+            }
+            for m in messages
+            if not m.deleted_at
+        }
+    return serialized
+
+
+def message_changes_to_dict(household_id, since, limit, compact=False):
+    """Serialize the changes after since, with the seq to resume from"""
+    changes, has_more = get_message_changes(household_id, since, limit)
+    return {
+        **messages_to_dict(changes, compact),
+        "latest_seq": changes[-1].seq if changes else since,
+        "has_more": has_more,
+    }
+
+
+def encode_message_cursor(message):
+    """Build an opaque cursor pointing just past the given message"""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_message_cursor(cursor):
+    """Return the (created_at, id) pair encoded in a cursor, or raise ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, message_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), message_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+
+
 def is_user_online(user_id):
     """Check if a user is currently online"""
-    return user_id in online_users and online_users[user_id].get("connected", False)
+    return presence.is_online(user_id)
 
 
-def notify_offline_users(
-    household_id, sender_id, message_type, content, reference_id=None
-):
-    """Create notifications for users who are offline"""
-    from ..models.models import Notification, user_households
+def store_message(household_id, user_id, sender_email, content, is_announcement):
+    """
+    Write a chat message with its badges and offline notifications.
 
-    try:
-        # Query all household members
-        members_query = (
-            db.session.query(user_households).filter_by(household_id=household_id).all()
-        )
+    Runs inside a group commit, possibly in another sender's session, so it
+    returns plain data built before the commit.
 
-        for membership in members_query:
-            member_id = membership.user_id
-
-            # Skip the sender
-            if member_id == sender_id:
-                continue
-
-            # Skip online users in this household
-            if (
-                member_id in online_users
-                and online_users[member_id].get("connected")
-                and household_id in online_users[member_id].get("households", [])
-            ):
-                continue
-
-            # Create notification for offline user
-            notification = Notification(
-                type=message_type,
-                content=content,
-                user_id=member_id,
-                household_id=household_id,
-                reference_type="message" if message_type == "new_message" else "poll",
-                reference_id=reference_id,
-            )
-            db.session.add(notification)
+    Returns:
+        (new_message payload, list of awarded badges)
+    """
+    new_message = Message(
+        content=content,
+        is_announcement=is_announcement,
+        household_id=household_id,
+        user_id=user_id,
+    )
+    db.session.add(new_message)
+    db.session.flush()
+
+    payload = {
+        "id": new_message.id,
+        "seq": new_message.seq,
+        "content": new_message.content,
+        "sender_id": user_id,
+        "sender_email": sender_email,
+        "is_announcement": new_message.is_announcement,
+        "created_at": new_message.created_at.isoformat(),
+    }
+
+    # Badges and offline notifications share the message's transaction
+    awarded_badges = evaluate_badges(user_id, household_id, "message_sent")
+    notify_offline_users(
+        household_id,
+        user_id,
+        "new_message",
+        f"New message from {sender_email}: {content[:30]}...",
+        new_message.id,
+    )
 
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
+    return payload, [{"id": badge.id, "name": badge.name} for badge in awarded_badges]
+
+
+def notify_offline_users(
+    household_id, sender_id, message_type, content, reference_id=None
+):
+    """Queue notifications for offline members in the caller's transaction"""
+    # Skip the sender and members currently online in this household
+    online_ids = presence.online_user_ids(household_id)
+
+    enqueue_notification(
+        household_id,
+        message_type,
+        content,
+        reference_type="message" if message_type == "new_message" else "poll",
+        reference_id=reference_id,
+        exclude_user_ids=[sender_id, *online_ids],
+    )
 
 
 # REST Endpoints
@@ -301,161 +429,153 @@ def notify_offline_users(
 def get_messages(household_id):
     current_user_id = get_jwt_identity()
     user = User.query.get(current_user_id)
-    household = Household.query.get(household_id)
 
-    if not household or user not in household.members:
+    if not is_household_member(user, household_id):
         return jsonify({"error": "Not a household member"}), 403
 
+    # Answer revalidations from the household version alone
+    etag = household_etag(household_id, user.id)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 50, type=int)
-    messages = (
-        Message.query.filter_by(household_id=household_id)
-        .order_by(Message.created_at.desc())
-        .paginate(page=page, per_page=per_page)
+    cursor = request.args.get("cursor")
+    since = request.args.get("since")
+    compact = request.args.get("compact", "false").lower() == "true"
+
+    # Delta mode: the inserts, edits and deletes after the client's last seq
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "Invalid since"}), 400
+
+        per_page = min(max(per_page, 1), MAX_MESSAGES_PER_PAGE)
+        return etag_response(
+            jsonify(message_changes_to_dict(household_id, since, per_page, compact)),
+            etag,
+        )
+
+    # Load each page's senders in the same query, with only the fields we send
+    query = Message.query.filter_by(household_id=household_id, deleted_at=None).options(
+        joinedload(Message.sender).load_only(
+            User.id, User.email, User.first_name, User.last_name
+        )
+    )
+
+    # Cursor mode: keyset pagination on (created_at, id), no OFFSET scan or COUNT(*).
+    # An empty cursor requests the newest page.
+    if cursor is not None:
+        per_page = min(max(per_page, 1), MAX_MESSAGES_PER_PAGE)
+
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_message_cursor(cursor)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+
+            query = query.filter(
+                or_(
+                    Message.created_at < cursor_created_at,
+                    and_(
+                        Message.created_at == cursor_created_at,
+                        Message.id < cursor_id,
+                    ),
+                )
+            )
+
+        rows = (
+            query.order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+
+        return etag_response(
+            jsonify(
+                {
+                    **messages_to_dict(rows, compact),
+                    "next_cursor": (
+                        encode_message_cursor(rows[-1]) if has_more else None
+                    ),
+                    "per_page": per_page,
+                }
+            ),
+            etag,
+        )
+
+    messages = query.order_by(Message.created_at.desc()).paginate(
+        page=page, per_page=per_page
     )
 
-    return (
+    return etag_response(
         jsonify(
             {
-                "messages": [
-                    {
-                        "id": m.id,
-                        "content": m.content,
-                        "sender": m.sender.email,
-                        "is_announcement": m.is_announcement,
-                        "created_at": m.created_at.isoformat(),
-                    }
-                    for m in messages.items
-                ],
+                **messages_to_dict(messages.items, compact),
                 "total": messages.total,
                 "page": messages.page,
                 "per_page": messages.per_page,
             }
         ),
-        200,
+        etag,
     )
 
 
-@chat_bp.route("/households/<household_id>/polls", methods=["POST"])
+@chat_bp.route("/households/<household_id>/messages/search", methods=["GET"])
 @jwt_required()
-def create_poll(household_id):
+def search_household_messages(household_id):
     current_user_id = get_jwt_identity()
     user = User.query.get(current_user_id)
-    household = Household.query.get(household_id)
 
-    if not household or user not in household.members:
+    if not is_household_member(user, household_id):
         return jsonify({"error": "Not a household member"}), 403
 
-    data = request.get_json()
-    new_poll = Poll(
-        question=data["question"],
-        options={
-            option: 0 for option in data["options"]
-        },  # Initialize vote counts to 0
-        expires_at=datetime.fromisoformat(data["expires_at"]),
-        household_id=household.id,
-        created_by=user.id,
-    )
-    db.session.add(new_poll)
-    db.session.commit()
-
-    # Broadcast new poll to all household members
-    emit(
-        "new_poll",
-        {
-            "id": new_poll.id,
-            "question": new_poll.question,
-            "options": new_poll.options,
-            "expires_at": new_poll.expires_at.isoformat(),
-            "created_by": user.email,
-        },
-        room=f"household_{household_id}",
-        broadcast=True,
-    )
-
-    return jsonify({"message": "Poll created", "poll_id": new_poll.id}), 201
-
-
-@chat_bp.route("/polls/<poll_id>/vote", methods=["POST"])
-@jwt_required()
-def vote_poll(poll_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    poll = Poll.query.get(poll_id)
-
-    if not poll or user not in poll.household.members:
-        return jsonify({"error": "Not authorized"}), 403
-
-    if poll.expires_at < datetime.utcnow():
-        return jsonify({"error": "Poll has expired"}), 400
-
-    data = request.get_json()
-    selected_option = data["selected_option"]
-
-    if selected_option not in poll.options:
-        return jsonify({"error": "Invalid option"}), 400
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Search query is required"}), 400
 
-    # Check for existing vote
-    existing_vote = Vote.query.filter_by(poll_id=poll_id, user_id=user.id).first()
-    if existing_vote:
-        return jsonify({"error": "Already voted"}), 409
+    etag = household_etag(household_id, user.id)
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
-    # Record vote
-    new_vote = Vote(poll_id=poll_id, user_id=user.id, selected_option=selected_option)
-    db.session.add(new_vote)
-
-    # Update poll options
-    poll.options[selected_option] += 1
-    db.session.commit()
-
-    # Broadcast updated poll results
-    emit(
-        "poll_update",
-        {"poll_id": poll.id, "options": poll.options},
-        room=f"household_{poll.household_id}",
-        broadcast=True,
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(
+        max(request.args.get("per_page", 20, type=int), 1), MAX_MESSAGES_PER_PAGE
     )
 
-    return jsonify({"message": "Vote recorded"}), 200
-
-
-@chat_bp.route("/polls/<poll_id>", methods=["GET"])
-@jwt_required()
-def get_poll_results(poll_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    poll = Poll.query.get(poll_id)
-
-    if not poll or user not in poll.household.members:
-        return jsonify({"error": "Not authorized"}), 403
+    # Best matches first; has_more instead of a total keeps pages index-only.
+    # Pages rank one window of the newest matches; next_before, when set,
+    # continues with the next window of older matches from page 1.
+    try:
+        results, has_more, next_before = search_messages(
+            household_id, query, page, per_page, request.args.get("before")
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid before cursor"}), 400
 
-    return (
+    return etag_response(
         jsonify(
             {
-                "id": poll.id,
-                "question": poll.question,
-                "options": poll.options,
-                "expires_at": poll.expires_at.isoformat(),
-                "created_by": poll.created_by,
+                "results": results,
+                "page": page,
+                "per_page": per_page,
+                "has_more": has_more,
+                "next_before": next_before,
             }
         ),
-        200,
+        etag,
     )
 
 
 @socketio.on("edit_message")
 def handle_edit_message(data):
     try:
-        token = data.get("token")
-        if not token:
-            emit("error", {"message": "Token required"})
-            return
-
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
-
-        if not user:
-            emit("error", {"message": "User not found"})
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
         message_id = data.get("message_id")
@@ -467,12 +587,13 @@ def handle_edit_message(data):
 
         message = Message.query.get(message_id)
 
-        if not message:
+        if not message or message.deleted_at:
             emit("error", {"message": "Message not found"})
             return
 
-        # Only the sender can edit their message
-        if message.user_id != user_id:
+        # Only the sender can edit their message, while still a member
+        refresh_socket_households()
+        if message.user_id != user_id or not socket_has_role(message.household_id):
             emit("error", {"message": "Not authorized to edit this message"})
             return
 
@@ -484,37 +605,29 @@ def handle_edit_message(data):
         # Update message
         message.content = new_content
         message.edited_at = datetime.utcnow()
+        db.session.flush()  # Assigns the edit's seq
+        payload = {
+            "id": message.id,
+            "seq": message.seq,
+            "content": message.content,
+            "edited_at": message.edited_at.isoformat(),
+        }
+        room = f"household_{message.household_id}"
         db.session.commit()
 
         # Broadcast edit to all in the room
-        room = f"household_{message.household_id}"
-        emit(
-            "message_edited",
-            {
-                "id": message.id,
-                "content": message.content,
-                "edited_at": message.edited_at.isoformat(),
-            },
-            room=room,
-        )
+        emit("message_edited", payload, room=room)
 
     except Exception as e:
+        db.session.rollback()
         emit("error", {"message": str(e)})
 
 
 @socketio.on("delete_message")
 def handle_delete_message(data):
     try:
-        token = data.get("token")
-        if not token:
-            emit("error", {"message": "Token required"})
-            return
-
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
-
-        if not user:
-            emit("error", {"message": "User not found"})
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
         message_id = data.get("message_id")
@@ -525,46 +638,45 @@ def handle_delete_message(data):
 
         message = Message.query.get(message_id)
 
-        if not message:
+        if not message or message.deleted_at:
             emit("error", {"message": "Message not found"})
             return
 
-        # Only the sender or admin can delete a message
-        is_admin = check_household_permission(user, message.household_id, "admin")
-        if message.user_id != user_id and not is_admin:
+        # Only the sender or admin can delete a message, while still a member
+        refresh_socket_households()
+        is_admin = socket_has_role(message.household_id, "admin")
+        is_member = socket_has_role(message.household_id)
+        if not is_member or (message.user_id != user_id and not is_admin):
             emit("error", {"message": "Not authorized to delete this message"})
             return
 
-        # Delete the message
+        # Keep a tombstone so reconnecting clients learn about the delete
         household_id = message.household_id
-        db.session.delete(message)
+        message.content = ""
+        message.deleted_at = datetime.utcnow()
+        db.session.flush()  # Assigns the delete's seq
+        seq = message.seq
         db.session.commit()
 
         # Broadcast deletion to all in the room
         room = f"household_{household_id}"
         emit(
             "message_deleted",
-            {"id": message_id, "deleted_by": user_id},
+            {"id": message_id, "seq": seq, "deleted_by": user_id},
             room=room,
         )
 
     except Exception as e:
+        db.session.rollback()
         emit("error", {"message": str(e)})
 
 
-@socketio.on("typing_start")
-def handle_typing_start(data):
+@socketio.on("sync_messages")
+def handle_sync_messages(data):
+    """Send a reconnecting client the chat changes after its last seq"""
     try:
-        token = data.get("token")
-        if not token:
-            emit("error", {"message": "Token required"})
-            return
-
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
-
-        if not user:
-            emit("error", {"message": "User not found"})
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
         household_id = data.get("household_id")
@@ -572,47 +684,58 @@ def handle_typing_start(data):
             emit("error", {"message": "Household ID required"})
             return
 
-        # Verify user is a member of this household
-        is_member = (
-            db.session.query(user_households)
-            .filter_by(user_id=user_id, household_id=household_id)
-            .first()
-        )
-
-        if not is_member:
+        refresh_socket_households()
+        if not socket_has_role(household_id):
             emit("error", {"message": "Not a household member"})
             return
 
-        # Broadcast typing status to all users in the household (except sender)
-        room = f"household_{household_id}"
+        since = int(data.get("since", 0))
+        limit = min(max(int(data.get("limit", 100)), 1), MAX_MESSAGES_PER_PAGE)
         emit(
-            "user_typing",
+            "message_changes",
             {
-                "user_id": user_id,
-                "user_email": user.email,
-                "user_name": getattr(user, "name", user.email.split("@")[0]),
+                "household_id": household_id,
+                **message_changes_to_dict(
+                    household_id, since, limit, data.get("compact", False)
+                ),
             },
-            room=room,
-            include_self=False,
         )
 
     except Exception as e:
         emit("error", {"message": str(e)})
 
 
-@socketio.on("typing_stop")
-def handle_typing_stop(data):
+@socketio.on("typing_start")
+def handle_typing_start(data):
     try:
-        token = data.get("token")
-        if not token:
-            emit("error", {"message": "Token required"})
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
-        user_id = verify_jwt_token(token)
-        user = User.query.get(user_id)
+        household_id = data.get("household_id")
+        if not household_id:
+            emit("error", {"message": "Household ID required"})
+            return
 
-        if not user:
-            emit("error", {"message": "User not found"})
+        # Verify user is still a member; typing is broadcast to the room
+        refresh_socket_households()
+        if not socket_has_role(household_id):
+            emit("error", {"message": "Not a household member"})
+            return
+
+        # Recorded in memory; the aggregator broadcasts who is typing each tick
+        email = session["email"]
+        typing_aggregator.start_typing(household_id, user_id, email.split("@")[0])
+
+    except Exception as e:
+        emit("error", {"message": str(e)})
+
+
+@socketio.on("typing_stop")
+def handle_typing_stop(data):
+    try:
+        user_id = get_socket_user_id(data)
+        if not user_id:
             return
 
         household_id = data.get("household_id")
@@ -620,9 +743,7 @@ def handle_typing_stop(data):
             emit("error", {"message": "Household ID required"})
             return
 
-        # Broadcast typing stopped to all users in the household
-        room = f"household_{household_id}"
-        emit("user_typing_stopped", {"user_id": user_id}, room=room, include_self=False)
+        typing_aggregator.stop_typing(household_id, user_id)
 
     except Exception as e:
         emit("error", {"message": str(e)})
@@ -1,7 +1,18 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models.models import User, Household, user_households
-from ..utils.auth_utils import check_household_permission
+from ..utils.auth_utils import (
+    check_household_permission,
+    get_household_role,
+    invalidate_household_membership,
+)
+from ..utils.etag_utils import (
+    bump_household_version,
+    etag_response,
+    household_etag,
+    not_modified,
+)
+from ..utils.presence_utils import notify_membership_changed
 from ..extensions import db
 import secrets
 import datetime
@@ -74,13 +85,7 @@ def get_household(household_id):
     user = User.query.get(current_user_id)
 
     # Check if user is a member of this household
-    is_member = (
-        db.session.query(user_households)
-        .filter_by(user_id=user.id, household_id=household_id)
-        .first()
-    )
-
-    if not is_member:
+    if not get_household_role(user.id, household_id):
         return jsonify({"error": "Not a member of this household"}), 403
 
     household = Household.query.get(household_id)
@@ -179,13 +184,7 @@ def get_active_household():
         active_household_id = user.preferences["active_household"]
 
         # Verify user still has access to this household
-        household_access = (
-            db.session.query(user_households)
-            .filter_by(user_id=user.id, household_id=active_household_id)
-            .first()
-        )
-
-        if not household_access:
+        if not get_household_role(user.id, active_household_id):
             active_household_id = None
 
     # If no active household set, get the first household
@@ -287,15 +286,15 @@ def get_household_members(household_id):
     user = User.query.get(current_user_id)
 
     # Check if user is a member of this household
-    is_member = (
-        db.session.query(user_households)
-        .filter_by(user_id=user.id, household_id=household_id)
-        .first()
-    )
-
-    if not is_member:
+    if not get_household_role(user.id, household_id):
         return jsonify({"error": "Not a member of this household"}), 403
 
+    # Answer revalidations from the household version alone
+    etag = household_etag(household_id, user.id)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     # Get all members with their roles
     members_query = (
         db.session.query(User, user_households.c.role, user_households.c.joined_at)
@@ -321,7 +320,7 @@ def get_household_members(household_id):
         for member in members_query
     ]
 
-    return jsonify(members_list), 200
+    return etag_response(jsonify(members_list), etag)
 
 
 # Update member role
@@ -339,13 +338,7 @@ def update_member_role(household_id, member_id):
         return jsonify({"error": "Admin privileges required"}), 403
 
     # Check if target user exists and is a member
-    target_membership = (
-        db.session.query(user_households)
-        .filter_by(user_id=member_id, household_id=household_id)
-        .first()
-    )
-
-    if not target_membership:
+    if not get_household_role(member_id, household_id):
         return jsonify({"error": "Member not found in household"}), 404
 
     # Update the role
@@ -362,7 +355,10 @@ def update_member_role(household_id, member_id):
             )
             .values(role=new_role)
         )
+        bump_household_version(household_id)
         db.session.commit()
+        invalidate_household_membership(member_id, household_id)
+        notify_membership_changed(member_id, household_id, new_role)
         return jsonify({"message": "Role updated successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -413,13 +409,7 @@ def join_by_invitation():
         return jsonify({"error": "Household not found"}), 404
 
     # Check if already a member
-    existing_membership = (
-        db.session.query(user_households)
-        .filter_by(user_id=user.id, household_id=household.id)
-        .first()
-    )
-
-    if existing_membership:
+    if get_household_role(user.id, household.id):
         return jsonify({"error": "Already a member of this household"}), 409
 
     try:
@@ -431,7 +421,9 @@ def join_by_invitation():
                 joined_at=datetime.datetime.utcnow(),
             )
         )
+        bump_household_version(household.id)
         db.session.commit()
+        invalidate_household_membership(user.id, household.id)
         return (
             jsonify(
                 {
@@ -479,7 +471,10 @@ def remove_member(household_id, member_id):
         if result.rowcount == 0:
             return jsonify({"error": "Member not found in household"}), 404
 
+        bump_household_version(household_id)
         db.session.commit()
+        invalidate_household_membership(member_id, household_id)
+        notify_membership_changed(member_id, household_id)
 
         # If removing self, return appropriate message
         if is_self:
@@ -508,6 +503,13 @@ def delete_household(household_id):
         return jsonify({"error": "Household not found"}), 404
 
     try:
+        member_ids = db.session.execute(
+            db.select(user_households.c.user_id).where(
+                user_households.c.household_id == household_id
+            )
+        ).scalars()
+        member_ids = list(member_ids)
+
         # First delete all membership associations
         db.session.execute(
             user_households.delete().where(
@@ -518,6 +520,9 @@ def delete_household(household_id):
         # Then delete the household itself
         db.session.delete(household)
         db.session.commit()
+        invalidate_household_membership(household_id=household_id)
+        for member_id in member_ids:
+            notify_membership_changed(member_id, household_id)
 
         return jsonify({"message": "Household successfully deleted"}), 200
     except Exception as e:
@@ -1,6 +1,12 @@
+from collections import Counter
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models.models import Notification, User, NotificationSettings
+from ..utils.notification_utils import (
+    adjust_unread_counts,
+    get_unread_counts,
+    notification_dispatcher,
+)
 from ..extensions import db
 
 notification_bp = Blueprint("notifications", __name__)
@@ -70,7 +76,9 @@ def mark_notification_read(notification_id):
         id=notification_id, user_id=current_user_id
     ).first_or_404()
 
-    notification.is_read = True
+    if not notification.is_read:
+        notification.is_read = True
+        adjust_unread_counts({(current_user_id, notification.household_id): -1})
     db.session.commit()
 
     return jsonify({"success": True})
@@ -85,16 +93,27 @@ def mark_all_notifications_read():
     # Optional filter by household
     household_id = request.json.get("household_id")
 
-    query = Notification.query.filter_by(user_id=current_user_id, is_read=False)
+    update = (
+        db.update(Notification)
+        .where(Notification.user_id == current_user_id, Notification.is_read == False)
+        .values(is_read=True)
+        .returning(Notification.household_id)
+    )
 
     if household_id:
-        query = query.filter_by(household_id=household_id)
+        update = update.where(Notification.household_id == household_id)
 
-    notification_count = query.update({Notification.is_read: True})
+    # Counters drop by exactly the rows this update marked read
+    marked = Counter(db.session.execute(update).scalars())
+    adjust_unread_counts(
+        {
+            (current_user_id, marked_household): -n
+            for marked_household, n in marked.items()
+        }
+    )
     db.session.commit()
-    socketio.emit("notification_count", {"count": notification_count})
 
-    return jsonify({"success": True, "count": notification_count})
+    return jsonify({"success": True, "count": sum(marked.values())})
 
 
 @notification_bp.route("/notifications/unread-count", methods=["GET"])
@@ -106,12 +125,12 @@ def get_unread_notification_count():
     # Optional filter by household
     household_id = request.args.get("household_id")
 
-    query = Notification.query.filter_by(user_id=current_user_id, is_read=False)
-
+    # Served from the maintained counters instead of counting rows
+    counts = get_unread_counts(current_user_id)
     if household_id:
-        query = query.filter_by(household_id=household_id)
-
-    count = query.count()
+        count = counts["households"].get(household_id, 0)
+    else:
+        count = counts["count"]
 
     return jsonify({"unread_count": count})
 
@@ -192,7 +211,21 @@ def delete_notification(notification_id):
         id=notification_id, user_id=current_user_id
     ).first_or_404()
 
+    if not notification.is_read:
+        adjust_unread_counts({(current_user_id, notification.household_id): -1})
     db.session.delete(notification)
     db.session.commit()
 
     return jsonify({"success": True, "message": "Notification deleted successfully"})
+
+
+@notification_bp.route("/admin/notifications/outbox", methods=["GET"])
+@jwt_required()
+def get_outbox_metrics():
+    """Queue depth and dispatch lag of the notification outbox (admin only)"""
+    user = User.query.get(get_jwt_identity())
+
+    if user.role != "admin":
+        return jsonify({"error": "Admin privileges required"}), 403
+
+    return jsonify(notification_dispatcher.metrics())
@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm.attributes import flag_modified
 from datetime import datetime
-from ..models.models import Poll, Vote, User, Household, Notification
+from ..models.models import Poll, Vote, User
 from ..utils.auth_utils import check_household_permission
+from ..utils.badge_utils import evaluate_badges
+from ..utils.etag_utils import etag_response, household_etag, not_modified
+from ..utils.notification_utils import enqueue_notification
 from ..extensions import db, socketio
 
 poll_bp = Blueprint("polls", __name__)
@@ -35,20 +39,17 @@ def create_poll(household_id):
             household_id=household_id,
         )
         db.session.add(new_poll)
-        db.session.commit()
+        db.session.flush()
 
-        # Notify household members
-        for member in Household.query.get(household_id).members:
-            if member.id != user.id:  # Don't notify creator
-                notification = Notification(
-                    type="new_poll",
-                    content=f"New poll: {data['question']}",
-                    user_id=member.id,
-                    household_id=household_id,
-                    reference_type="poll",
-                    reference_id=new_poll.id,
-                )
-                db.session.add(notification)
+        # Queue notifications for household members in the same transaction
+        enqueue_notification(
+            household_id,
+            "new_poll",
+            f"New poll: {data['question']}",
+            reference_type="poll",
+            reference_id=new_poll.id,
+            exclude_user_ids=[user.id],  # Don't notify creator
+        )
         db.session.commit()
 
         # Emit WebSocket event
@@ -84,6 +85,13 @@ def get_polls(household_id):
 
     # Filter parameters
     status = request.args.get("status", "active")  # active, expired, all
+
+    # Answer revalidations from the household version alone
+    etag = household_etag(household_id, user.id, time_dependent=status != "all")
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
 
@@ -106,7 +114,7 @@ def get_polls(household_id):
         for vote in Vote.query.filter_by(user_id=user.id).all()
     }
 
-    return (
+    return etag_response(
         jsonify(
             {
                 "polls": [
@@ -127,7 +135,7 @@ def get_polls(household_id):
                 "per_page": polls.per_page,
             }
         ),
-        200,
+        etag,
     )
 
 
@@ -172,7 +180,9 @@ def cast_vote(poll_id):
 
         # Increment count for selected option
         poll.options[selected_option] += 1
+        flag_modified(poll, "options")  # In-place JSON changes are not tracked
 
+        awarded_badges = evaluate_badges(user.id, poll.household_id, "vote_cast")
         db.session.commit()
 
         # Emit WebSocket event with updated results
@@ -188,6 +198,7 @@ def cast_vote(poll_id):
                     "message": "Vote recorded",
                     "poll_id": poll.id,
                     "option": selected_option,
+                    "badges_awarded": [badge.name for badge in awarded_badges],
                 }
             ),
             200,
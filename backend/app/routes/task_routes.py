@@ -1,17 +1,33 @@
-from datetime import datetime
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, abort, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.models import Notification, Task, RecurringTaskRule, User
+from ..models.models import Task, RecurringTaskRule, User
 from ..utils.auth_utils import check_household_permission
+from ..utils.assignment_utils import auto_assign_task
+from ..utils.badge_utils import evaluate_badges
+from ..utils.etag_utils import etag_response, household_etag, not_modified
+from ..utils.notification_utils import add_notification
+from ..utils.streak_utils import record_completion, active_streak
 from ..utils.task_utils import (
-    auto_assign_task,
-    generate_recurring_tasks,
-    calculate_streak,
+    TASK_STATUSES,
+    bulk_create_tasks,
+    bulk_update_tasks,
+    count_tasks_by_status,
+    expand_occurrences,
+    get_task_or_occurrence,
+    materialize_due_occurrences,
+    schedule_rule,
+    task_status,
+    task_status_filter,
+    valid_interval_days,
 )
 from ..extensions import db
 
 task_bp = Blueprint("tasks", __name__)
 
+# Longest window of task occurrences listed in one request
+MAX_OCCURRENCE_WINDOW_DAYS = 366
+
 
 @task_bp.route("/households/<household_id>/tasks", methods=["POST"])
 @jwt_required()
@@ -24,9 +40,14 @@ def create_task(household_id):
     if not check_household_permission(current_user, household_id, "member"):
         return jsonify({"error": "Not a household member"}), 403
 
+    if data.get("is_recurring") and not valid_interval_days(data.get("interval_days")):
+        return jsonify({"error": "interval_days must be a positive integer"}), 400
+
     try:
         # Auto-assign task
-        assigned_to = auto_assign_task(household_id, data.get("preferred_assignee"))
+        assigned_to = auto_assign_task(
+            household_id, data.get("title"), data.get("preferred_assignee")
+        )
 
         new_task = Task(
             title=data["title"],
@@ -49,7 +70,7 @@ def create_task(household_id):
             recurrence_rule = RecurringTaskRule(
                 task_id=new_task.id,
                 interval_days=data["interval_days"],
-                anchor_date=new_task.due_date,
+                anchor_date=new_task.due_date or datetime.utcnow(),
                 end_date=(
                     datetime.fromisoformat(data["end_date"])
                     if data.get("end_date")
@@ -58,8 +79,8 @@ def create_task(household_id):
             )
             db.session.add(recurrence_rule)
 
-            # Generate future instances
-            generate_recurring_tasks(new_task.id, recurrence_rule)
+            # Later occurrences stay virtual until they come due
+            schedule_rule(recurrence_rule)
 
         db.session.commit()
 
@@ -79,6 +100,91 @@ def create_task(household_id):
         return jsonify({"error": str(e)}), 500
 
 
+def bulk_items(data):
+    """The task list of a bulk request body, or an error response"""
+    items = data.get("tasks") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"error": "tasks must be a non-empty list"}), 400)
+
+    limit = current_app.config["BULK_TASK_LIMIT"]
+    if len(items) > limit:
+        return None, (jsonify({"error": f"At most {limit} tasks per request"}), 413)
+
+    return items, None
+
+
+@task_bp.route("/households/<household_id>/tasks/bulk", methods=["POST"])
+@jwt_required()
+def create_tasks_bulk(household_id):
+    current_user = User.query.get(get_jwt_identity())
+    if not check_household_permission(current_user, household_id, "member"):
+        return jsonify({"error": "Not a household member"}), 403
+
+    items, error = bulk_items(request.get_json(silent=True))
+    if error:
+        return error
+
+    try:
+        results = bulk_create_tasks(household_id, current_user.id, items)
+        db.session.commit()
+
+        return (
+            jsonify(
+                {
+                    "created": sum(result["code"] == 201 for result in results),
+                    "results": results,
+                }
+            ),
+            200,
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@task_bp.route("/households/<household_id>/tasks/bulk", methods=["PATCH"])
+@jwt_required()
+def update_tasks_bulk(household_id):
+    current_user = User.query.get(get_jwt_identity())
+    if not check_household_permission(current_user, household_id, "member"):
+        return jsonify({"error": "Not a household member"}), 403
+
+    items, error = bulk_items(request.get_json(silent=True))
+    if error:
+        return error
+
+    try:
+        is_admin = check_household_permission(current_user, household_id, "admin")
+        results, completed = bulk_update_tasks(
+            household_id, current_user.id, is_admin, items
+        )
+
+        streak = None
+        awarded_badges = []
+        if completed:
+            streak = record_completion(current_user.id, datetime.utcnow())
+            awarded_badges = evaluate_badges(
+                current_user.id, household_id, "task_completed"
+            )
+        db.session.commit()
+
+        return (
+            jsonify(
+                {
+                    "updated": sum(result["code"] == 200 for result in results),
+                    "completed": completed,
+                    "results": results,
+                    "streak": active_streak(streak) if streak else None,
+                    "badges_awarded": [badge.name for badge in awarded_badges],
+                }
+            ),
+            200,
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
 @task_bp.route("/households/<household_id>/tasks", methods=["GET"])
 @jwt_required()
 def get_household_tasks(household_id):
@@ -86,6 +192,16 @@ def get_household_tasks(household_id):
     if not check_household_permission(current_user, household_id, "member"):
         return jsonify({"error": "Not a household member"}), 403
 
+    # Recurring occurrences that came due get their rows before listing
+    if materialize_due_occurrences(household_id):
+        db.session.commit()
+
+    # Answer revalidations from the household version alone
+    etag = household_etag(household_id, current_user.id, time_dependent=True)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     # Filter parameters
     status = request.args.get("status", "all")
     assigned_to = request.args.get("assignedTo")
@@ -94,15 +210,19 @@ def get_household_tasks(household_id):
     per_page = request.args.get("per_page", 10, type=int)
     include_completed = request.args.get("include_completed", "true").lower() == "true"
 
+    if status != "all" and status not in TASK_STATUSES:
+        return (
+            jsonify(
+                {"error": f"status must be all or one of {', '.join(TASK_STATUSES)}"}
+            ),
+            400,
+        )
+
     query = Task.query.filter_by(household_id=household_id)
 
     # Apply filters
     if status != "all":
-        if status == "completed":
-            query = query.filter(Task.completed == True)
-        elif status == "pending":
-            query = query.filter(Task.completed == False)
-            # No overdue check as that's determined at runtime
+        query = query.filter(task_status_filter(status, datetime.utcnow()))
     elif not include_completed:
         query = query.filter(Task.completed == False)
 
@@ -123,16 +243,97 @@ def get_household_tasks(household_id):
 
     tasks = query.paginate(page=page, per_page=per_page)
 
-    return (
+    return etag_response(
         jsonify(
             {
-                "tasks": [task_to_dict(t) for t in tasks.items],
+                "tasks": tasks_to_dicts(tasks.items),
                 "total": tasks.total,
                 "page": tasks.page,
                 "per_page": tasks.per_page,
             }
         ),
-        200,
+        etag,
+    )
+
+
+@task_bp.route("/households/<household_id>/tasks/counts", methods=["GET"])
+@jwt_required()
+def get_household_task_counts(household_id):
+    current_user = User.query.get(get_jwt_identity())
+    if not check_household_permission(current_user, household_id, "member"):
+        return jsonify({"error": "Not a household member"}), 403
+
+    if materialize_due_occurrences(household_id):
+        db.session.commit()
+
+    etag = household_etag(household_id, current_user.id, time_dependent=True)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    return etag_response(
+        jsonify(count_tasks_by_status(household_id, datetime.utcnow())), etag
+    )
+
+
+@task_bp.route("/households/<household_id>/tasks/occurrences", methods=["GET"])
+@jwt_required()
+def get_task_occurrences(household_id):
+    current_user = User.query.get(get_jwt_identity())
+    if not check_household_permission(current_user, household_id, "member"):
+        return jsonify({"error": "Not a household member"}), 403
+
+    try:
+        start = (
+            datetime.fromisoformat(request.args["start"])
+            if request.args.get("start")
+            else datetime.utcnow()
+        )
+        end = (
+            datetime.fromisoformat(request.args["end"])
+            if request.args.get("end")
+            else start + timedelta(days=30)
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid start or end date"}), 400
+
+    if not start < end <= start + timedelta(days=MAX_OCCURRENCE_WINDOW_DAYS):
+        return (
+            jsonify(
+                {
+                    "error": "end must be after start and at most "
+                    f"{MAX_OCCURRENCE_WINDOW_DAYS} days later"
+                }
+            ),
+            400,
+        )
+
+    if materialize_due_occurrences(household_id):
+        db.session.commit()
+
+    etag = household_etag(household_id, current_user.id, time_dependent=True)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    # Task rows due in the window, plus recurring occurrences not created yet
+    tasks = Task.query.filter(
+        Task.household_id == household_id,
+        Task.due_date >= start,
+        Task.due_date < end,
+    ).all()
+    occurrences = expand_occurrences(household_id, start, end)
+
+    serialized = [{**task, "is_virtual": False} for task in tasks_to_dicts(tasks)] + [
+        {**task, "is_virtual": True} for task in tasks_to_dicts(occurrences)
+    ]
+    serialized.sort(key=lambda task: task["due_date"])
+
+    return etag_response(
+        jsonify(
+            {"tasks": serialized, "start": start.isoformat(), "end": end.isoformat()}
+        ),
+        etag,
     )
 
 
@@ -140,7 +341,7 @@ def get_household_tasks(household_id):
 @jwt_required()
 def complete_task(task_id):
     current_user = User.query.get(get_jwt_identity())
-    task = Task.query.get_or_404(task_id)
+    task = get_task_or_occurrence(task_id) or abort(404)
 
     if task.completed:
         return jsonify({"error": "Task already completed"}), 400
@@ -154,18 +355,19 @@ def complete_task(task_id):
     try:
         task.completed = True
         task.completed_at = datetime.utcnow()
+        streak = record_completion(current_user.id, task.completed_at)
 
-        # Check for recurring task regeneration
-        if task.recurring_rule:
-            generate_recurring_tasks(task.id, task.recurring_rule)
-
+        awarded_badges = evaluate_badges(
+            current_user.id, task.household_id, "task_completed"
+        )
         db.session.commit()
 
         return (
             jsonify(
                 {
                     "message": "Task marked complete",
-                    "streak": calculate_streak(current_user.id),
+                    "streak": active_streak(streak),
+                    "badges_awarded": [badge.name for badge in awarded_badges],
                 }
             ),
             200,
@@ -179,7 +381,7 @@ def complete_task(task_id):
 @jwt_required()
 def request_swap(task_id):
     current_user = User.query.get(get_jwt_identity())
-    task = Task.query.get_or_404(task_id)
+    task = get_task_or_occurrence(task_id) or abort(404)
     data = request.get_json()
 
     if not check_household_permission(current_user, task.household_id, "member"):
@@ -194,7 +396,7 @@ def request_swap(task_id):
     try:
         # Verify swap request (could add approval workflow here)
         task.assigned_to = new_assignee.id
-        notification = Notification(
+        add_notification(
             type="task_assignment",
             content=f"Task '{task.title}' has been assigned to you",
             user_id=new_assignee.id,
@@ -202,7 +404,6 @@ def request_swap(task_id):
             reference_type="task",
             reference_id=task.id,
         )
-        db.session.add(notification)
         db.session.commit()
 
         return (
@@ -225,14 +426,14 @@ def get_user_tasks(user_id):
         return jsonify({"error": "Unauthorized access"}), 403
 
     tasks = Task.query.filter_by(assigned_to=user_id).all()
-    return jsonify([task_to_dict(t) for t in tasks]), 200
+    return jsonify(tasks_to_dicts(tasks)), 200
 
 
 @task_bp.route("/tasks/<task_id>", methods=["DELETE"])
 @jwt_required()
 def delete_task(task_id):
     current_user = User.query.get(get_jwt_identity())
-    task = Task.query.get_or_404(task_id)
+    task = get_task_or_occurrence(task_id) or abort(404)
 
     # Authorization: Task creator or household admin
     if task.created_by != current_user.id and not check_household_permission(
@@ -241,9 +442,12 @@ def delete_task(task_id):
         return jsonify({"error": "Unauthorized"}), 403
 
     try:
-        # Delete recurring rules first
+        # Delete recurring rules first; created occurrences stay as plain tasks
         if task.recurring_rule:
             db.session.delete(task.recurring_rule)
+            Task.query.filter_by(recurrence_parent_id=task.id).update(
+                {"recurrence_parent_id": None}, synchronize_session=False
+            )
 
         db.session.delete(task)
         db.session.commit()
@@ -254,6 +458,11 @@ def delete_task(task_id):
 
 
 def task_to_dict(task):
+    return tasks_to_dicts([task])[0]
+
+
+def tasks_to_dicts(tasks):
+    """Serialize tasks, resolving every assignee name with a single query"""
     # Map backend frequency to frontend frequency
     frequency_mapping = {
         "one_time": "once",
@@ -262,40 +471,39 @@ def task_to_dict(task):
         "monthly": "monthly",
     }
 
-    # Determine status based on completed and due date
-    status = "completed" if task.completed else "pending"
-    if not task.completed and task.due_date and task.due_date < datetime.utcnow():
-        status = "overdue"
-
-    # Find the assigned user's name if available
-    assigned_to_name = None
-    if task.assigned_to:
-        assigned_user = User.query.get(task.assigned_to)
-        if assigned_user:
-            assigned_to_name = (
-                assigned_user.name
-                if hasattr(assigned_user, "name")
-                else assigned_user.email
-            )
+    # Find the assigned users' names in one round trip
+    assignee_ids = {task.assigned_to for task in tasks if task.assigned_to}
+    assignee_names = {}
+    if assignee_ids:
+        assignee_names = dict(
+            db.session.query(User.id, User.email).filter(User.id.in_(assignee_ids))
+        )
 
-    return {
-        "id": task.id,
-        "title": task.title,
-        "description": getattr(task, "description", ""),
-        "status": status,
-        "due_date": task.due_date.isoformat() if task.due_date else None,
-        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-        "created_at": (
-            task.created_at.isoformat()
-            if hasattr(task, "created_at")
-            else datetime.utcnow().isoformat()
-        ),
-        "created_by": task.created_by,
-        "assigned_to": task.assigned_to,
-        "assigned_to_name": assigned_to_name,
-        "household_id": task.household_id,
-        "frequency": frequency_mapping.get(task.frequency, "once"),
-    }
+    now = datetime.utcnow()
+    serialized = []
+    for task in tasks:
+        serialized.append(
+            {
+                "id": task.id,
+                "title": task.title,
+                "description": getattr(task, "description", ""),
+                "status": task_status(task, now),
+                "due_date": task.due_date.isoformat() if task.due_date else None,
+                "completed_at": (
+                    task.completed_at.isoformat() if task.completed_at else None
+                ),
+                "created_at": (
+                    task.created_at.isoformat() if task.created_at else now.isoformat()
+                ),
+                "created_by": task.created_by,
+                "assigned_to": task.assigned_to,
+                "assigned_to_name": assignee_names.get(task.assigned_to),
+                "household_id": task.household_id,
+                "frequency": frequency_mapping.get(task.frequency, "once"),
+            }
+        )
+
+    return serialized
 
 
 @task_bp.route("/tasks/<task_id>", methods=["PATCH"])
@@ -303,7 +511,7 @@ def task_to_dict(task):
 def update_task(task_id):
     current_user_id = get_jwt_identity()
     current_user = User.query.get(current_user_id)
-    task = Task.query.get_or_404(task_id)
+    task = get_task_or_occurrence(task_id) or abort(404)
     data = request.get_json()
 
     # Authorization: Task creator or household admin
@@ -312,6 +520,9 @@ def update_task(task_id):
     ):
         return jsonify({"error": "Not authorized to update this task"}), 403
 
+    if "interval_days" in data and not valid_interval_days(data["interval_days"]):
+        return jsonify({"error": "interval_days must be a positive integer"}), 400
+
     try:
         # Update basic task properties
         if "title" in data:
@@ -349,12 +560,13 @@ def update_task(task_id):
                             if data["end_date"]
                             else None
                         )
+                    schedule_rule(task.recurring_rule)
                 else:
                     # Create new rule
                     recurrence_rule = RecurringTaskRule(
                         task_id=task.id,
                         interval_days=data.get("interval_days", 7),  # Default weekly
-                        anchor_date=task.due_date,
+                        anchor_date=task.due_date or datetime.utcnow(),
                         end_date=(
                             datetime.fromisoformat(data["end_date"])
                             if data.get("end_date")
@@ -362,6 +574,7 @@ def update_task(task_id):
                         ),
                     )
                     db.session.add(recurrence_rule)
+                    schedule_rule(recurrence_rule)
             elif task.recurring_rule:
                 # Remove recurring rule if task is no longer recurring
                 db.session.delete(task.recurring_rule)
@@ -379,7 +592,7 @@ def update_task(task_id):
                     return jsonify({"error": "Invalid assignee"}), 400
 
                 # Create notification for new assignee
-                notification = Notification(
+                add_notification(
                     type="task_assignment",
                     content=f"Task '{task.title}' has been assigned to you",
                     user_id=new_assignee_id,
@@ -387,7 +600,6 @@ def update_task(task_id):
                     reference_type="task",
                     reference_id=task.id,
                 )
-                db.session.add(notification)
 
             task.assigned_to = new_assignee_id
 
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import case, distinct, extract, func
+from ..extensions import db
+from ..models.models import Household, Task, user_badges, user_households
+from .cache_utils import TTLCache
+
+# Household-wide aggregates by (household_id, version), shared by every
+# member's analytics request
+analytics_cache = TTLCache()
+
+
+def get_household_aggregates(household_id):
+    """
+    Return the household-wide analytics inputs, cached briefly per household.
+
+    The aggregates scan the household's task history, so repeated dashboard
+    loads are served from the cache. Entries are keyed by the household's
+    version, which every task or membership write bumps, so any write made
+    by any worker is seen on the next load.
+    """
+    version = (
+        db.session.query(Household.version).filter(Household.id == household_id)
+    ).scalar()
+
+    def compute():
+        now = datetime.utcnow()
+        days = current_app.config["ANALYTICS_HEATMAP_DAYS"]
+        return {
+            "summary": get_task_summary(household_id, now),
+            "member_completions": get_member_completions(household_id),
+            "daily_completions": get_daily_completions(household_id, days, now),
+        }
+
+    return analytics_cache.get_or_compute((household_id, version), compute)
+
+
+def _hours_between(start, end):
+    """SQL expression for the number of hours between two datetime columns"""
+    if db.engine.dialect.name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 24
+    return extract("epoch", end - start) / 3600
+
+
+def get_task_summary(household_id, now=None):
+    """
+    Aggregate a household's task totals in a single query.
+
+    Returns:
+        dict: total, completed and overdue counts, the number of distinct
+        assignees and the average completion time in hours
+    """
+    now = now or datetime.utcnow()
+
+    row = (
+        db.session.query(
+            func.count(Task.id).label("total"),
+            func.sum(case((Task.completed == True, 1), else_=0)).label("completed"),
+            func.sum(
+                case(
+                    ((Task.completed == False) & (Task.due_date < now), 1),
+                    else_=0,
+                )
+            ).label("overdue"),
+            func.count(distinct(Task.assigned_to)).label("active_members"),
+            func.avg(
+                case(
+                    (
+                        (Task.completed == True) & Task.completed_at.isnot(None),
+                        _hours_between(Task.created_at, Task.completed_at),
+                    ),
+                )
+            ).label("avg_completion_hours"),
+        )
+        .filter(Task.household_id == household_id)
+        .one()
+    )
+
+    return {
+        "total": row.total or 0,
+        "completed": int(row.completed or 0),
+        "overdue": int(row.overdue or 0),
+        "active_members": row.active_members or 0,
+        "avg_completion_hours": float(row.avg_completion_hours or 0),
+    }
+
+
+def get_member_completions(household_id):
+    """
+    Count completed tasks per assignee, most active first.
+
+    Returns:
+        list: (user_id, completed_count) tuples
+    """
+    completions = func.count(Task.id).label("completed")
+    return [
+        (row.assigned_to, row.completed)
+        for row in db.session.query(Task.assigned_to, completions)
+        .filter(
+            Task.household_id == household_id,
+            Task.completed == True,
+            Task.assigned_to.isnot(None),
+        )
+        .group_by(Task.assigned_to)
+        .order_by(completions.desc())
+    ]
+
+
+def get_daily_completions(household_id, days, now=None):
+    """
+    Build a per-day series of completed tasks for the last `days` days.
+
+    Returns:
+        list: (date, count) tuples, oldest first, with zero-filled gaps
+    """
+    today = (now or datetime.utcnow()).date()
+    first_day = today - timedelta(days=days - 1)
+
+    day = func.date(Task.completed_at).label("day")
+    counts = {
+        str(row.day)[:10]: row.count
+        for row in db.session.query(day, func.count(Task.id).label("count"))
+        .filter(
+            Task.household_id == household_id,
+            Task.completed == True,
+            Task.completed_at >= datetime.combine(first_day, datetime.min.time()),
+        )
+        .group_by(day)
+    }
+
+    series = []
+    for offset in range(days):
+        date = first_day + timedelta(days=offset)
+        series.append((date, counts.get(date.isoformat(), 0)))
+    return series
+
+
+def count_household_members(household_id):
+    return (
+        db.session.query(func.count())
+        .select_from(user_households)
+        .filter(user_households.c.household_id == household_id)
+        .scalar()
+    )
+
+
+def count_user_badges(user_id):
+    return (
+        db.session.query(func.count())
+        .select_from(user_badges)
+        .filter(user_badges.c.user_id == user_id)
+        .scalar()
+    )
@@ -0,0 +1,207 @@
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, func, inspect, or_
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.models import Task, User, user_households
+
+# Household roles that take auto-assigned tasks
+ASSIGNABLE_ROLES = ("member", "admin")
+
+
+def _likes_title(preferences, title):
+    """True if one of the member's likes matches a word of the task title"""
+    likes = (preferences or {}).get("likes") or []
+    words = [
+        word for word in re.findall(r"\w+", (title or "").lower()) if len(word) > 2
+    ]
+    for like in likes:
+        like = str(like).lower()
+        if any(word.startswith(like) or like.startswith(word) for word in words):
+            return True
+    return False
+
+
+def _load_members(household_ids):
+    """Assignment state of every assignable member, one query for all households"""
+    members = {household_id: [] for household_id in household_ids}
+    rows = db.session.execute(
+        db.select(
+            user_households.c.household_id,
+            user_households.c.user_id,
+            user_households.c.open_tasks,
+            user_households.c.last_assigned_at,
+            User.preferences,
+        )
+        .join(User, User.id == user_households.c.user_id)
+        .where(
+            user_households.c.household_id.in_(members),
+            user_households.c.role.in_(ASSIGNABLE_ROLES),
+        )
+    )
+    for row in rows:
+        members[row.household_id].append(row._asdict())
+    return members
+
+
+def _pick(members, title, assigned_at, preferred_user_id=None):
+    """
+    Choose the member to get a task and update their state in place.
+
+    A preferred member gets it if they can take tasks. Otherwise fewest
+    open tasks wins, counting ASSIGNMENT_PREFERENCE_WEIGHT fewer for members
+    who like the task; ties go to whoever got a task longest ago.
+    """
+    if not members:
+        return None
+
+    weight = current_app.config["ASSIGNMENT_PREFERENCE_WEIGHT"]
+    member = next((m for m in members if m["user_id"] == preferred_user_id), None)
+    member = member or min(
+        members,
+        key=lambda m: (
+            m["open_tasks"] - (weight if _likes_title(m["preferences"], title) else 0),
+            m["last_assigned_at"] is not None,
+            m["last_assigned_at"] or datetime.min,
+            m["user_id"],
+        ),
+    )
+    member["open_tasks"] += 1
+    member["last_assigned_at"] = assigned_at
+    return member["user_id"]
+
+
+def auto_assign_task(household_id, title=None, preferred_user_id=None):
+    """
+    Choose the assignee of a new task from the household's assignment state.
+
+    Reads the members' open task counts and rotation cursors in one query;
+    the task history is never scanned. The counts move when the task is
+    flushed.
+    """
+    return choose_assignees([(household_id, title, preferred_user_id)])[0]
+
+
+def choose_assignees(tasks):
+    """
+    Choose assignees for a batch of new tasks, as if created one by one.
+
+    Args:
+        tasks (list): (household_id, title, preferred user id or None) per
+            task, in creation order
+
+    Returns:
+        list of user ids, None where the household has nobody to assign
+    """
+    members = _load_members({household_id for household_id, _, _ in tasks})
+    now = datetime.utcnow()
+    return [
+        _pick(
+            members[household_id],
+            title,
+            now + timedelta(microseconds=offset),
+            preferred_user_id,
+        )
+        for offset, (household_id, title, preferred_user_id) in enumerate(tasks)
+    ]
+
+
+def adjust_open_tasks(deltas, connection=None):
+    """
+    Apply changes to members' open task counts.
+
+    Members who gain tasks also move to the back of the rotation. ORM
+    writes to tasks are counted on flush; call this for Core writes.
+
+    Args:
+        deltas (dict): {(user_id, household_id): change in open tasks}
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    now = datetime.utcnow()
+    (connection or db.session.connection()).execute(
+        user_households.update()
+        .where(
+            user_households.c.user_id == db.bindparam("member_id"),
+            user_households.c.household_id == db.bindparam("member_household_id"),
+        )
+        .values(
+            open_tasks=user_households.c.open_tasks + db.bindparam("delta"),
+            last_assigned_at=func.coalesce(
+                db.bindparam("assigned_at", type_=db.DateTime),
+                user_households.c.last_assigned_at,
+            ),
+        ),
+        [
+            {
+                "member_id": user_id,
+                "member_household_id": household_id,
+                "delta": delta,
+                "assigned_at": now if delta > 0 else None,
+            }
+            for (user_id, household_id), delta in deltas.items()
+        ],
+    )
+
+
+def recount_open_tasks(household_ids=None):
+    """
+    Recompute open task counts from the tasks table.
+
+    Limited to household_ids when given.
+
+    Returns:
+        int: Number of memberships updated
+    """
+    open_count = (
+        db.select(func.count(Task.id))
+        .where(
+            Task.assigned_to == user_households.c.user_id,
+            Task.household_id == user_households.c.household_id,
+            or_(Task.completed == False, Task.completed.is_(None)),
+        )
+        .scalar_subquery()
+    )
+    update = user_households.update().values(open_tasks=open_count)
+    if household_ids is not None:
+        update = update.where(user_households.c.household_id.in_(household_ids))
+    return db.session.execute(update).rowcount
+
+
+def _open_key(task, committed):
+    """(assignee, household) a task counts towards, None if it is closed"""
+    state = inspect(task)
+    values = {}
+    for attr in ("assigned_to", "completed", "household_id"):
+        values[attr] = getattr(task, attr)
+        history = state.attrs[attr].history
+        if committed and history.has_changes():
+            values[attr] = history.deleted[0] if history.deleted else None
+
+    if values["assigned_to"] and not values["completed"]:
+        return values["assigned_to"], values["household_id"]
+    return None
+
+
+@event.listens_for(Session, "before_flush")
+def _count_open_tasks_on_flush(session, flush_context, instances):
+    deltas = Counter()
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Task):
+                deltas[_open_key(obj, committed=False)] += 1
+        for obj in session.deleted:
+            if isinstance(obj, Task):
+                deltas[_open_key(obj, committed=True)] -= 1
+        for obj in session.dirty:
+            if isinstance(obj, Task) and session.is_modified(obj):
+                deltas[_open_key(obj, committed=True)] -= 1
+                deltas[_open_key(obj, committed=False)] += 1
+
+    deltas.pop(None, None)
+    if any(deltas.values()):
+        adjust_open_tasks(deltas, session.connection())
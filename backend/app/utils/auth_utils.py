@@ -1,5 +1,106 @@
+from flask import g, has_app_context
 from ..extensions import db
 from ..models.models import user_households
+from .cache_utils import TTLCache
+
+# Define role hierarchy
+ROLE_HIERARCHY = {"member": 0, "admin": 1}
+
+
+# Household roles keyed by (user_id, household_id); None means "not a member".
+# Invalidations only reach this process, so other workers see a membership
+# change once their entry expires, after at most MEMBERSHIP_CACHE_TTL seconds.
+membership_cache = TTLCache(maxsize=10000, ttl=30)
+
+
+def get_household_role(user_id, household_id):
+    """
+    Look up a user's role in a household.
+
+    Lookups are memoized for the current request and backed by the
+    process-wide membership cache, so repeated permission checks cost at
+    most one query per (user, household) pair.
+
+    Args:
+        user_id (str): UUID of the user
+        household_id (str): UUID of the household
+
+    Returns:
+        str: The user's role ('admin' or 'member'), or None if not a member
+    """
+    if not user_id or not household_id:
+        return None
+
+    key = (user_id, household_id)
+    request_roles = None
+    if has_app_context():
+        request_roles = g.setdefault("_household_roles", {})
+        if key in request_roles:
+            return request_roles[key]
+
+    def load():
+        result = (
+            db.session.query(user_households.c.role)
+            .filter(
+                user_households.c.user_id == user_id,
+                user_households.c.household_id == household_id,
+            )
+            .first()
+        )
+        return result.role if result else None
+
+    role = membership_cache.get_or_compute(key, load)
+
+    if request_roles is not None:
+        request_roles[key] = role
+
+    return role
+
+
+def is_household_member(user, household_id):
+    """Check whether a user belongs to a household, regardless of role"""
+    if user is None:
+        return False
+
+    return get_household_role(user.id, household_id) is not None
+
+
+def get_user_household_roles(user_id):
+    """Return {household_id: role} for every household the user belongs to"""
+    return dict(
+        db.session.query(user_households.c.household_id, user_households.c.role).filter(
+            user_households.c.user_id == user_id
+        )
+    )
+
+
+def role_satisfies(user_role, required_role):
+    """Check whether a household role meets or exceeds the required role"""
+    if user_role is None:
+        return False
+
+    return ROLE_HIERARCHY.get(user_role, -1) >= ROLE_HIERARCHY.get(required_role, 0)
+
+
+def invalidate_household_membership(user_id=None, household_id=None):
+    """
+    Forget cached roles after a membership change.
+
+    Call this after the change has been committed. Passing only a
+    household_id drops every cached member of that household.
+    """
+
+    def matches(key):
+        return (user_id is None or key[0] == user_id) and (
+            household_id is None or key[1] == household_id
+        )
+
+    membership_cache.invalidate_where(matches)
+
+    if has_app_context() and "_household_roles" in g:
+        g._household_roles = {
+            key: role for key, role in g._household_roles.items() if not matches(key)
+        }
 
 
 def check_household_permission(user, household_id, required_role):
@@ -14,23 +115,11 @@ def check_household_permission(user, household_id, required_role):
     Returns:
         bool: True if user has permission, False otherwise
     """
-    # Get the user's role in this household
-    result = (
-        db.session.query(user_households.c.role)
-        .filter(
-            user_households.c.user_id == user.id,
-            user_households.c.household_id == household_id,
-        )
-        .first()
-    )
-
-    if not result:
-        return False  # User not in household
-
-    user_role = result.role
+    if user is None:
+        return False
 
-    # Define role hierarchy
-    ROLE_HIERARCHY = {"member": 0, "admin": 1}
+    # Get the user's role in this household
+    user_role = get_household_role(user.id, household_id)
 
     # Check if user's role meets or exceeds required role
-    return ROLE_HIERARCHY.get(user_role, -1) >= ROLE_HIERARCHY.get(required_role, 0)
+    return role_satisfies(user_role, required_role)
@@ -1,193 +1,191 @@
-from ..models.models import Badge, user_badges, Task, Message, Vote
+from ..models.models import (
+    Badge,
+    Message,
+    Notification,
+    Task,
+    Vote,
+    user_badges,
+    user_households,
+)
 from ..extensions import db
-from datetime import datetime, timedelta
-
-
-def check_badge_eligibility(user):
+from .cache_utils import TTLCache
+from .etag_utils import bump_household_version
+from .notification_utils import adjust_unread_counts
+from .streak_utils import calculate_streak
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import func
+
+# Badge rules: badge type -> (counter, threshold)
+BADGE_RULES = {
+    "3_day_streak": ("streak", 3),
+    "5_day_streak": ("streak", 5),
+    "7_day_streak": ("streak", 7),
+    "10_day_streak": ("streak", 10),
+    "14_day_streak": ("streak", 14),
+    "30_day_streak": ("streak", 30),
+    "5_tasks_completed": ("tasks_completed", 5),
+    "25_tasks_completed": ("tasks_completed", 25),
+    "task_master": ("tasks_completed", 50),
+    "100_tasks_completed": ("tasks_completed", 100),
+    "active_communicator": ("messages_sent", 10),  # 10+ messages
+    "poll_participant": ("votes_cast", 5),  # 5+ votes
+}
+
+# Counters that can change when each kind of activity happens
+BADGE_EVENT_COUNTERS = {
+    "task_completed": ("streak", "tasks_completed"),
+    "message_sent": ("messages_sent",),
+    "vote_cast": ("votes_cast",),
+}
+
+# Badge catalog keyed by Badge.type, shared by the process
+BadgeInfo = namedtuple("BadgeInfo", ["id", "type", "name", "description"])
+badge_catalog_cache = TTLCache(maxsize=1)
+
+
+def get_badge_catalog():
+    """Return {badge_type: BadgeInfo} for every badge, loaded once and cached"""
+
+    def load():
+        return {
+            row.type: BadgeInfo(row.id, row.type, row.name, row.description)
+            for row in db.session.query(
+                Badge.id, Badge.type, Badge.name, Badge.description
+            )
+        }
+
+    return badge_catalog_cache.get_or_compute("catalog", load)
+
+
+def invalidate_badge_catalog():
+    badge_catalog_cache.clear()
+
+
+def get_badge_counters(user_id, counters):
     """
-    Check if user is eligible for any badges and award them
-
-    Args:
-        user: User model instance
+    Read the requested activity counters for a user.
 
-    Returns:
-        List of newly awarded Badge instances
+    Count-based counters are fetched together in one query; the streak comes
+    from the maintained streak state.
     """
-    newly_awarded = []
-
-    # Get existing badges
-    existing_badges = set(
-        badge_id
-        for (badge_id,) in db.session.query(user_badges.c.badge_id)
-        .filter_by(user_id=user.id)
-        .all()
-    )
-
-    # Check task streak badges
-    streak_badges = check_streak_badges(user, existing_badges)
-    newly_awarded.extend(streak_badges)
-
-    # Check contribution badges
-    contribution_badges = check_contribution_badges(user, existing_badges)
-    newly_awarded.extend(contribution_badges)
-
-    # Check social badges
-    social_badges = check_social_badges(user, existing_badges)
-    newly_awarded.extend(social_badges)
-
-    return newly_awarded
-
-
-def check_streak_badges(user, existing_badges):
-    """Check and award badges based on task completion streaks"""
-    newly_awarded = []
-
-    # Calculate current streak
-    streak = calculate_streak(user.id)
-
-    # Define streak badge thresholds
-    streak_thresholds = {
-        "3_day_streak": 3,
-        "7_day_streak": 7,
-        "14_day_streak": 14,
-        "30_day_streak": 30,
+    values = {}
+
+    if "streak" in counters:
+        values["streak"] = calculate_streak(user_id)
+
+    count_queries = {
+        "tasks_completed": db.select(func.count(Task.id))
+        .where(Task.assigned_to == user_id, Task.completed == True)
+        .scalar_subquery(),
+        "messages_sent": db.select(func.count(Message.id))
+        .where(Message.user_id == user_id, Message.deleted_at.is_(None))
+        .scalar_subquery(),
+        "votes_cast": db.select(func.count())
+        .select_from(Vote)
+        .where(Vote.user_id == user_id)
+        .scalar_subquery(),
     }
+    requested = [name for name in count_queries if name in counters]
+    if requested:
+        row = db.session.execute(
+            db.select(*(count_queries[name].label(name) for name in requested))
+        ).one()
+        values.update(row._asdict())
 
-    # Check each threshold
-    for badge_type, threshold in streak_thresholds.items():
-        if streak >= threshold:
-            badge = Badge.query.filter_by(type=badge_type).first()
+    return values
 
-            if badge and badge.id not in existing_badges:
-                # Award badge
-                award_badge(user.id, badge.id)
-                newly_awarded.append(badge)
-
-    return newly_awarded
 
+def evaluate_badges(user_id, household_id=None, event=None):
+    """
+    Award every badge the user has newly qualified for.
 
-def check_contribution_badges(user, existing_badges):
-    """Check and award badges based on contributions to household"""
-    newly_awarded = []
+    Rules come from BADGE_RULES and the cached badge catalog. All thresholds
+    are checked against one set of counters, and new awards plus their
+    notifications are added to the caller's transaction, which must commit.
 
-    # Count completed tasks
-    completed_tasks = Task.query.filter_by(assigned_to=user.id, completed=True).count()
+    Args:
+        user_id (str): UUID of the user
+        household_id (str): Household to attach award notifications to;
+            defaults to one of the user's households
+        event (str): Key of BADGE_EVENT_COUNTERS limiting which rules are
+            checked; None checks every rule
 
-    # Define task completion thresholds
-    task_thresholds = {
-        "5_tasks_completed": 5,
-        "25_tasks_completed": 25,
-        "100_tasks_completed": 100,
+    Returns:
+        List of newly awarded BadgeInfo tuples
+    """
+    counters = BADGE_EVENT_COUNTERS[event] if event else None
+    catalog = get_badge_catalog()
+    rules = {
+        badge_type: rule
+        for badge_type, rule in BADGE_RULES.items()
+        if badge_type in catalog and (counters is None or rule[0] in counters)
     }
+    if not rules:
+        return []
 
-    # Check each threshold
-    for badge_type, threshold in task_thresholds.items():
-        if completed_tasks >= threshold:
-            badge = Badge.query.filter_by(type=badge_type).first()
-
-            if badge and badge.id not in existing_badges:
-                award_badge(user.id, badge.id)
-                newly_awarded.append(badge)
-
-    return newly_awarded
-
-
-def check_social_badges(user, existing_badges):
-    """Check and award badges based on social activity"""
-    newly_awarded = []
-
-    # Count messages
-    message_count = Message.query.filter_by(user_id=user.id).count()
-
-    # Count poll votes
-    vote_count = Vote.query.filter_by(user_id=user.id).count()
-
-    # Social activity badges
-    social_badges = {
-        "active_communicator": 10,  # 10+ messages
-        "poll_participant": 5,  # 5+ votes
+    # Get existing badges
+    earned = {
+        badge_id
+        for (badge_id,) in db.session.query(user_badges.c.badge_id).filter(
+            user_badges.c.user_id == user_id
+        )
     }
-
-    # Check message threshold
-    if message_count >= social_badges["active_communicator"]:
-        badge = Badge.query.filter_by(type="active_communicator").first()
-        if badge and badge.id not in existing_badges:
-            award_badge(user.id, badge.id)
-            newly_awarded.append(badge)
-
-    # Check vote threshold
-    if vote_count >= social_badges["poll_participant"]:
-        badge = Badge.query.filter_by(type="poll_participant").first()
-        if badge and badge.id not in existing_badges:
-            award_badge(user.id, badge.id)
-            newly_awarded.append(badge)
+    pending = {
+        badge_type: rule
+        for badge_type, rule in rules.items()
+        if catalog[badge_type].id not in earned
+    }
+    if not pending:
+        return []
+
+    values = get_badge_counters(user_id, {counter for counter, _ in pending.values()})
+    newly_awarded = [
+        catalog[badge_type]
+        for badge_type, (counter, threshold) in pending.items()
+        if values[counter] >= threshold
+    ]
+    if newly_awarded:
+        award_badges(user_id, newly_awarded, household_id)
 
     return newly_awarded
 
 
-def calculate_streak(user_id):
-    """Calculate the current streak of consecutive days with completed tasks"""
-    from sqlalchemy import func
-
-    # Get completed tasks ordered by completion date
-    completed_tasks = (
-        Task.query.filter_by(assigned_to=user_id, completed=True)
-        .order_by(Task.completed_at.desc())
-        .all()
-    )
-
-    if not completed_tasks:
-        return 0
-
-    # Start with most recent task
-    current_date = completed_tasks[0].completed_at.date()
-    streak = 1
-
-    # Check for tasks completed on previous days
-    for i in range(1, 31):  # Limit to 30 days to avoid excessive checking
-        previous_date = current_date - timedelta(days=1)
-
-        # Check if any task was completed on the previous date
-        task_on_date = False
-        for task in completed_tasks:
-            if task.completed_at.date() == previous_date:
-                task_on_date = True
-                break
-
-        if task_on_date:
-            streak += 1
-            current_date = previous_date
-        else:
-            # Streak broken
-            break
-
-    return streak
-
+def award_badges(user_id, badges, household_id=None):
+    """Add badge awards and their notifications to the current transaction"""
+    household_ids = [
+        member_household_id
+        for (member_household_id,) in db.session.query(
+            user_households.c.household_id
+        ).filter(user_households.c.user_id == user_id)
+    ]
+    household_id = household_id or (household_ids[0] if household_ids else None)
 
-def award_badge(user_id, badge_id):
-    """Award a badge to a user"""
-    from ..models.models import Notification
-
-    # Add badge association
+    now = datetime.utcnow()
     db.session.execute(
-        user_badges.insert().values(
-            user_id=user_id, badge_id=badge_id, awarded_at=datetime.utcnow()
-        )
-    )
-
-    # Get badge info for notification
-    badge = Badge.query.get(badge_id)
-
-    # Create notification
-    notification = Notification(
-        type="badge_awarded",
-        content=f"You've earned the {badge.name} badge!",
-        user_id=user_id,
-        reference_type="badge",
-        reference_id=badge_id,
+        user_badges.insert(),
+        [
+            {"user_id": user_id, "badge_id": badge.id, "awarded_at": now}
+            for badge in badges
+        ],
     )
-    db.session.add(notification)
 
-    db.session.commit()
+    # Notifications belong to a household; users without one just get the badge
+    if household_id:
+        db.session.add_all(
+            [
+                Notification(
+                    type="badge_awarded",
+                    content=f"You've earned the {badge.name} badge!",
+                    user_id=user_id,
+                    household_id=household_id,
+                    reference_type="badge",
+                    reference_id=badge.id,
+                )
+                for badge in badges
+            ]
+        )
+        adjust_unread_counts({(user_id, household_id): len(badges)})
 
-    return badge
+    # Badge counts feed every household leaderboard the user appears on
+    bump_household_version(*household_ids)
@@ -0,0 +1,132 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..extensions import db, socketio
+
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+
+def run_after_commit(callback):
+    """
+    Run callback once the current transaction commits.
+
+    Use this for side effects (cache invalidation, socket pushes) that must
+    not be observed before the data is durable. Callbacks are discarded if
+    the transaction rolls back. They run after the commit, so they must not
+    issue SQL on the session.
+    """
+    db.session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session):
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session):
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+class _PendingWrite:
+    __slots__ = ("write", "args", "result", "error")
+
+    def __init__(self, write, args):
+        self.write = write
+        self.args = args
+        self.result = None
+        self.error = None
+
+
+class _Batch:
+    def __init__(self):
+        self.writes = []
+        self.full = socketio.server.eio.create_event()
+        self.committed = socketio.server.eio.create_event()
+
+
+class GroupCommitBuffer:
+    """
+    Shares one commit between writes from concurrent requests.
+
+    The first writer to arrive opens a batch and yields once so writers that
+    are already waiting can join. Under heavy concurrency (wait_threshold or
+    more writes in this batch or the last one) it keeps waiting up to
+    max_delay for others, or until max_batch writes are queued; below that
+    the wait costs more than the commits it saves. It then runs every
+    write in its own session and commits once. Callers are released only
+    after that commit, so none of them reports a write that is not durable.
+    If the batch fails, writes are retried one per transaction so a bad
+    write only fails its own caller.
+    """
+
+    def __init__(self):
+        self.max_delay = 0.005
+        self.max_batch = 50
+        self.wait_threshold = 16
+        self._lock = threading.Lock()
+        self._open = None
+        self._last_size = 1
+
+    def init_app(self, app):
+        self.max_delay = app.config["GROUP_COMMIT_DELAY_MS"] / 1000
+        self.max_batch = app.config["GROUP_COMMIT_MAX_BATCH"]
+        self.wait_threshold = app.config["GROUP_COMMIT_WAIT_THRESHOLD"]
+
+    def submit(self, write, *args):
+        """
+        Run write(*args) in a shared transaction and return its result.
+
+        write must only touch db.session and return plain data, since it may
+        run in another request's session and its objects expire on commit.
+        Raises whatever write raised if it could not be committed.
+        """
+        pending = _PendingWrite(write, args)
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.writes.append(pending)
+            if len(batch.writes) >= self.max_batch:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            socketio.sleep(0)
+            # Small batches commit right away with whoever joined meanwhile
+            if max(len(batch.writes), self._last_size) >= self.wait_threshold:
+                batch.full.wait(self.max_delay)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+                self._last_size = len(batch.writes)
+            try:
+                self._commit(batch.writes)
+            finally:
+                batch.committed.set()
+        else:
+            batch.committed.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _commit(self, writes):
+        try:
+            for pending in writes:
+                pending.result = pending.write(*pending.args)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for pending in writes:
+                try:
+                    pending.result = pending.write(*pending.args)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    pending.result, pending.error = None, e
+
+
+group_commit = GroupCommitBuffer()
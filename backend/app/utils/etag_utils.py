@@ -0,0 +1,115 @@
+import hashlib
+import time
+from flask import current_app, make_response, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.models import (
+    Event,
+    Household,
+    Message,
+    Poll,
+    RecurringTaskRule,
+    Task,
+    User,
+    Vote,
+    user_households,
+)
+
+# User fields shown in household lists; changing them bumps the user's households
+USER_DISPLAY_FIELDS = ("email", "first_name", "last_name")
+
+
+def bump_household_version(*household_ids):
+    """
+    Mark household lists as changed in the current transaction.
+
+    ORM writes to tasks, messages, polls, votes and events are picked up on
+    flush; call this for Core writes such as membership changes.
+    """
+    household_ids = {household_id for household_id in household_ids if household_id}
+    if household_ids:
+        _bump(db.session.connection(), household_ids)
+
+
+def _bump(connection, household_ids):
+    connection.execute(
+        db.update(Household)
+        .where(Household.id.in_(household_ids))
+        .values(version=Household.version + 1)
+    )
+
+
+def _changed_household_ids(session, obj):
+    if isinstance(obj, (Task, Message, Poll, Event)):
+        return {obj.household_id}
+    if isinstance(obj, Vote):
+        poll = session.get(Poll, obj.poll_id)
+        return {poll.household_id} if poll else set()
+    if isinstance(obj, RecurringTaskRule):
+        task = session.get(Task, obj.task_id) if obj.task_id else None
+        return {task.household_id} if task else set()
+    if isinstance(obj, User):
+        state = inspect(obj)
+        if state.persistent and any(
+            state.attrs[field].history.has_changes() for field in USER_DISPLAY_FIELDS
+        ):
+            return set(
+                session.connection()
+                .execute(
+                    db.select(user_households.c.household_id).where(
+                        user_households.c.user_id == obj.id
+                    )
+                )
+                .scalars()
+            )
+    return set()
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_versions_on_flush(session, flush_context, instances):
+    household_ids = set()
+    with session.no_autoflush:
+        for obj in session.new | session.deleted:
+            household_ids |= _changed_household_ids(session, obj)
+        for obj in session.dirty:
+            if session.is_modified(obj):
+                household_ids |= _changed_household_ids(session, obj)
+
+    household_ids.discard(None)
+    if household_ids:
+        _bump(session.connection(), household_ids)
+
+
+def household_etag(household_id, user_id, time_dependent=False):
+    """
+    Derive the ETag of a household list response.
+
+    Combines the household's version with the user (responses are filtered
+    per user) and the request path and query string. Lists computed against
+    the current time also include the current ETAG_TIME_WINDOW, so their
+    tags roll over as time passes even without writes.
+    """
+    version = (
+        db.session.query(Household.version).filter(Household.id == household_id)
+    ).scalar()
+    key = f"{household_id}:{version}:{user_id}:{request.full_path}"
+    if time_dependent:
+        key += f":{int(time.time() // current_app.config['ETAG_TIME_WINDOW'])}"
+
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already has this version, else None"""
+    if etag in request.if_none_match:
+        return etag_response("", etag, 304)
+    return None
+
+
+def etag_response(body, etag, status=200):
+    """Attach the ETag to a response; clients must revalidate before reuse"""
+    response = make_response(body, status)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
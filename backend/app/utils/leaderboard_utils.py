@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from sqlalchemy import case, func
+from ..extensions import db
+from ..models.models import (
+    Household,
+    Task,
+    User,
+    UserStreak,
+    user_badges,
+    user_households,
+)
+from .cache_utils import TTLCache
+
+# Completions count toward the leaderboard for this many days
+LEADERBOARD_WINDOW_DAYS = 30
+
+# Leaderboard snapshots by (household_id, version)
+leaderboard_cache = TTLCache()
+
+
+def compute_leaderboard(household_id, now=None):
+    """
+    Rank household members by tasks completed in the last 30 days.
+
+    Counts, badge totals, streak state and ranks come from a single grouped
+    query, so the cost does not grow with a member's task history.
+    """
+    now = now or datetime.utcnow()
+    window_start = now - timedelta(days=LEADERBOARD_WINDOW_DAYS)
+
+    members = (
+        db.session.query(user_households.c.user_id)
+        .filter(user_households.c.household_id == household_id)
+        .subquery()
+    )
+
+    completions = (
+        db.session.query(
+            Task.assigned_to.label("user_id"),
+            func.count(Task.id).label("tasks_completed"),
+        )
+        .filter(
+            Task.household_id == household_id,
+            Task.completed == True,
+            Task.completed_at >= window_start,
+        )
+        .group_by(Task.assigned_to)
+        .subquery()
+    )
+
+    badges = (
+        db.session.query(
+            user_badges.c.user_id,
+            func.count(user_badges.c.badge_id).label("badge_count"),
+        )
+        .filter(user_badges.c.user_id.in_(db.select(members.c.user_id)))
+        .group_by(user_badges.c.user_id)
+        .subquery()
+    )
+
+    tasks_completed = func.coalesce(completions.c.tasks_completed, 0)
+
+    # Streaks stay alive until a full day passes without a completion
+    current_streak = case(
+        (
+            UserStreak.last_completion_date >= now.date() - timedelta(days=1),
+            UserStreak.current_streak,
+        ),
+        else_=0,
+    )
+
+    rows = (
+        db.session.query(
+            User.id,
+            User.email,
+            tasks_completed.label("tasks_completed"),
+            func.coalesce(badges.c.badge_count, 0).label("badge_count"),
+            current_streak.label("current_streak"),
+            func.rank().over(order_by=tasks_completed.desc()).label("rank"),
+        )
+        .join(members, members.c.user_id == User.id)
+        .outerjoin(completions, completions.c.user_id == User.id)
+        .outerjoin(badges, badges.c.user_id == User.id)
+        .outerjoin(UserStreak, UserStreak.user_id == User.id)
+        .order_by(tasks_completed.desc(), User.email)
+        .all()
+    )
+
+    return [
+        {
+            "user_id": row.id,
+            "email": row.email,
+            "name": row.email.split("@")[0],
+            "tasks_completed": row.tasks_completed,
+            "badge_count": row.badge_count,
+            "current_streak": row.current_streak,
+            "rank": row.rank,
+        }
+        for row in rows
+    ]
+
+
+def get_leaderboard_snapshot(household_id):
+    """
+    Return the cached leaderboard snapshot, recomputing it if stale.
+
+    Snapshots are keyed by the household's version, which task, membership
+    and badge writes bump, so every worker recomputes after any change.
+    """
+    version = (
+        db.session.query(Household.version).filter(Household.id == household_id)
+    ).scalar()
+
+    def compute():
+        now = datetime.utcnow()
+        return {
+            "leaderboard": compute_leaderboard(household_id, now),
+            "update_time": now.isoformat(),
+        }
+
+    return leaderboard_cache.get_or_compute((household_id, version), compute)
@@ -0,0 +1,166 @@
+import pickle
+import socket
+import struct
+import threading
+from urllib.parse import urlparse
+
+import socketio
+
+# Default address of the local broker stand-in
+LOCAL_BROKER_URL = "local://127.0.0.1:5680"
+
+_HEADER = struct.Struct("!I")
+
+
+def _send_frame(sock, payload):
+    data = pickle.dumps(payload)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    buffer = b""
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Broker connection closed")
+        buffer += chunk
+    return buffer
+
+
+def _recv_frame(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, size))
+
+
+def _parse_url(url):
+    parsed = urlparse(url)
+    return parsed.hostname or "127.0.0.1", parsed.port or 5680
+
+
+class LocalBrokerManager(socketio.PubSubManager):
+    """
+    Socket.IO client manager that shares rooms through the local broker.
+
+    A stand-in for Redis or RabbitMQ in development and tests: every worker
+    started with SOCKETIO_MESSAGE_QUEUE=local://host:port publishes its
+    emits to the broker, which relays them to every other worker. Frames
+    are pickled, so the broker must only listen on a trusted interface.
+    """
+
+    name = "local"
+
+    def __init__(
+        self, url=LOCAL_BROKER_URL, channel="socketio", write_only=False, logger=None
+    ):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.address = _parse_url(url)
+        self._publisher = None
+        self._publish_lock = None
+        self._publish_lock_guard = threading.Lock()
+
+    def _socket_module(self):
+        # Cooperative sockets under gevent even without monkey patching
+        if self.server is not None and self.server.async_mode == "gevent":
+            from gevent import socket as gevent_socket
+
+            return gevent_socket
+        return socket
+
+    def _get_publish_lock(self):
+        """
+        The lock _publish holds across socket writes.
+
+        Those writes yield under gevent, so there it must be a gevent lock:
+        a thread lock would block the only thread when a second greenlet
+        emits. Created on first use, once the server's async mode is known.
+        """
+        if self._publish_lock is None:
+            # Never held across a yield
+            with self._publish_lock_guard:
+                if self._publish_lock is None:
+                    if self._socket_module() is socket:
+                        self._publish_lock = threading.Lock()
+                    else:
+                        from gevent.lock import Semaphore
+
+                        self._publish_lock = Semaphore()
+        return self._publish_lock
+
+    def _connect(self):
+        return self._socket_module().create_connection(self.address)
+
+    def _publish(self, data):
+        with self._get_publish_lock():
+            for retry in (False, True):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect()
+                    _send_frame(self._publisher, ("pub", self.channel, data))
+                    return
+                except OSError:
+                    self._publisher = None
+                    if retry:
+                        raise
+
+    def _listen(self):
+        while True:
+            try:
+                subscriber = self._connect()
+                _send_frame(subscriber, ("sub", self.channel))
+                while True:
+                    yield _recv_frame(subscriber)
+            except (OSError, ConnectionError):
+                self._get_logger().error("Local broker connection lost; retrying")
+                self.server.sleep(1)
+
+
+def run_local_broker(host="127.0.0.1", port=5680):
+    """
+    Relay published frames to every subscriber of the same channel.
+
+    Runs until interrupted; meant for development and tests only.
+    """
+    subscribers = {}  # channel -> set of sockets
+    send_locks = {}  # socket -> lock, so publishers never interleave frames
+    lock = threading.Lock()
+
+    def serve(conn):
+        channel = None
+        try:
+            while True:
+                frame = _recv_frame(conn)
+                if frame[0] == "sub":
+                    channel = frame[1]
+                    with lock:
+                        subscribers.setdefault(channel, set()).add(conn)
+                        send_locks.setdefault(conn, threading.Lock())
+                elif frame[0] == "pub":
+                    with lock:
+                        targets = [
+                            (target, send_locks[target])
+                            for target in subscribers.get(frame[1], ())
+                        ]
+                    for target, send_lock in targets:
+                        try:
+                            with send_lock:
+                                _send_frame(target, frame[2])
+                        except OSError:
+                            with lock:
+                                subscribers.get(frame[1], set()).discard(target)
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            if channel is not None:
+                with lock:
+                    subscribers.get(channel, set()).discard(conn)
+                    send_locks.pop(conn, None)
+            conn.close()
+
+    server = socket.create_server((host, port), reuse_port=False)
+    try:
+        while True:
+            conn, _ = server.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=serve, args=(conn,), daemon=True).start()
+    finally:
+        server.close()
@@ -0,0 +1,301 @@
+import html
+import re
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import DDL, and_, event, or_, text
+from sqlalchemy.orm import Session, joinedload
+from ..extensions import db
+from ..models.models import Household, Message, User
+
+
+def _allocate_seqs(connection, household_id, count):
+    """Reserve count sequence numbers for a household; returns the first"""
+    last = connection.execute(
+        db.update(Household)
+        .where(Household.id == household_id)
+        .values(message_seq=Household.message_seq + count)
+        .returning(Household.message_seq)
+    ).scalar()
+    return last - count + 1
+
+
+@event.listens_for(Session, "before_flush")
+def _number_message_changes(session, flush_context, instances):
+    """
+    Give every inserted, edited or deleted message the next household seq.
+
+    Numbers are reserved by updating the household row, which stays locked
+    until commit, so changes become visible in seq order and a client that
+    syncs from its last seq never skips one.
+    """
+    changed = {}
+    for obj in session.new:
+        if isinstance(obj, Message):
+            changed.setdefault(obj.household_id, []).append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Message) and session.is_modified(obj):
+            changed.setdefault(obj.household_id, []).append(obj)
+
+    for household_id, messages in changed.items():
+        seq = _allocate_seqs(session.connection(), household_id, len(messages))
+        for message in messages:
+            message.seq = seq
+            seq += 1
+
+
+def get_message_changes(household_id, since, limit):
+    """
+    Read the chat changes a client missed.
+
+    Every insert, edit and delete moves a message to a new seq, so the rows
+    after since are exactly the messages that changed; deleted ones come
+    back as tombstones.
+
+    Returns:
+        (messages ordered by seq, True if more changes follow)
+    """
+    rows = (
+        Message.query.filter(Message.household_id == household_id, Message.seq > since)
+        .options(
+            joinedload(Message.sender).load_only(
+                User.id, User.email, User.first_name, User.last_name
+            )
+        )
+        .order_by(Message.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    return rows[:limit], len(rows) > limit
+
+
+# Full-text index of chat messages on SQLite. It is an external-content FTS5
+# table over messages(content, household_id), kept in sync by triggers.
+# Tombstones stay indexed with empty content, so they never match a term.
+MESSAGE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+    "content, household_id, content='messages', content_rowid='rowid', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages "
+    "BEGIN INSERT INTO messages_fts (rowid, content, household_id) "
+    "VALUES (new.rowid, new.content, new.household_id); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages "
+    "BEGIN INSERT INTO messages_fts (messages_fts, rowid, content, household_id) "
+    "VALUES ('delete', old.rowid, old.content, old.household_id); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_update "
+    "AFTER UPDATE OF content, household_id ON messages "
+    "BEGIN INSERT INTO messages_fts (messages_fts, rowid, content, household_id) "
+    "VALUES ('delete', old.rowid, old.content, old.household_id); "
+    "INSERT INTO messages_fts (rowid, content, household_id) "
+    "VALUES (new.rowid, new.content, new.household_id); END",
+)
+
+for _statement in MESSAGE_SEARCH_DDL:
+    event.listen(
+        Message.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Message.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS messages_fts").execute_if(dialect="sqlite"),
+)
+
+# Words of context shown around the first match of a search result
+SNIPPET_WORDS = 24
+
+# BM25 term frequency saturation and length normalization
+BM25_K1, BM25_B = 1.2, 0.75
+
+# Markers around matched words; replaced after the text is escaped
+_MATCH_START, _MATCH_END = "\x02", "\x03"
+
+# Newest matches first, so FTS5 stops reading postings after the window;
+# :before continues below the oldest match of a previous window
+_SEARCH_SQL = text(
+    "SELECT m.id, m.seq, m.created_at, u.email AS sender, "
+    "messages_fts.rowid AS position, "
+    "highlight(messages_fts, 0, char(2), char(3)) AS highlighted "
+    "FROM messages_fts "
+    "JOIN messages m ON m.rowid = messages_fts.rowid "
+    "JOIN users u ON u.id = m.user_id "
+    "WHERE messages_fts MATCH :match AND m.household_id = :household_id "
+    "AND m.deleted_at IS NULL "
+    "AND (:before IS NULL OR messages_fts.rowid < :before) "
+    "ORDER BY messages_fts.rowid DESC "
+    "LIMIT :window"
+).columns(created_at=db.DateTime)
+
+
+def rebuild_message_search():
+    """Re-index every message; needed after VACUUM, which may renumber rowids"""
+    db.session.execute(
+        text("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+    )
+    db.session.commit()
+
+
+def build_search_match(household_id, words):
+    """
+    Build an FTS5 query for messages of one household containing every word.
+
+    Words are quoted, so FTS5 syntax typed by the user is matched literally.
+    """
+    terms = " ".join(f'"{word}"' for word in words)
+    return f'household_id : "{household_id}" AND content : ({terms})'
+
+
+def _window_cursor(row):
+    """Opaque position just past the oldest message of a search window"""
+    if db.engine.dialect.name == "sqlite":
+        return str(row.position)
+    return f"{row.created_at.isoformat()}|{row.id}"
+
+
+def _decode_window_cursor(before):
+    """The rowid, or (created_at, id) elsewhere, in a cursor; raises ValueError"""
+    if db.engine.dialect.name == "sqlite":
+        return int(before)
+    try:
+        created_at, message_id = before.split("|", 1)
+        return datetime.fromisoformat(created_at), message_id
+    except (AttributeError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def _search_window(household_id, words, window, before=None):
+    """
+    The newest window messages matching every word, matches marked.
+
+    Limited to messages older than the before cursor when it is given.
+    """
+    if db.engine.dialect.name == "sqlite":
+        return db.session.execute(
+            _SEARCH_SQL,
+            {
+                "match": build_search_match(household_id, words),
+                "household_id": household_id,
+                "window": window,
+                "before": before,
+            },
+        ).all()
+
+    # No FTS5 index elsewhere: substring scan of the household
+    query = (
+        db.select(
+            Message.id,
+            Message.seq,
+            Message.created_at,
+            User.email.label("sender"),
+            Message.content.label("highlighted"),
+        )
+        .join(User, User.id == Message.user_id)
+        .where(Message.household_id == household_id, Message.deleted_at.is_(None))
+    )
+    for word in words:
+        query = query.where(Message.content.ilike(f"%{word}%"))
+    if before is not None:
+        created_at, message_id = before
+        query = query.where(
+            or_(
+                Message.created_at < created_at,
+                and_(Message.created_at == created_at, Message.id < message_id),
+            )
+        )
+    rows = db.session.execute(
+        query.order_by(Message.created_at.desc(), Message.id.desc()).limit(window)
+    ).all()
+
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+    return [
+        row._replace(
+            highlighted=pattern.sub(
+                lambda match: f"{_MATCH_START}{match.group()}{_MATCH_END}",
+                row.highlighted,
+            )
+        )
+        for row in rows
+    ]
+
+
+def _snippet(highlighted):
+    """Cut the words around the first match and turn markers into <mark>"""
+    words = re.findall(r"\S+\s*", highlighted)
+    first = next((i for i, word in enumerate(words) if _MATCH_START in word), 0)
+    start = max(0, min(first - SNIPPET_WORDS // 4, len(words) - SNIPPET_WORDS))
+    end = start + SNIPPET_WORDS
+
+    snippet = "".join(words[start:end]).strip()
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(words):
+        snippet += "…"
+
+    return (
+        html.escape(snippet)
+        .replace(_MATCH_START, "<mark>")
+        .replace(_MATCH_END, "</mark>")
+    )
+
+
+def search_messages(household_id, query, page, per_page, before=None):
+    """
+    Rank a household's messages against a text query.
+
+    Only the newest MESSAGE_SEARCH_WINDOW matches are ranked, which keeps
+    latency flat as chat history grows. When the window comes back full,
+    older matches may exist: next_before is then a cursor that, passed back
+    as before, ranks the next window of older matches.
+
+    Matches are scored with BM25's term frequency and length normalization;
+    the inverse document frequency is left out because FTS5 computes it over
+    every message of the phrase on each query, which is what made ranking
+    slow down with history. Every word must match, so it would mostly scale
+    all scores alike anyway.
+
+    Returns:
+        (list of {"id", "seq", "sender", "created_at", "highlight"} where
+        highlight is HTML-escaped text with matches wrapped in <mark>,
+        True if more pages of this window follow, next_before or None)
+
+    Raises:
+        ValueError: if before is not a cursor returned by this function
+    """
+    if before is not None:
+        before = _decode_window_cursor(before)
+
+    words = re.findall(r"\w+", query)
+    if not words:
+        return [], False, None
+
+    window = current_app.config["MESSAGE_SEARCH_WINDOW"]
+    rows = _search_window(household_id, words, window, before)
+    if not rows:
+        return [], False, None
+    next_before = _window_cursor(rows[-1]) if len(rows) == window else None
+
+    lengths = [len(re.findall(r"\w+", row.highlighted)) or 1 for row in rows]
+    average_length = sum(lengths) / len(lengths)
+
+    def score(index):
+        matches = rows[index].highlighted.count(_MATCH_START)
+        norm = 1 - BM25_B + BM25_B * lengths[index] / average_length
+        return matches * (BM25_K1 + 1) / (matches + BM25_K1 * norm)
+
+    # Best matches first, newer messages first among equals
+    ranked = sorted(range(len(rows)), key=lambda index: (-score(index), index))
+    offset = (page - 1) * per_page
+
+    results = []
+    for index in ranked[offset : offset + per_page]:
+        row = rows[index]
+        results.append(
+            {
+                "id": row.id,
+                "seq": row.seq,
+                "sender": row.sender,
+                "created_at": row.created_at.isoformat(),
+                "highlight": _snippet(row.highlighted),
+            }
+        )
+    return results, len(ranked) > offset + per_page, next_before
@@ -0,0 +1,443 @@
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from ..extensions import db, socketio
+from ..models.models import (
+    Notification,
+    NotificationCounter,
+    NotificationOutbox,
+    user_households,
+)
+from .db_utils import run_after_commit
+
+
+def get_unread_counts(user_id):
+    """Return the user's unread total and per-household counts"""
+    households = dict(
+        db.session.query(
+            NotificationCounter.household_id, NotificationCounter.unread
+        ).filter(NotificationCounter.user_id == user_id, NotificationCounter.unread > 0)
+    )
+    return {"count": sum(households.values()), "households": households}
+
+
+def adjust_unread_counts(deltas):
+    """
+    Apply changes to unread counters and push the new counts to their owners.
+
+    Call wherever notifications are created, read or deleted, in the same
+    transaction. Each owner's sockets get a "notification_count" event once
+    the transaction commits.
+
+    Args:
+        deltas (dict): {(user_id, household_id): change in unread count}
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    table = NotificationCounter.__table__
+    dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+    upsert = dialect.insert(table)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.household_id],
+        set_={"unread": table.c.unread + upsert.excluded.unread},
+    )
+    db.session.execute(
+        upsert,
+        [
+            {"user_id": user_id, "household_id": household_id, "unread": delta}
+            for (user_id, household_id), delta in deltas.items()
+        ],
+    )
+
+    # Read the new values now; after-commit callbacks must not query
+    user_ids = {user_id for user_id, _ in deltas}
+    counts = {user_id: {"count": 0, "households": {}} for user_id in user_ids}
+    for row in db.session.query(NotificationCounter).filter(
+        NotificationCounter.user_id.in_(user_ids), NotificationCounter.unread > 0
+    ):
+        counts[row.user_id]["households"][row.household_id] = row.unread
+        counts[row.user_id]["count"] += row.unread
+
+    def push():
+        for user_id, payload in counts.items():
+            socketio.emit("notification_count", payload, room=f"user_{user_id}")
+
+    run_after_commit(push)
+
+
+def add_notification(**fields):
+    """Add a single Notification to the current transaction and count it"""
+    notification = Notification(**fields)
+    db.session.add(notification)
+    adjust_unread_counts({(notification.user_id, notification.household_id): 1})
+    return notification
+
+
+def household_recipient_ids(household_id, exclude_user_ids=()):
+    """
+    Select the members of a household that should receive a notification.
+
+    Args:
+        household_id (str): UUID of the household
+        exclude_user_ids (iterable): Users to leave out, e.g. the actor or
+            members who are currently online
+
+    Returns:
+        List of user ids
+    """
+    query = db.session.query(user_households.c.user_id).filter(
+        user_households.c.household_id == household_id
+    )
+    exclude_user_ids = list(exclude_user_ids)
+    if exclude_user_ids:
+        query = query.filter(user_households.c.user_id.notin_(exclude_user_ids))
+
+    return [user_id for (user_id,) in query]
+
+
+def insert_notifications(rows):
+    """
+    Write notifications for any mix of users and households at once.
+
+    All rows go through one executemany of the same compiled statement,
+    which is cheaper than rendering a VALUES list sized to the batch. Rows
+    are added to the caller's transaction, which must commit.
+
+    Args:
+        rows (list): dicts with type, content, user_id, household_id and
+            optionally reference_type and reference_id
+    """
+    if not rows:
+        return
+
+    now = datetime.utcnow()
+    db.session.execute(
+        Notification.__table__.insert(),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "is_read": False,
+                "created_at": now,
+                "reference_type": None,
+                "reference_id": None,
+                **row,
+            }
+            for row in rows
+        ],
+    )
+    adjust_unread_counts(Counter((row["user_id"], row["household_id"]) for row in rows))
+
+
+def bulk_insert_notifications(
+    user_ids,
+    household_id,
+    type,
+    content,
+    reference_type=None,
+    reference_id=None,
+):
+    """Write the same notification for each user with insert_notifications()"""
+    insert_notifications(
+        [
+            {
+                "type": type,
+                "content": content,
+                "user_id": user_id,
+                "household_id": household_id,
+                "reference_type": reference_type,
+                "reference_id": reference_id,
+            }
+            for user_id in user_ids
+        ]
+    )
+
+
+def purge_read_notifications(since, now):
+    """
+    Delete read notifications older than NOTIFICATION_RETENTION_DAYS.
+
+    Unread notifications are kept however old they are, so unread counters
+    never change here.
+
+    Returns:
+        the number of notifications deleted
+    """
+    cutoff = now - timedelta(days=current_app.config["NOTIFICATION_RETENTION_DAYS"])
+    return db.session.execute(
+        db.delete(Notification).where(
+            Notification.is_read == True, Notification.created_at < cutoff
+        )
+    ).rowcount
+
+
+def fan_out_notification(
+    household_id,
+    type,
+    content,
+    reference_type=None,
+    reference_id=None,
+    exclude_user_ids=(),
+):
+    """
+    Notify every member of a household in bulk.
+
+    The recipient set is computed with one query and the rows are written
+    with one bulk insert in the caller's transaction, which must commit.
+
+    Args:
+        household_id (str): UUID of the household
+        type (str): Notification type, e.g. 'new_message'
+        content (str): Notification text
+        reference_type (str): Kind of object the notification points at
+        reference_id (str): ID of that object
+        exclude_user_ids (iterable): Members who should not be notified
+
+    Returns:
+        List of user ids that were notified
+    """
+    user_ids = household_recipient_ids(household_id, exclude_user_ids)
+    if user_ids:
+        bulk_insert_notifications(
+            user_ids, household_id, type, content, reference_type, reference_id
+        )
+
+    return user_ids
+
+
+def enqueue_notification(
+    household_id,
+    type,
+    content,
+    reference_type=None,
+    reference_id=None,
+    exclude_user_ids=(),
+):
+    """
+    Queue a household-wide notification for background fan-out.
+
+    Adds a single outbox row to the caller's transaction; the dispatcher
+    workers write the per-member notifications once it commits. Arguments
+    match fan_out_notification().
+    """
+    db.session.add(
+        NotificationOutbox(
+            household_id=household_id,
+            type=type,
+            content=content,
+            reference_type=reference_type,
+            reference_id=reference_id,
+            exclude_user_ids=list(exclude_user_ids),
+        )
+    )
+    run_after_commit(notification_dispatcher.wake)
+
+
+class NotificationDispatcher:
+    """
+    Pool of background workers draining the notification outbox.
+
+    Workers claim batches of entries by leasing them, fan each entry out
+    and delete it in the same transaction. Entries live in the database, so
+    anything queued or leased when the process stops is picked up again
+    after a restart, once its lease has expired.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.workers = 2
+        self.batch_size = 100
+        self.poll_interval = 1.0
+        self.lease_seconds = 60
+        self.max_attempts = 5
+        self._wakeup = None
+        self._running = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "dispatched": 0,
+            "batches": 0,
+            "failed": 0,
+            "dropped": 0,
+            "last_lag_seconds": None,
+            "max_lag_seconds": None,
+            "total_lag_seconds": 0.0,
+        }
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config["NOTIFICATION_WORKERS"]
+        self.batch_size = app.config["NOTIFICATION_BATCH_SIZE"]
+        self.poll_interval = app.config["NOTIFICATION_POLL_INTERVAL"]
+        self.lease_seconds = app.config["NOTIFICATION_LEASE_SECONDS"]
+        self.max_attempts = app.config["NOTIFICATION_MAX_ATTEMPTS"]
+
+    def start(self):
+        """Spawn the worker pool; call once per process after init_app"""
+        self._wakeup = socketio.server.eio.create_event()
+        for _ in range(self.workers):
+            socketio.start_background_task(self._run)
+
+    def wake(self):
+        """Tell idle workers there is new work instead of waiting for a poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _run(self):
+        with self._lock:
+            self._running += 1
+
+        while True:
+            try:
+                with self.app.app_context():
+                    processed = self.dispatch_batch()
+            except Exception:
+                self.app.logger.exception("Notification dispatch failed")
+                processed = 0
+
+            if processed:
+                socketio.sleep(0)  # Let other greenlets run between batches
+            else:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def claim_batch(self):
+        """Lease up to batch_size available entries and return them"""
+        now = datetime.utcnow()
+        claim = str(uuid.uuid4())
+        available = (
+            db.select(NotificationOutbox.id)
+            .where(NotificationOutbox.available_at <= now)
+            .order_by(NotificationOutbox.available_at, NotificationOutbox.id)
+            .limit(self.batch_size)
+        )
+
+        # A single UPDATE, so concurrent workers never claim the same entry
+        db.session.execute(
+            db.update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id.in_(available.scalar_subquery()),
+                NotificationOutbox.available_at <= now,
+            )
+            .values(
+                claimed_by=claim,
+                available_at=now + timedelta(seconds=self.lease_seconds),
+                attempts=NotificationOutbox.attempts + 1,
+            )
+        )
+        db.session.commit()
+
+        return (
+            NotificationOutbox.query.filter_by(claimed_by=claim)
+            .order_by(NotificationOutbox.id)
+            .all()
+        )
+
+    def dispatch_batch(self):
+        """
+        Claim and deliver one batch.
+
+        The batch is fanned out and removed from the outbox in one
+        transaction. If that fails, entries are retried one per transaction
+        so a bad entry cannot hold back the rest; it stays queued until its
+        lease expires and is dropped after max_attempts.
+
+        Returns:
+            int: Number of entries claimed
+        """
+        entries = self.claim_batch()
+        if not entries:
+            return 0
+        enqueued_at = {entry.id: entry.created_at for entry in entries}
+
+        failed = []
+        try:
+            for entry in entries:
+                self._deliver(entry)
+            db.session.commit()
+            delivered = list(enqueued_at)
+        except Exception:
+            db.session.rollback()
+            delivered = []
+            for entry in entries:
+                entry_id = entry.id
+                try:
+                    self._deliver(entry)
+                    db.session.commit()
+                    delivered.append(entry_id)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception(
+                        "Notification outbox entry %s failed", entry_id
+                    )
+                    failed.append(entry)
+
+        dropped = [entry for entry in failed if entry.attempts >= self.max_attempts]
+        for entry in dropped:
+            db.session.delete(entry)
+        db.session.commit()
+
+        now = datetime.utcnow()
+        lags = [(now - enqueued_at[entry_id]).total_seconds() for entry_id in delivered]
+        with self._lock:
+            stats = self._stats
+            stats["batches"] += 1
+            stats["dispatched"] += len(delivered)
+            stats["failed"] += len(failed) - len(dropped)
+            stats["dropped"] += len(dropped)
+            if lags:
+                stats["last_lag_seconds"] = lags[-1]
+                stats["max_lag_seconds"] = max(stats["max_lag_seconds"] or 0, *lags)
+                stats["total_lag_seconds"] += sum(lags)
+
+        return len(entries)
+
+    def _deliver(self, entry):
+        fan_out_notification(
+            entry.household_id,
+            entry.type,
+            entry.content,
+            reference_type=entry.reference_type,
+            reference_id=entry.reference_id,
+            exclude_user_ids=entry.exclude_user_ids or (),
+        )
+        db.session.delete(entry)
+
+    def drain(self):
+        """Dispatch until nothing is available; returns entries processed"""
+        total = 0
+        while True:
+            processed = self.dispatch_batch()
+            if not processed:
+                return total
+            total += processed
+
+    def metrics(self):
+        """Queue depth and dispatch lag for monitoring"""
+        depth, oldest = db.session.query(
+            func.count(NotificationOutbox.id), func.min(NotificationOutbox.created_at)
+        ).one()
+
+        with self._lock:
+            stats = dict(self._stats)
+            running = self._running
+
+        total_lag = stats.pop("total_lag_seconds")
+        return {
+            "queue_depth": depth,
+            "oldest_pending_seconds": (
+                (datetime.utcnow() - oldest).total_seconds() if oldest else 0
+            ),
+            "workers": running,
+            "avg_lag_seconds": (
+                total_lag / stats["dispatched"] if stats["dispatched"] else None
+            ),
+            **stats,
+        }
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -0,0 +1,37 @@
+from ..extensions import db
+from ..models.models import Poll, user_households
+from .etag_utils import bump_household_version
+from .notification_utils import insert_notifications
+
+
+def notify_closed_polls(since, now):
+    """
+    Tell household members about polls that closed in (since, now].
+
+    Also bumps the households' versions, so poll lists revalidate the
+    moment a poll moves from active to expired.
+
+    Returns:
+        the number of notifications written
+    """
+    recipients = db.session.execute(
+        db.select(Poll.id, Poll.question, Poll.household_id, user_households.c.user_id)
+        .join(user_households, user_households.c.household_id == Poll.household_id)
+        .where(Poll.expires_at > since, Poll.expires_at <= now)
+    ).all()
+
+    insert_notifications(
+        [
+            {
+                "type": "poll_closed",
+                "content": f"Poll closed: {row.question}",
+                "user_id": row.user_id,
+                "household_id": row.household_id,
+                "reference_type": "poll",
+                "reference_id": row.id,
+            }
+            for row in recipients
+        ]
+    )
+    bump_household_version(*{row.household_id for row in recipients})
+    return len(recipients)
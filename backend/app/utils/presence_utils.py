@@ -0,0 +1,367 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from ..extensions import db, socketio
+from ..models.models import PresenceConnection
+
+# Household key of the row recording the connection itself
+CONNECTION_ROW = ""
+
+
+class MemoryPresenceBackend:
+    """
+    Presence state for a single process.
+
+    Keeps a sid -> connection index, a user -> sids index and, per household,
+    a reference count of each online user's connections, so every lookup is
+    a dict access and a second tab never overwrites the first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = {}  # sid -> {"user_id": ..., "households": set()}
+        self._user_sids = {}  # user_id -> {sid}
+        self._household_users = {}  # household_id -> {user_id: connection count}
+
+    def connect(self, sid, user_id):
+        """Register a connection; True if it is the user's first one"""
+        with self._lock:
+            connection = self._connections.get(sid)
+            if connection and connection["user_id"] == user_id:
+                return False
+            if connection:
+                self._remove(sid)
+
+            self._connections[sid] = {"user_id": user_id, "households": set()}
+            sids = self._user_sids.setdefault(user_id, set())
+            sids.add(sid)
+            return len(sids) == 1
+
+    def join(self, sid, household_id):
+        """Add a connection to a household; True if the user just came online there"""
+        with self._lock:
+            connection = self._connections.get(sid)
+            if not connection or household_id in connection["households"]:
+                return False
+
+            connection["households"].add(household_id)
+            users = self._household_users.setdefault(household_id, {})
+            users[connection["user_id"]] = users.get(connection["user_id"], 0) + 1
+            return users[connection["user_id"]] == 1
+
+    def leave(self, sid, household_id):
+        """Remove a connection from a household; True if the user went offline there"""
+        with self._lock:
+            connection = self._connections.get(sid)
+            if not connection or household_id not in connection["households"]:
+                return False
+
+            connection["households"].discard(household_id)
+            return self._release(household_id, connection["user_id"])
+
+    def disconnect(self, sid):
+        """
+        Forget a connection.
+
+        Returns:
+            (user_id, households the user went offline in, True if the user
+            has no connections left); user_id is None for unknown sids
+        """
+        with self._lock:
+            if sid not in self._connections:
+                return None, [], False
+            return self._remove(sid)
+
+    def _remove(self, sid):
+        connection = self._connections.pop(sid)
+        user_id = connection["user_id"]
+        offline_households = [
+            household_id
+            for household_id in connection["households"]
+            if self._release(household_id, user_id)
+        ]
+
+        sids = self._user_sids.get(user_id, set())
+        sids.discard(sid)
+        if not sids:
+            self._user_sids.pop(user_id, None)
+
+        return user_id, offline_households, not sids
+
+    def _release(self, household_id, user_id):
+        users = self._household_users.get(household_id, {})
+        remaining = users.get(user_id, 0) - 1
+        if remaining > 0:
+            users[user_id] = remaining
+            return False
+
+        users.pop(user_id, None)
+        if not users:
+            self._household_users.pop(household_id, None)
+        return True
+
+    def user_id_for(self, sid):
+        connection = self._connections.get(sid)
+        return connection["user_id"] if connection else None
+
+    def is_online(self, user_id):
+        return user_id in self._user_sids
+
+    def is_online_in(self, household_id, user_id):
+        return user_id in self._household_users.get(household_id, {})
+
+    def online_user_ids(self, household_id):
+        with self._lock:
+            return set(self._household_users.get(household_id, {}))
+
+    def sids_in(self, household_id, user_id):
+        with self._lock:
+            return [
+                sid
+                for sid in self._user_sids.get(user_id, ())
+                if household_id in self._connections[sid]["households"]
+            ]
+
+    def heartbeat(self):
+        pass
+
+
+class DatabasePresenceBackend:
+    """
+    Presence state shared by every worker through the application database.
+
+    Each connection has one row, plus one row per household it joined.
+    Reference counts are row counts, so several workers can serve the same
+    user. Workers refresh their rows on a heartbeat; rows left behind by a
+    worker that died stop counting once they are older than the TTL and are
+    then deleted. Writes use their own connection and commit immediately, so
+    the database must be a file or server, not in-memory SQLite.
+    """
+
+    def __init__(self, server_id, ttl):
+        self.server_id = server_id
+        self.ttl = ttl
+
+    def _cutoff(self):
+        return datetime.utcnow() - timedelta(seconds=self.ttl)
+
+    def _count(self, conn, user_id, household_id):
+        return conn.execute(
+            db.select(func.count())
+            .select_from(PresenceConnection)
+            .where(
+                PresenceConnection.user_id == user_id,
+                PresenceConnection.household_id == household_id,
+                PresenceConnection.refreshed_at >= self._cutoff(),
+            )
+        ).scalar()
+
+    def _insert(self, conn, sid, household_id, user_id):
+        conn.execute(
+            db.insert(PresenceConnection).values(
+                sid=sid,
+                household_id=household_id,
+                user_id=user_id,
+                server_id=self.server_id,
+                refreshed_at=datetime.utcnow(),
+            )
+        )
+
+    def connect(self, sid, user_id):
+        with db.engine.begin() as conn:
+            current = self._user_id_for(conn, sid)
+            if current == user_id:
+                return False
+            if current:
+                conn.execute(
+                    db.delete(PresenceConnection).where(PresenceConnection.sid == sid)
+                )
+
+            self._insert(conn, sid, CONNECTION_ROW, user_id)
+            return self._count(conn, user_id, CONNECTION_ROW) == 1
+
+    def join(self, sid, household_id):
+        with db.engine.begin() as conn:
+            user_id = self._user_id_for(conn, sid)
+            joined = conn.execute(
+                db.select(PresenceConnection.sid).where(
+                    PresenceConnection.sid == sid,
+                    PresenceConnection.household_id == household_id,
+                )
+            ).first()
+            if not user_id or joined:
+                return False
+
+            self._insert(conn, sid, household_id, user_id)
+            return self._count(conn, user_id, household_id) == 1
+
+    def leave(self, sid, household_id):
+        with db.engine.begin() as conn:
+            user_id = self._user_id_for(conn, sid)
+            deleted = conn.execute(
+                db.delete(PresenceConnection).where(
+                    PresenceConnection.sid == sid,
+                    PresenceConnection.household_id == household_id,
+                )
+            ).rowcount
+            if not user_id or not deleted:
+                return False
+
+            return self._count(conn, user_id, household_id) == 0
+
+    def disconnect(self, sid):
+        with db.engine.begin() as conn:
+            user_id = self._user_id_for(conn, sid)
+            if not user_id:
+                return None, [], False
+
+            household_ids = conn.execute(
+                db.select(PresenceConnection.household_id).where(
+                    PresenceConnection.sid == sid,
+                    PresenceConnection.household_id != CONNECTION_ROW,
+                )
+            ).scalars()
+            household_ids = list(household_ids)
+            conn.execute(
+                db.delete(PresenceConnection).where(PresenceConnection.sid == sid)
+            )
+
+            offline_households = [
+                household_id
+                for household_id in household_ids
+                if self._count(conn, user_id, household_id) == 0
+            ]
+            return (
+                user_id,
+                offline_households,
+                self._count(conn, user_id, CONNECTION_ROW) == 0,
+            )
+
+    def _user_id_for(self, conn, sid):
+        return conn.execute(
+            db.select(PresenceConnection.user_id).where(
+                PresenceConnection.sid == sid,
+                PresenceConnection.household_id == CONNECTION_ROW,
+            )
+        ).scalar()
+
+    def user_id_for(self, sid):
+        with db.engine.connect() as conn:
+            return self._user_id_for(conn, sid)
+
+    def is_online(self, user_id):
+        return self.is_online_in(CONNECTION_ROW, user_id)
+
+    def is_online_in(self, household_id, user_id):
+        with db.engine.connect() as conn:
+            return self._count(conn, user_id, household_id) > 0
+
+    def online_user_ids(self, household_id):
+        with db.engine.connect() as conn:
+            return set(
+                conn.execute(
+                    db.select(PresenceConnection.user_id)
+                    .where(
+                        PresenceConnection.household_id == household_id,
+                        PresenceConnection.refreshed_at >= self._cutoff(),
+                    )
+                    .distinct()
+                ).scalars()
+            )
+
+    def sids_in(self, household_id, user_id):
+        with db.engine.connect() as conn:
+            return list(
+                conn.execute(
+                    db.select(PresenceConnection.sid).where(
+                        PresenceConnection.user_id == user_id,
+                        PresenceConnection.household_id == household_id,
+                    )
+                ).scalars()
+            )
+
+    def heartbeat(self):
+        """Refresh this worker's rows and delete rows past the TTL"""
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.update(PresenceConnection)
+                .where(PresenceConnection.server_id == self.server_id)
+                .values(refreshed_at=datetime.utcnow())
+            )
+            conn.execute(
+                db.delete(PresenceConnection).where(
+                    PresenceConnection.refreshed_at < self._cutoff()
+                )
+            )
+
+
+class PresenceRegistry:
+    """
+    Tracks which users are connected and which households they are in.
+
+    Delegates to the backend selected by PRESENCE_BACKEND: "memory" for a
+    single worker, or "database" to share presence between workers.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.backend = MemoryPresenceBackend()
+        self.heartbeat_interval = 0
+
+    def init_app(self, app):
+        self.app = app
+        if app.config["PRESENCE_BACKEND"] == "database":
+            server_id = app.config["PRESENCE_SERVER_ID"] or (
+                f"{socket.gethostname()}:{os.getpid()}"
+            )
+            self.backend = DatabasePresenceBackend(
+                server_id, app.config["PRESENCE_TTL"]
+            )
+            self.heartbeat_interval = app.config["PRESENCE_HEARTBEAT_INTERVAL"]
+        else:
+            self.backend = MemoryPresenceBackend()
+            self.heartbeat_interval = 0
+
+    def start(self):
+        """Start the heartbeat for shared backends; call once per process"""
+        if self.heartbeat_interval:
+            socketio.start_background_task(self._run_heartbeat)
+
+    def _run_heartbeat(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.backend.heartbeat()
+            except Exception:
+                self.app.logger.exception("Presence heartbeat failed")
+            socketio.sleep(self.heartbeat_interval)
+
+    def __getattr__(self, name):
+        # connect, join, leave, disconnect and the lookups go to the backend
+        return getattr(self.backend, name)
+
+
+presence = PresenceRegistry()
+
+
+def notify_membership_changed(user_id, household_id, role=None):
+    """
+    Tell a user's sockets that their role in a household changed.
+
+    A role of None means they left or were removed: their sockets are also
+    taken out of the household's chat room, on whichever worker holds them.
+    Call this after the change has been committed.
+    """
+    socketio.emit(
+        "membership_changed",
+        {"household_id": household_id, "role": role},
+        room=f"user_{user_id}",
+    )
+    if role is not None:
+        return
+
+    for sid in presence.sids_in(household_id, user_id):
+        socketio.server.leave_room(sid, f"household_{household_id}")
+        presence.leave(sid, household_id)
@@ -0,0 +1,222 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+from ..extensions import db, socketio
+from ..models.models import ScheduledJob
+from .notification_utils import purge_read_notifications
+from .poll_utils import notify_closed_polls
+from .task_utils import materialize_due_occurrences, notify_overdue_tasks
+
+
+class Job:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+
+
+class JobScheduler:
+    """
+    Runs periodic maintenance jobs as background tasks in every process.
+
+    A job is a function of (since, now) that handles everything that changed
+    in that window with a few set-based statements and returns the number of
+    rows it touched. Each job has a lease row in scheduled_jobs: a process
+    runs the job only if it holds an unexpired lease (or takes an expired
+    one) and the job's interval has passed since the last run, so with many
+    processes each job still runs once per interval. The lease renews on
+    every run and should outlast the slowest run.
+
+    The end of each run's window is stored with the lease and becomes the
+    next run's since, so a process that takes over the lease continues
+    where the previous holder stopped.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.jobs = {}
+        self.lease_seconds = 120
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.lease_seconds = app.config["SCHEDULER_LEASE_SECONDS"]
+        self.worker_id = app.config["PRESENCE_SERVER_ID"] or self.worker_id
+
+        self.register(
+            "recurring_tasks",
+            lambda since, now: materialize_due_occurrences(now=now),
+            app.config["JOB_RECURRING_TASKS_INTERVAL"],
+        )
+        self.register(
+            "overdue_tasks",
+            notify_overdue_tasks,
+            app.config["JOB_OVERDUE_TASKS_INTERVAL"],
+        )
+        self.register(
+            "closed_polls", notify_closed_polls, app.config["JOB_CLOSED_POLLS_INTERVAL"]
+        )
+        self.register(
+            "notification_retention",
+            purge_read_notifications,
+            app.config["JOB_NOTIFICATION_RETENTION_INTERVAL"],
+        )
+
+    def register(self, name, func, interval):
+        """Add a job that runs func(since, now) every interval seconds"""
+        self.jobs[name] = Job(name, func, interval)
+        with self._lock:
+            self._stats.setdefault(
+                name,
+                {
+                    "runs": 0,
+                    "skipped": 0,
+                    "errors": 0,
+                    "rows": 0,
+                    "last_rows": None,
+                    "last_duration_ms": None,
+                    "max_duration_ms": None,
+                    "total_duration_ms": 0.0,
+                    "last_error": None,
+                },
+            )
+
+    def start(self):
+        """Start one greenlet per job; call once per process after init_app"""
+        if not self.app.config["SCHEDULER_ENABLED"]:
+            return
+        for job in self.jobs.values():
+            socketio.start_background_task(self._run, job)
+
+    def _run(self, job):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.run_job(job.name)
+            except Exception:
+                self.app.logger.exception("Scheduled job %s failed", job.name)
+            socketio.sleep(job.interval)
+
+    def _acquire(self, job, now, force):
+        """Take or renew the job's lease if it is due; returns the lease row"""
+        table = ScheduledJob.__table__
+        dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+        db.session.execute(
+            dialect.insert(table)
+            .values(name=job.name)
+            .on_conflict_do_nothing(index_elements=[table.c.name])
+        )
+
+        conditions = [
+            ScheduledJob.name == job.name,
+            or_(
+                ScheduledJob.leased_by == self.worker_id,
+                ScheduledJob.lease_expires_at.is_(None),
+                ScheduledJob.lease_expires_at < now,
+            ),
+        ]
+        if not force:
+            conditions.append(
+                or_(
+                    ScheduledJob.last_run_at.is_(None),
+                    ScheduledJob.last_run_at <= now - timedelta(seconds=job.interval),
+                )
+            )
+
+        # A single UPDATE, so two processes never both take the lease
+        acquired = db.session.execute(
+            db.update(ScheduledJob)
+            .where(*conditions)
+            .values(
+                leased_by=self.worker_id,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+
+        return db.session.get(ScheduledJob, job.name) if acquired else None
+
+    def run_job(self, name, force=False):
+        """
+        Run a job once if this process holds its lease and the job is due.
+
+        force skips the interval check, e.g. to run a job by hand; the lease
+        is still required, so a job never runs twice at the same time.
+
+        Returns:
+            the number of rows the job touched, or None if it did not run
+        """
+        job = self.jobs[name]
+        now = datetime.utcnow()
+        lease = self._acquire(job, now, force)
+        if lease is None:
+            with self._lock:
+                self._stats[name]["skipped"] += 1
+            return None
+
+        since = lease.last_run_at or now - timedelta(seconds=job.interval)
+        started = time.perf_counter()
+        try:
+            rows = job.func(since, now)
+            lease.last_run_at = now
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            with self._lock:
+                self._stats[name]["errors"] += 1
+                self._stats[name]["last_error"] = str(e)
+            raise
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats[name]
+            stats["runs"] += 1
+            stats["rows"] += rows
+            stats["last_rows"] = rows
+            stats["last_duration_ms"] = duration_ms
+            stats["max_duration_ms"] = max(stats["max_duration_ms"] or 0, duration_ms)
+            stats["total_duration_ms"] += duration_ms
+
+        return rows
+
+    def metrics(self):
+        """Lease state and this process's run times and row counts per job"""
+        leases = {lease.name: lease for lease in ScheduledJob.query.all()}
+        with self._lock:
+            stats = {name: dict(job_stats) for name, job_stats in self._stats.items()}
+
+        jobs = {}
+        for name, job in self.jobs.items():
+            job_stats = stats[name]
+            total_duration = job_stats.pop("total_duration_ms")
+            lease = leases.get(name)
+            jobs[name] = {
+                "interval_seconds": job.interval,
+                "leased_by": lease.leased_by if lease else None,
+                "lease_expires_at": (
+                    lease.lease_expires_at.isoformat()
+                    if lease and lease.lease_expires_at
+                    else None
+                ),
+                "last_run_at": (
+                    lease.last_run_at.isoformat()
+                    if lease and lease.last_run_at
+                    else None
+                ),
+                "avg_duration_ms": (
+                    total_duration / job_stats["runs"] if job_stats["runs"] else None
+                ),
+                **job_stats,
+            }
+
+        return {"worker_id": self.worker_id, "jobs": jobs}
+
+
+scheduler = JobScheduler()
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from ..extensions import db
+from ..models.models import Task, UserStreak
+
+
+def record_completion(user_id, completed_at):
+    """
+    Fold one task completion into the user's streak state.
+
+    Runs inside the caller's transaction and costs one primary-key lookup,
+    whatever the length of the user's history.
+
+    Returns:
+        UserStreak: The updated streak state
+    """
+    day = completed_at.date()
+    streak = db.session.get(UserStreak, user_id)
+
+    if streak is None:
+        streak = UserStreak(user_id=user_id, current_streak=0, longest_streak=0)
+        db.session.add(streak)
+
+    last_day = streak.last_completion_date
+    if last_day is not None and day <= last_day:
+        # Same day (or an out-of-order completion) doesn't extend the streak
+        return streak
+
+    if last_day is not None and day == last_day + timedelta(days=1):
+        streak.current_streak += 1
+    else:
+        streak.current_streak = 1
+
+    streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+    streak.last_completion_date = day
+    return streak
+
+
+def active_streak(streak, today=None):
+    """
+    Current streak length as of today.
+
+    A streak stays alive until a full day passes without a completion.
+    """
+    if streak is None or streak.last_completion_date is None:
+        return 0
+
+    today = today or datetime.utcnow().date()
+    if streak.last_completion_date >= today - timedelta(days=1):
+        return streak.current_streak
+    return 0
+
+
+def calculate_streak(user_id):
+    """Calculate consecutive days of task completion"""
+    return active_streak(db.session.get(UserStreak, user_id))
+
+
+def get_streak_summary(user_id):
+    """Return the user's current and longest streaks"""
+    streak = db.session.get(UserStreak, user_id)
+    return {
+        "current_streak": active_streak(streak),
+        "longest_streak": streak.longest_streak if streak else 0,
+    }
+
+
+def backfill_streaks():
+    """
+    Rebuild every user's streak state from completed tasks.
+
+    Streams distinct (user, completion day) pairs in order, so memory grows
+    with the number of users rather than the number of tasks.
+
+    Returns:
+        int: Number of users whose streak state was written
+    """
+    day = func.date(Task.completed_at).label("day")
+    rows = (
+        db.session.query(Task.assigned_to, day)
+        .filter(
+            Task.completed == True,
+            Task.completed_at.isnot(None),
+            Task.assigned_to.isnot(None),
+        )
+        .group_by(Task.assigned_to, day)
+        .order_by(Task.assigned_to, day)
+        .yield_per(1000)
+    )
+
+    states = []
+    user_id, current, longest, last_day = None, 0, 0, None
+    for row in rows:
+        completion_day = datetime.strptime(str(row.day)[:10], "%Y-%m-%d").date()
+
+        if row.assigned_to != user_id:
+            if user_id is not None:
+                states.append((user_id, current, longest, last_day))
+            user_id, current, longest = row.assigned_to, 0, 0
+            last_day = None
+
+        if last_day is not None and completion_day == last_day + timedelta(days=1):
+            current += 1
+        else:
+            current = 1
+        longest = max(longest, current)
+        last_day = completion_day
+
+    if user_id is not None:
+        states.append((user_id, current, longest, last_day))
+
+    db.session.query(UserStreak).delete()
+    if states:
+        now = datetime.utcnow()
+        db.session.execute(
+            UserStreak.__table__.insert(),
+            [
+                {
+                    "user_id": state[0],
+                    "current_streak": state[1],
+                    "longest_streak": state[2],
+                    "last_completion_date": state[3],
+                    "updated_at": now,
+                }
+                for state in states
+            ],
+        )
+    db.session.commit()
+
+    return len(states)
@@ -1,97 +1,655 @@
+import uuid
+from collections import Counter
 from datetime import datetime, timedelta
-from ..models.models import Task, User, user_households
+from flask import current_app
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from ..extensions import db
+from ..models.models import RecurringTaskRule, Task, user_households
+from .assignment_utils import adjust_open_tasks, choose_assignees, recount_open_tasks
+from .etag_utils import bump_household_version
+from .notification_utils import insert_notifications
 
+# Statuses a task can have; overdue depends on the time, so it is not stored
+TASK_STATUSES = ("pending", "overdue", "completed")
 
-def auto_assign_task(household_id, preferred_user_id=None):
-    """Auto-assign task using preference-aware round-robin"""
-    # Get eligible users
-    users = (
-        User.query.join(user_households)
+
+def task_status(task, now):
+    """A task's status at now; matches task_status_expression()"""
+    if task.completed:
+        return "completed"
+    if task.due_date and task.due_date < now:
+        return "overdue"
+    return "pending"
+
+
+def task_status_expression(now):
+    """SQL expression for a task's status at now"""
+    return case(
+        (Task.completed == True, "completed"),
+        (Task.due_date < now, "overdue"),
+        else_="pending",
+    )
+
+
+def task_status_filter(status, now):
+    """
+    Condition for tasks with a status at now.
+
+    Written as ranges on completed and due_date rather than on the status
+    expression, so the (household_id, completed, due_date) index serves it.
+    """
+    if status == "completed":
+        return Task.completed == True
+    if status == "overdue":
+        return (Task.completed == False) & (Task.due_date < now)
+    return (Task.completed == False) & (
+        Task.due_date.is_(None) | (Task.due_date >= now)
+    )
+
+
+def count_tasks_by_status(household_id, now):
+    """
+    Count a household's tasks per status with one aggregate query.
+
+    Returns:
+        dict of every status in TASK_STATUSES to its count
+    """
+    status = task_status_expression(now)
+    counts = dict(
+        db.session.query(status, func.count())
+        .filter(Task.household_id == household_id)
+        .group_by(status)
+        .all()
+    )
+    return {name: counts.get(name, 0) for name in TASK_STATUSES}
+
+
+def occurrence_due(rule, index):
+    """Due date of a rule's index-th occurrence; the template task is the 0th"""
+    return rule.anchor_date + timedelta(days=rule.interval_days * index)
+
+
+def occurrence_index(rule, due_date):
+    """Index of the first occurrence due at or after due_date"""
+    if due_date <= rule.anchor_date:
+        return 0
+    interval = timedelta(days=rule.interval_days)
+    return -(-(due_date - rule.anchor_date) // interval)
+
+
+def occurrence_id(parent_id, index):
+    """Id of an occurrence that has no task row yet"""
+    return f"{parent_id}:{index}"
+
+
+def _within_rule(rule, due_date):
+    return rule.end_date is None or due_date <= rule.end_date
+
+
+def schedule_rule(rule):
+    """
+    Point a rule at its first occurrence without a row.
+
+    Call after creating a rule or changing its interval or end date; later
+    occurrences are created by materialize_occurrences() as they come due.
+    """
+    # Without autoflush, a new rule is inserted with next_due_at already set
+    with db.session.no_autoflush:
+        last_due = (
+            db.session.query(db.func.max(Task.due_date))
+            .filter(Task.recurrence_parent_id == rule.task_id)
+            .scalar()
+        ) or rule.anchor_date
+
+    rule.next_due_at = _next_due_after(rule, last_due)
+
+
+def _next_due_after(rule, last_due):
+    """Due date of the rule's first occurrence after last_due, None past its end"""
+    index = occurrence_index(rule, last_due)
+    if occurrence_due(rule, index) <= last_due:
+        index += 1
+    next_due = occurrence_due(rule, index)
+    return next_due if _within_rule(rule, next_due) else None
+
+
+def materialize_occurrences(rules, until):
+    """
+    Create task rows for the rules' occurrences due up to until.
+
+    Writes every row with one INSERT and moves every rule's next_due_at
+    with one compare-and-set UPDATE, however many rules and occurrences
+    there are. Occurrences another request created first are skipped by
+    the unique (recurrence_parent_id, due_date) index.
+
+    Returns:
+        the number of occurrences written
+    """
+    rows = []
+    moves = []
+    for rule in rules:
+        parent = rule.task
+        start = rule.next_due_at
+        if parent is None or start is None or start > until:
+            continue
+
+        index = occurrence_index(rule, start)
+        due_date = occurrence_due(rule, index)
+        while due_date <= until and _within_rule(rule, due_date):
+            rows.append(
+                {
+                    "title": parent.title,
+                    "frequency": parent.frequency,
+                    "household_id": parent.household_id,
+                    "created_by": parent.created_by,
+                    "due_date": due_date,
+                    "recurrence_parent_id": parent.id,
+                }
+            )
+            index += 1
+            due_date = occurrence_due(rule, index)
+
+        next_due = due_date if _within_rule(rule, due_date) else None
+        moves.append({"rule_id": rule.id, "start": start, "next_due": next_due})
+        set_committed_value(rule, "next_due_at", next_due)
+
+    if not moves:
+        return 0
+
+    if rows:
+        # Earliest occurrences first, assigned in order so the rotation continues
+        rows.sort(key=lambda row: row["due_date"])
+        assignees = choose_assignees(
+            [(row["household_id"], row["title"], None) for row in rows]
+        )
+        now = datetime.utcnow()
+        for offset, (row, assigned_to) in enumerate(zip(rows, assignees)):
+            row["id"] = str(uuid.uuid4())
+            row["completed"] = False
+            row["created_at"] = now + timedelta(microseconds=offset)
+            row["assigned_to"] = assigned_to
+
+        table = Task.__table__
+        dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+        inserted = db.session.execute(
+            dialect.insert(table).on_conflict_do_nothing(
+                index_elements=[table.c.recurrence_parent_id, table.c.due_date]
+            ),
+            rows,
+        ).rowcount
+        household_ids = {row["household_id"] for row in rows}
+        bump_household_version(*household_ids)
+
+        if inserted == len(rows) and db.engine.dialect.supports_sane_multi_rowcount:
+            adjust_open_tasks(
+                Counter(
+                    (row["assigned_to"], row["household_id"])
+                    for row in rows
+                    if row["assigned_to"]
+                )
+            )
+        else:
+            # Some occurrences already existed; count what is really there
+            recount_open_tasks(household_ids)
+
+    rules_table = RecurringTaskRule.__table__
+    db.session.execute(
+        rules_table.update()
+        .where(
+            rules_table.c.id == db.bindparam("rule_id"),
+            rules_table.c.next_due_at == db.bindparam("start"),
+        )
+        .values(next_due_at=db.bindparam("next_due")),
+        moves,
+    )
+
+    return len(rows)
+
+
+def materialize_due_occurrences(household_id=None, now=None):
+    """
+    Create rows for recurring occurrences due within the horizon.
+
+    Occurrences further out stay virtual: they are listed by
+    expand_occurrences() and only get a row once they are near due or a
+    member acts on them. Limited to one household when household_id is set.
+
+    Returns:
+        the number of tasks created
+    """
+    until = (now or datetime.utcnow()) + timedelta(
+        hours=current_app.config["RECURRING_TASK_HORIZON_HOURS"]
+    )
+    query = RecurringTaskRule.query.options(joinedload(RecurringTaskRule.task)).filter(
+        RecurringTaskRule.next_due_at <= until
+    )
+    if household_id:
+        query = query.join(Task, Task.id == RecurringTaskRule.task_id).filter(
+            Task.household_id == household_id
+        )
+
+    return materialize_occurrences(query.all(), until)
+
+
+def expand_occurrences(household_id, start, end):
+    """
+    List the virtual occurrences of a household's recurring tasks.
+
+    Returns unsaved Task objects for every occurrence due in [start, end)
+    that has no row yet, with occurrence_id() ids and no assignee (members
+    are assigned when the row is created).
+    """
+    rules = (
+        RecurringTaskRule.query.join(Task, Task.id == RecurringTaskRule.task_id)
         .filter(
-            user_households.c.household_id == household_id,
-            user_households.c.role.in_(["member", "admin"]),
+            Task.household_id == household_id,
+            RecurringTaskRule.next_due_at.isnot(None),
+            RecurringTaskRule.next_due_at < end,
         )
         .all()
     )
 
-    if not users:
+    occurrences = []
+    for rule in rules:
+        parent = rule.task
+        index = occurrence_index(rule, max(start, rule.next_due_at))
+        due_date = occurrence_due(rule, index)
+        while due_date < end and _within_rule(rule, due_date):
+            occurrences.append(
+                Task(
+                    id=occurrence_id(parent.id, index),
+                    title=parent.title,
+                    frequency=parent.frequency,
+                    household_id=parent.household_id,
+                    created_by=parent.created_by,
+                    due_date=due_date,
+                    completed=False,
+                    recurrence_parent_id=parent.id,
+                )
+            )
+            index += 1
+            due_date = occurrence_due(rule, index)
+
+    return occurrences
+
+
+def get_task_or_occurrence(task_id):
+    """
+    Load a task by id, creating the row first for a virtual occurrence id.
+
+    Materializing an occurrence also creates the rows of the virtual
+    occurrences due before it, so the rule's next_due_at stays the one
+    boundary between rows and virtual occurrences. Nothing is committed.
+
+    Returns:
+        the Task, or None if there is no such task or occurrence
+    """
+    if ":" not in task_id:
+        return Task.query.get(task_id)
+
+    parent_id, _, index = task_id.partition(":")
+    parent = Task.query.get(parent_id)
+    if not parent or not parent.recurring_rule or not index.isdigit():
         return None
 
-    # Try preferred user first
-    if preferred_user_id:
-        preferred = next((u for u in users if u.id == preferred_user_id), None)
-        if preferred:
-            return preferred.id
-
-    # Get last assigned user
-    last_task = (
-        Task.query.filter_by(household_id=household_id)
-        .order_by(Task.created_at.desc())
-        .first()
-    )
+    rule = parent.recurring_rule
+    due_date = occurrence_due(rule, int(index))
+    if int(index) == 0 or not _within_rule(rule, due_date):
+        return None
+    if rule.next_due_at is not None and due_date >= rule.next_due_at:
+        materialize_occurrences([rule], due_date)
 
-    # Round-robin assignment
-    last_index = (
-        users.index(next(u for u in users if u.id == last_task.assigned_to))
-        if last_task
-        else -1
+    # Already a row, or deleted if it was materialized and is gone now
+    return Task.query.filter_by(
+        recurrence_parent_id=parent.id, due_date=due_date
+    ).first()
+
+
+def notify_overdue_tasks(since, now):
+    """
+    Tell assignees about their open tasks that fell due in (since, now].
+
+    Returns:
+        the number of notifications written
+    """
+    tasks = db.session.execute(
+        db.select(Task.id, Task.title, Task.household_id, Task.assigned_to).where(
+            Task.completed == False,
+            Task.due_date > since,
+            Task.due_date <= now,
+            Task.assigned_to.isnot(None),
+        )
+    ).all()
+
+    insert_notifications(
+        [
+            {
+                "type": "task_overdue",
+                "content": f"Task '{task.title}' is overdue",
+                "user_id": task.assigned_to,
+                "household_id": task.household_id,
+                "reference_type": "task",
+                "reference_id": task.id,
+            }
+            for task in tasks
+        ]
     )
-    next_index = (last_index + 1) % len(users)
+    return len(tasks)
+
+
+def valid_interval_days(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
 
-    return users[next_index].id
 
+def _parse_datetime(value):
+    return datetime.fromisoformat(value) if value else None
 
-def generate_recurring_tasks(parent_task_id, rule):
-    """Generate future instances of recurring tasks"""
-    parent = Task.query.get(parent_task_id)
-    if not parent or not rule:
-        return
 
-    current_date = parent.due_date
-    existing = (
-        Task.query.filter_by(created_by=parent.created_by)
-        .filter(Task.due_date > current_date)
-        .count()
+def _parse_item_datetime(item, field):
+    """Parse an optional ISO datetime field of a bulk item; raises ValueError"""
+    try:
+        return _parse_datetime(item.get(field))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {field}")
+
+
+def _new_task_fields(item):
+    """Check one bulk create item; raises ValueError with the reason"""
+    if not isinstance(item, dict):
+        raise ValueError("Each task must be an object")
+    if not isinstance(item.get("title"), str) or not item["title"].strip():
+        raise ValueError("title is required")
+    if item.get("is_recurring") and not valid_interval_days(item.get("interval_days")):
+        raise ValueError("interval_days must be a positive integer")
+    if not isinstance(item.get("frequency", "one_time"), str):
+        raise ValueError("Invalid frequency")
+    if not isinstance(item.get("preferred_assignee") or "", str):
+        raise ValueError("Invalid preferred_assignee")
+
+    return {
+        "title": item["title"],
+        "frequency": item.get("frequency", "one_time"),
+        "due_date": _parse_item_datetime(item, "due_date"),
+        "end_date": _parse_item_datetime(item, "end_date"),
+    }
+
+
+def bulk_create_tasks(household_id, user_id, items):
+    """
+    Create many tasks of a household in the caller's transaction.
+
+    Items are checked one by one and the valid ones are written: every
+    assignee is chosen in one batch, then tasks and recurring rules each go
+    in with one executemany INSERT.
+
+    Args:
+        items (list): task fields as accepted by POST /households/<id>/tasks
+
+    Returns:
+        list of {"index", "code"} per item, with "task_id" and
+        "assigned_to" if the task was created, else "error"
+    """
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, item, _new_task_fields(item)))
+        except ValueError as e:
+            results.append({"index": index, "code": 400, "error": str(e)})
+    if not valid:
+        return results
+
+    assignees = choose_assignees(
+        [
+            (household_id, fields["title"], item.get("preferred_assignee"))
+            for _, item, fields in valid
+        ]
     )
 
-    # Generate up to 6 months ahead
-    while current_date < (datetime.utcnow() + timedelta(days=180)) and (
-        rule.end_date is None or current_date < rule.end_date
+    now = datetime.utcnow()
+    tasks = []
+    rules = []
+    for offset, ((index, item, fields), assigned_to) in enumerate(
+        zip(valid, assignees)
     ):
+        task_id = str(uuid.uuid4())
+        tasks.append(
+            {
+                "id": task_id,
+                "title": fields["title"],
+                "frequency": fields["frequency"],
+                "household_id": household_id,
+                "created_by": user_id,
+                "assigned_to": assigned_to,
+                "due_date": fields["due_date"],
+                "completed": False,
+                # Distinct creation times keep the items' order in lists
+                "created_at": now + timedelta(microseconds=offset),
+            }
+        )
+        if item.get("is_recurring"):
+            # Later occurrences stay virtual until they come due
+            rule = RecurringTaskRule(
+                interval_days=item["interval_days"],
+                anchor_date=fields["due_date"] or now,
+                end_date=fields["end_date"],
+            )
+            rules.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "task_id": task_id,
+                    "interval_days": rule.interval_days,
+                    "anchor_date": rule.anchor_date,
+                    "end_date": rule.end_date,
+                    "next_due_at": _next_due_after(rule, rule.anchor_date),
+                }
+            )
+        results.append(
+            {
+                "index": index,
+                "code": 201,
+                "task_id": task_id,
+                "assigned_to": assigned_to,
+            }
+        )
 
-        if existing == 0:
-            from extensions import db
+    db.session.execute(Task.__table__.insert(), tasks)
+    if rules:
+        db.session.execute(RecurringTaskRule.__table__.insert(), rules)
+    bump_household_version(household_id)
+    adjust_open_tasks(
+        Counter((assigned_to, household_id) for assigned_to in assignees if assigned_to)
+    )
 
-            new_task = Task(
-                title=parent.title,
-                frequency=parent.frequency,
-                household_id=parent.household_id,
-                created_by=parent.created_by,
-                assigned_to=auto_assign_task(parent.household_id),
-                due_date=current_date + timedelta(days=rule.interval_days),
-            )
-            db.session.add(new_task)
+    return sorted(results, key=lambda result: result["index"])
 
-        current_date += timedelta(days=rule.interval_days)
-        existing -= 1
 
+# Fields a bulk update may set; recurrence changes go through PATCH /tasks/<id>
+BULK_UPDATE_FIELDS = ("id", "title", "due_date", "assigned_to", "completed")
 
-def calculate_streak(user_id):
-    """Calculate consecutive days of task completion"""
-    completed_tasks = (
-        Task.query.filter_by(assigned_to=user_id, completed=True)
-        .order_by(Task.completed_at.desc())
-        .all()
-    )
 
-    streak = 0
-    current_date = datetime.utcnow().date()
+def _updated_task(task, item, user_id, is_admin, member_ids):
+    """
+    Apply one bulk update item to a task row's values.
+
+    Mirrors the single-task endpoints: the creator or an admin may edit a
+    task, and only its assignee may complete it.
+
+    Returns:
+        (dict of the task's new values, None) or (None, (code, error))
+    """
+    unsupported = sorted(set(item) - set(BULK_UPDATE_FIELDS))
+    if unsupported:
+        return None, (400, f"Unsupported fields: {', '.join(unsupported)}")
+
+    edits = {field for field in ("title", "due_date", "assigned_to") if field in item}
+    if edits and task.created_by != user_id and not is_admin:
+        return None, (403, "Not authorized to update this task")
+
+    values = {
+        "task_id": task.id,
+        "new_title": task.title,
+        "new_due_date": task.due_date,
+        "new_assigned_to": task.assigned_to,
+        "new_completed": task.completed,
+        "new_completed_at": task.completed_at,
+    }
+    if "title" in item:
+        if not isinstance(item["title"], str) or not item["title"].strip():
+            return None, (400, "title is required")
+        values["new_title"] = item["title"]
+    if "due_date" in item:
+        try:
+            values["new_due_date"] = _parse_item_datetime(item, "due_date")
+        except ValueError as e:
+            return None, (400, str(e))
+    if "assigned_to" in item:
+        if item["assigned_to"] and (
+            not isinstance(item["assigned_to"], str)
+            or item["assigned_to"] not in member_ids
+        ):
+            return None, (400, "Invalid assignee")
+        values["new_assigned_to"] = item["assigned_to"] or None
+
+    if "completed" in item:
+        if item["completed"] is not True:
+            return None, (400, "completed can only be set to true")
+        if task.completed:
+            return None, (400, "Task already completed")
+        if values["new_assigned_to"] != user_id:
+            return None, (403, "Task not assigned to you")
+        values["new_completed"] = True
+        values["new_completed_at"] = datetime.utcnow()
+
+    return values, None
+
+
+def bulk_update_tasks(household_id, user_id, is_admin, items):
+    """
+    Edit and complete many tasks of a household in the caller's transaction.
+
+    Tasks are read with one query and every valid item is written with one
+    executemany UPDATE. Reassigned tasks notify their new assignees in one
+    batch. Occurrences without a row yet are created first, one by one.
+
+    Args:
+        items (list): dicts with the task "id" and any of title, due_date,
+            assigned_to and completed (true)
+
+    Returns:
+        (list of {"index", "code", "task_id"} per item, with "error" if it
+        was not applied, number of tasks completed)
+    """
+    ids = [
+        (
+            item.get("id")
+            if isinstance(item, dict) and isinstance(item.get("id"), str)
+            else None
+        )
+        for item in items
+    ]
+
+    # Occurrences materialize under their own ids
+    real_ids = {}
+    for task_id in ids:
+        if isinstance(task_id, str) and ":" in task_id and task_id not in real_ids:
+            task = get_task_or_occurrence(task_id)
+            real_ids[task_id] = task.id if task else None
 
-    for task in completed_tasks:
-        task_date = task.completed_at.date()
-        if task_date == current_date - timedelta(days=streak):
-            streak += 1
+    tasks = {
+        task.id: task
+        for task in db.session.execute(
+            db.select(
+                Task.id,
+                Task.title,
+                Task.due_date,
+                Task.assigned_to,
+                Task.completed,
+                Task.completed_at,
+                Task.created_by,
+            ).where(
+                Task.household_id == household_id,
+                Task.id.in_(
+                    [real_ids.get(task_id, task_id) for task_id in ids if task_id]
+                ),
+            )
+        )
+    }
+    member_ids = set()
+    if any(isinstance(item, dict) and item.get("assigned_to") for item in items):
+        member_ids = set(
+            db.session.execute(
+                db.select(user_households.c.user_id).where(
+                    user_households.c.household_id == household_id
+                )
+            ).scalars()
+        )
+
+    results = []
+    updates = []
+    seen = set()
+    for index, (item, task_id) in enumerate(zip(items, ids)):
+        task = tasks.get(real_ids.get(task_id, task_id)) if task_id else None
+        if task is None:
+            error = (404, "Task not found") if task_id else (400, "id is required")
+        elif task.id in seen:
+            error = (400, "Task appears more than once")
         else:
-            break
+            values, error = _updated_task(task, item, user_id, is_admin, member_ids)
+        if error:
+            code, message = error
+            results.append(
+                {"index": index, "code": code, "task_id": task_id, "error": message}
+            )
+            continue
 
-    return streak
+        seen.add(task.id)
+        updates.append((task, values))
+        results.append({"index": index, "code": 200, "task_id": task.id})
+
+    if not updates:
+        return results, 0
+
+    table = Task.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == db.bindparam("task_id"))
+        .values(
+            title=db.bindparam("new_title"),
+            due_date=db.bindparam("new_due_date"),
+            assigned_to=db.bindparam("new_assigned_to"),
+            completed=db.bindparam("new_completed"),
+            completed_at=db.bindparam("new_completed_at"),
+        ),
+        [values for _, values in updates],
+    )
+    bump_household_version(household_id)
+
+    deltas = Counter()
+    notifications = []
+    for task, values in updates:
+        if task.assigned_to and not task.completed:
+            deltas[(task.assigned_to, household_id)] -= 1
+        if values["new_assigned_to"] and not values["new_completed"]:
+            deltas[(values["new_assigned_to"], household_id)] += 1
+        if values["new_assigned_to"] and values["new_assigned_to"] != task.assigned_to:
+            notifications.append(
+                {
+                    "type": "task_assignment",
+                    "content": f"Task '{values['new_title']}' has been assigned to you",
+                    "user_id": values["new_assigned_to"],
+                    "household_id": household_id,
+                    "reference_type": "task",
+                    "reference_id": task.id,
+                }
+            )
+    adjust_open_tasks(deltas)
+    insert_notifications(notifications)
+
+    completed = sum(
+        1 for task, values in updates if values["new_completed"] and not task.completed
+    )
+    return results, completed
@@ -0,0 +1,111 @@
+import os
+import socket
+import threading
+import time
+from ..extensions import socketio
+
+
+class TypingAggregator:
+    """
+    In-memory record of who is typing in each household.
+
+    typing_start and typing_stop only update a dict; a background task
+    broadcasts the full set of typers for every household whose set changed,
+    at most once per tick, and drops entries that were not renewed within
+    the TTL, so a client that never sends typing_stop stops showing as
+    typing on its own.
+
+    Each worker only knows the typers connected to it, so broadcasts carry
+    the worker's id as "source"; clients keep the latest set per source.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.tick_interval = 0.3
+        self.ttl = 5
+        self.source = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._typing = {}  # household_id -> {user_id: (expires_at, user_name)}
+        self._changed = set()  # household_ids to broadcast on the next tick
+
+    def init_app(self, app):
+        self.app = app
+        self.tick_interval = app.config["TYPING_TICK_INTERVAL"]
+        self.ttl = app.config["TYPING_TTL"]
+        self.source = app.config["PRESENCE_SERVER_ID"] or self.source
+
+    def start(self):
+        """Start the broadcast tick; call once per process after init_app"""
+        socketio.start_background_task(self._run)
+
+    def start_typing(self, household_id, user_id, user_name):
+        """Record or renew a typer; only new typers trigger a broadcast"""
+        with self._lock:
+            typers = self._typing.setdefault(household_id, {})
+            if user_id not in typers:
+                self._changed.add(household_id)
+            typers[user_id] = (time.monotonic() + self.ttl, user_name)
+
+    def stop_typing(self, household_id, user_id):
+        with self._lock:
+            typers = self._typing.get(household_id, {})
+            if typers.pop(user_id, None):
+                self._changed.add(household_id)
+                if not typers:
+                    self._typing.pop(household_id, None)
+
+    def typing_users(self, household_id):
+        with self._lock:
+            return self._snapshot(household_id)
+
+    def _snapshot(self, household_id):
+        return [
+            {"user_id": user_id, "user_name": user_name}
+            for user_id, (_, user_name) in self._typing.get(household_id, {}).items()
+        ]
+
+    def collect(self):
+        """
+        Expire stale typers and take the sets that changed since the last tick.
+
+        Returns:
+            dict: {household_id: [{"user_id", "user_name"}]}
+        """
+        now = time.monotonic()
+        with self._lock:
+            for household_id, typers in list(self._typing.items()):
+                expired = [
+                    user_id
+                    for user_id, (expires_at, _) in typers.items()
+                    if expires_at <= now
+                ]
+                for user_id in expired:
+                    del typers[user_id]
+                if expired:
+                    self._changed.add(household_id)
+                if not typers:
+                    del self._typing[household_id]
+
+            changed, self._changed = self._changed, set()
+            return {
+                household_id: self._snapshot(household_id) for household_id in changed
+            }
+
+    def broadcast(self):
+        for household_id, users in self.collect().items():
+            socketio.emit(
+                "typing_users",
+                {"household_id": household_id, "users": users, "source": self.source},
+                room=f"household_{household_id}",
+            )
+
+    def _run(self):
+        while True:
+            try:
+                self.broadcast()
+            except Exception:
+                self.app.logger.exception("Typing broadcast failed")
+            socketio.sleep(self.tick_interval)
+
+
+typing_aggregator = TypingAggregator()
@@ -0,0 +1,37 @@
+"""user streak state
+
+Per-user streak counters maintained by complete_task. Populate existing
+installations with `flask backfill-streaks` after upgrading.
+
+Revision ID: 07b100f07fba
+Revises: 9fe2ce21fa2f
+Create Date: 2026-10-17 06:04:53.572172
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '07b100f07fba'
+down_revision = '9fe2ce21fa2f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_streaks",
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("last_completion_date", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("user_streaks")
@@ -0,0 +1,51 @@
+"""assignment state
+
+Open task counts and the time of the latest assignment per membership,
+used by auto-assignment. Both are filled in from existing tasks.
+
+Revision ID: 3cfa10beda79
+Revises: 4575210e539e
+Create Date: 2026-10-17 06:54:21.113916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3cfa10beda79'
+down_revision = '4575210e539e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs create_all(), which may have added the columns already
+    columns = sa.inspect(op.get_bind()).get_columns("user_households")
+    columns = {column["name"] for column in columns}
+    if "open_tasks" not in columns:
+        op.add_column(
+            "user_households",
+            sa.Column("open_tasks", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if "last_assigned_at" not in columns:
+        op.add_column(
+            "user_households",
+            sa.Column("last_assigned_at", sa.DateTime(), nullable=True),
+        )
+
+    op.execute(
+        "UPDATE user_households SET "
+        "open_tasks = (SELECT COUNT(*) FROM tasks "
+        "WHERE tasks.assigned_to = user_households.user_id "
+        "AND tasks.household_id = user_households.household_id "
+        "AND tasks.completed IS NOT TRUE), "
+        "last_assigned_at = (SELECT MAX(tasks.created_at) FROM tasks "
+        "WHERE tasks.assigned_to = user_households.user_id "
+        "AND tasks.household_id = user_households.household_id)"
+    )
+
+
+def downgrade():
+    op.drop_column("user_households", "last_assigned_at")
+    op.drop_column("user_households", "open_tasks")
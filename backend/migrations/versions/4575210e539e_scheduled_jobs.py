@@ -0,0 +1,54 @@
+"""scheduled jobs
+
+Lease rows for the background job scheduler, and indexes for the jobs'
+scans across households: open tasks by due date, polls by expiry and read
+notifications by age.
+
+Revision ID: 4575210e539e
+Revises: b3ea6c6bf30f
+Create Date: 2026-10-17 06:49:27.985587
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4575210e539e'
+down_revision = 'b3ea6c6bf30f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("leased_by", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_completed_due",
+        "tasks",
+        ["completed", "due_date"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_polls_expires_at", "polls", ["expires_at"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_notifications_read_created",
+        "notifications",
+        ["is_read", "created_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notifications_read_created", table_name="notifications")
+    op.drop_index("ix_polls_expires_at", table_name="polls")
+    op.drop_index("ix_tasks_completed_due", table_name="tasks")
+    op.drop_table("scheduled_jobs")
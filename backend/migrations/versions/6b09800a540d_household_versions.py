@@ -0,0 +1,33 @@
+"""household versions
+
+Per-household version counter backing the ETags of household list
+endpoints.
+
+Revision ID: 6b09800a540d
+Revises: fed0e60072c1
+Create Date: 2026-10-17 09:12:41.508317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b09800a540d'
+down_revision = 'fed0e60072c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs create_all(), which may have added the column already
+    columns = sa.inspect(op.get_bind()).get_columns("households")
+    if "version" not in {column["name"] for column in columns}:
+        op.add_column(
+            "households",
+            sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade():
+    op.drop_column("households", "version")
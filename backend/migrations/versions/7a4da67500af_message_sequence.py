@@ -0,0 +1,64 @@
+"""message sequence
+
+Per-household sequence numbers on chat changes, edit timestamps and
+tombstones for deleted messages. Existing messages are numbered in
+creation order.
+
+Revision ID: 7a4da67500af
+Revises: 6b09800a540d
+Create Date: 2026-10-17 06:30:28.779788
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4da67500af'
+down_revision = '6b09800a540d'
+branch_labels = None
+depends_on = None
+
+
+def _add_column(table, column):
+    # create_app() runs create_all(), which may have added the column already
+    columns = sa.inspect(op.get_bind()).get_columns(table)
+    if column.name not in {existing["name"] for existing in columns}:
+        op.add_column(table, column)
+
+
+def upgrade():
+    _add_column(
+        "households",
+        sa.Column("message_seq", sa.Integer(), nullable=False, server_default="0"),
+    )
+    _add_column("messages", sa.Column("edited_at", sa.DateTime(), nullable=True))
+    _add_column("messages", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    _add_column("messages", sa.Column("seq", sa.Integer(), nullable=True))
+
+    op.execute(
+        "UPDATE messages SET seq = (SELECT numbered.seq FROM ("
+        "SELECT id, ROW_NUMBER() OVER ("
+        "PARTITION BY household_id ORDER BY created_at, id) AS seq "
+        "FROM messages) AS numbered WHERE numbered.id = messages.id)"
+    )
+    op.execute(
+        "UPDATE households SET message_seq = COALESCE(("
+        "SELECT MAX(seq) FROM messages "
+        "WHERE messages.household_id = households.id), 0)"
+    )
+    op.create_index(
+        "ix_messages_household_seq",
+        "messages",
+        ["household_id", "seq"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_messages_household_seq", table_name="messages")
+    op.drop_column("messages", "seq")
+    op.drop_column("messages", "deleted_at")
+    op.drop_column("messages", "edited_at")
+    op.drop_column("households", "message_seq")
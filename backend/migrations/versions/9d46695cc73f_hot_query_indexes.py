@@ -0,0 +1,60 @@
+"""hot query indexes
+
+Composite indexes for the household-scoped queries behind task lists,
+streaks, notification feeds, calendars, polls and chat history.
+
+The base tables predate migrations and are created by db.create_all(), which
+also builds these indexes on fresh databases, hence if_not_exists.
+
+Revision ID: 9d46695cc73f
+Revises:
+Create Date: 2026-10-17 06:00:21.503605
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d46695cc73f'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_user_households_household", "user_households", ["household_id"]),
+    (
+        "ix_tasks_household_completed_due",
+        "tasks",
+        ["household_id", "completed", "due_date"],
+    ),
+    (
+        "ix_tasks_assignee_completed_at",
+        "tasks",
+        ["assigned_to", "completed", "completed_at"],
+    ),
+    (
+        "ix_messages_household_created_id",
+        "messages",
+        ["household_id", "created_at", "id"],
+    ),
+    ("ix_polls_household_created", "polls", ["household_id", "created_at"]),
+    ("ix_votes_user", "votes", ["user_id"]),
+    ("ix_events_household_start", "events", ["household_id", "start_time"]),
+    (
+        "ix_notifications_user_read_created",
+        "notifications",
+        ["user_id", "is_read", "created_at"],
+    ),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,33 @@
+"""task completion history index
+
+Backs the daily completion series in household analytics.
+
+Revision ID: 9fe2ce21fa2f
+Revises: 9d46695cc73f
+Create Date: 2026-10-17 06:01:47.621151
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9fe2ce21fa2f'
+down_revision = '9d46695cc73f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_tasks_household_completed_at",
+        "tasks",
+        ["household_id", "completed_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_tasks_household_completed_at", table_name="tasks", if_exists=True
+    )
@@ -0,0 +1,40 @@
+"""notification counters
+
+Unread notification counts per (user, household), seeded from the
+existing notifications.
+
+Revision ID: af7e5d433d6a
+Revises: cf1d5401a9e4
+Create Date: 2026-10-17 06:15:49.009912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'af7e5d433d6a'
+down_revision = 'cf1d5401a9e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_counters",
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("household_id", sa.String(length=36), nullable=False),
+        sa.Column("unread", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "household_id"),
+        if_not_exists=True,
+    )
+    op.execute(
+        "INSERT INTO notification_counters (user_id, household_id, unread) "
+        "SELECT user_id, household_id, COUNT(*) FROM notifications "
+        "WHERE NOT is_read GROUP BY user_id, household_id"
+    )
+
+
+def downgrade():
+    op.drop_table("notification_counters")
@@ -0,0 +1,145 @@
+"""lazy recurring tasks
+
+Recurring task occurrences are created as they come due instead of six
+months ahead. Occurrence rows point at their template task, and rules keep
+the due date of their first occurrence without a row. Rows generated ahead
+of time by the old code are linked to their rule when they fall on its
+schedule, and each rule continues after its latest row.
+
+Revision ID: b3ea6c6bf30f
+Revises: f130a964eca8
+Create Date: 2026-10-17 06:44:05.238154
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3ea6c6bf30f'
+down_revision = 'f130a964eca8'
+branch_labels = None
+depends_on = None
+
+
+def _parse(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _has_column(bind, table, name):
+    # create_app() runs create_all(), which may have added the column already
+    return name in {column["name"] for column in sa.inspect(bind).get_columns(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not _has_column(bind, "tasks", "recurrence_parent_id"):
+        if bind.dialect.name == "sqlite":
+            # SQLite can add a column with a reference, but not a constraint
+            op.execute(
+                "ALTER TABLE tasks ADD COLUMN recurrence_parent_id VARCHAR(36) "
+                "REFERENCES tasks (id)"
+            )
+        else:
+            op.add_column(
+                "tasks",
+                sa.Column("recurrence_parent_id", sa.String(length=36), nullable=True),
+            )
+            op.create_foreign_key(
+                "fk_tasks_recurrence_parent_id_tasks",
+                "tasks",
+                "tasks",
+                ["recurrence_parent_id"],
+                ["id"],
+            )
+    op.create_index(
+        "ix_tasks_recurrence_parent_due",
+        "tasks",
+        ["recurrence_parent_id", "due_date"],
+        unique=True,
+        if_not_exists=True,
+    )
+    if not _has_column(bind, "recurring_task_rules", "next_due_at"):
+        op.add_column(
+            "recurring_task_rules",
+            sa.Column("next_due_at", sa.DateTime(), nullable=True),
+        )
+    op.create_index(
+        "ix_recurring_task_rules_next_due_at",
+        "recurring_task_rules",
+        ["next_due_at"],
+        if_not_exists=True,
+    )
+
+    rules = bind.execute(
+        sa.text(
+            "SELECT r.id, r.interval_days, r.anchor_date, r.end_date, t.id, "
+            "t.title, t.household_id, t.created_by "
+            "FROM recurring_task_rules r JOIN tasks t ON t.id = r.task_id"
+        )
+    ).all()
+    for rule_id, interval_days, anchor, end, parent_id, title, household_id, creator in rules:
+        anchor = _parse(anchor)
+        end = _parse(end)
+        if not interval_days or interval_days < 1 or anchor is None:
+            continue
+        interval = timedelta(days=interval_days)
+
+        generated = bind.execute(
+            sa.text(
+                "SELECT id, due_date FROM tasks WHERE household_id = :household_id "
+                "AND title = :title AND created_by = :created_by "
+                "AND due_date > :anchor AND id != :parent_id "
+                "AND recurrence_parent_id IS NULL ORDER BY due_date"
+            ).bindparams(sa.bindparam("anchor", type_=sa.DateTime())),
+            {
+                "household_id": household_id,
+                "title": title,
+                "created_by": creator,
+                "anchor": anchor,
+                "parent_id": parent_id,
+            },
+        ).all()
+
+        last_due = anchor
+        for task_id, due_date in generated:
+            due_date = _parse(due_date)
+            if due_date == last_due or (due_date - anchor) % interval:
+                continue
+            bind.execute(
+                sa.text(
+                    "UPDATE tasks SET recurrence_parent_id = :parent_id "
+                    "WHERE id = :task_id"
+                ),
+                {"parent_id": parent_id, "task_id": task_id},
+            )
+            last_due = due_date
+
+        next_due = last_due + interval
+        bind.execute(
+            sa.text(
+                "UPDATE recurring_task_rules SET next_due_at = :next_due "
+                "WHERE id = :rule_id"
+            ).bindparams(sa.bindparam("next_due", type_=sa.DateTime())),
+            {
+                "next_due": next_due if end is None or next_due <= end else None,
+                "rule_id": rule_id,
+            },
+        )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_recurring_task_rules_next_due_at", table_name="recurring_task_rules"
+    )
+    op.drop_column("recurring_task_rules", "next_due_at")
+    op.drop_index("ix_tasks_recurrence_parent_due", table_name="tasks")
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint(
+            "fk_tasks_recurrence_parent_id_tasks", "tasks", type_="foreignkey"
+        )
+    op.drop_column("tasks", "recurrence_parent_id")
@@ -0,0 +1,49 @@
+"""notification outbox
+
+Durable queue of household notifications waiting for background fan-out.
+
+Revision ID: cf1d5401a9e4
+Revises: 07b100f07fba
+Create Date: 2026-10-17 06:14:07.394173
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cf1d5401a9e4'
+down_revision = '07b100f07fba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("type", sa.String(length=50), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("reference_type", sa.String(length=50), nullable=True),
+        sa.Column("reference_id", sa.String(length=36), nullable=True),
+        sa.Column("exclude_user_ids", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_by", sa.String(length=36), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("household_id", sa.String(length=36), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_notification_outbox_available",
+        "notification_outbox",
+        ["available_at", "id"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notification_outbox_available", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
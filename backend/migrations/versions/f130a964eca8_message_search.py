@@ -0,0 +1,60 @@
+"""message search
+
+FTS5 full-text index over chat messages, kept in sync by triggers and
+filled from the existing messages. SQLite only; other databases fall back
+to a substring scan at query time.
+
+Revision ID: f130a964eca8
+Revises: 7a4da67500af
+Create Date: 2026-10-17 06:33:41.757388
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f130a964eca8'
+down_revision = '7a4da67500af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+        "content, household_id, content='messages', content_rowid='rowid', "
+        "tokenize='porter unicode61')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages "
+        "BEGIN INSERT INTO messages_fts (rowid, content, household_id) "
+        "VALUES (new.rowid, new.content, new.household_id); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages "
+        "BEGIN INSERT INTO messages_fts (messages_fts, rowid, content, household_id) "
+        "VALUES ('delete', old.rowid, old.content, old.household_id); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS messages_fts_update "
+        "AFTER UPDATE OF content, household_id ON messages "
+        "BEGIN INSERT INTO messages_fts (messages_fts, rowid, content, household_id) "
+        "VALUES ('delete', old.rowid, old.content, old.household_id); "
+        "INSERT INTO messages_fts (rowid, content, household_id) "
+        "VALUES (new.rowid, new.content, new.household_id); END"
+    )
+    op.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS messages_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS messages_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS messages_fts_insert")
+    op.execute("DROP TABLE IF EXISTS messages_fts")
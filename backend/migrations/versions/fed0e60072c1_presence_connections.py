@@ -0,0 +1,53 @@
+"""presence connections
+
+Socket presence shared between workers when PRESENCE_BACKEND=database.
+
+Revision ID: fed0e60072c1
+Revises: af7e5d433d6a
+Create Date: 2026-10-17 06:17:33.963691
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fed0e60072c1'
+down_revision = 'af7e5d433d6a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "presence_connections",
+        sa.Column("sid", sa.String(length=64), nullable=False),
+        sa.Column("household_id", sa.String(length=36), nullable=False),
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("server_id", sa.String(length=255), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sid", "household_id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_presence_household_user",
+        "presence_connections",
+        ["household_id", "user_id"],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        op.f("ix_presence_connections_server_id"),
+        "presence_connections",
+        ["server_id"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_presence_connections_server_id"), table_name="presence_connections"
+    )
+    op.drop_index("ix_presence_household_user", table_name="presence_connections")
+    op.drop_table("presence_connections")
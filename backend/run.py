@@ -1,7 +1,15 @@
 from app import create_app
 from app.extensions import socketio
+from app.utils.notification_utils import notification_dispatcher
+from app.utils.presence_utils import presence
+from app.utils.scheduler_utils import scheduler
+from app.utils.typing_utils import typing_aggregator
 
 app = create_app()
+notification_dispatcher.start()
+presence.start()
+typing_aggregator.start()
+scheduler.start()
 
 
 if __name__ == "__main__":
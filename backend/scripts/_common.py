@@ -0,0 +1,136 @@
+"""
+Setup shared by the scripts in this directory.
+
+Scripts import this module first and call configure() before importing
+anything from app, since the app reads its configuration at import time.
+For the same reason the helpers below import app lazily.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def configure(db_file=None, db_path=None):
+    """
+    Point the app at a throwaway SQLite database and make it importable.
+
+    The database is in memory unless DATABASE_URL is already set. Scripts
+    that open several connections pass db_file, the name of a file to create
+    in a new temporary directory, or db_path to reuse an existing file.
+
+    Returns:
+        str: Path of the database file, or None for an in-memory database
+    """
+    if db_file and not db_path:
+        db_path = os.path.join(tempfile.mkdtemp(), db_file)
+    if db_path:
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    else:
+        os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("DEBUG", "False")
+    os.environ.setdefault("SCHEDULER_ENABLED", "False")
+
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return db_path
+
+
+def create_users(count, prefix="member"):
+    """
+    Insert count users emailed <prefix><n>@example.com and return their ids.
+
+    Pass a different prefix to create more users in the same database.
+    """
+    from app.extensions import db
+    from app.models.models import User
+
+    users = [
+        {
+            "id": str(uuid.uuid4()),
+            "email": f"{prefix}{i}@example.com",
+            "first_name": "Member",
+            "last_name": str(i),
+            "password_hash": "!",
+        }
+        for i in range(count)
+    ]
+    db.session.execute(User.__table__.insert(), users)
+    return [user["id"] for user in users]
+
+
+def create_household(member_ids, name="Bench"):
+    """
+    Insert a household of the given users and return its id.
+
+    Every user gets the member role; the first one is the household admin.
+    """
+    from app.extensions import db
+    from app.models.models import Household, user_households
+
+    household_id = str(uuid.uuid4())
+    db.session.execute(
+        Household.__table__.insert(),
+        [{"id": household_id, "name": name, "admin_id": member_ids[0]}],
+    )
+    db.session.execute(
+        user_households.insert(),
+        [
+            {"user_id": user_id, "household_id": household_id, "role": "member"}
+            for user_id in member_ids
+        ],
+    )
+    return household_id
+
+
+def seed_household(member_count, name="Bench", prefix="member"):
+    """
+    Insert and commit a household of member_count new users.
+
+    Returns:
+        (household_id, list of member user ids, the admin first)
+    """
+    from app.extensions import db
+
+    member_ids = create_users(member_count, prefix)
+    household_id = create_household(member_ids, name)
+    db.session.commit()
+    return household_id, member_ids
+
+
+class StatementCounter:
+    """
+    Count the SQL statements an engine sends, and time the block.
+
+    With prefixes, only statements starting with one of them are counted,
+    e.g. ("INSERT", "UPDATE") to count writes.
+    """
+
+    def __init__(self, engine, prefixes=None):
+        self.engine = engine
+        self.prefixes = prefixes
+        self.count = 0
+        self.elapsed = 0.0
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        if self.prefixes is None or (
+            statement.lstrip().upper().startswith(self.prefixes)
+        ):
+            self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        self.started = time.perf_counter()
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        self.elapsed = time.perf_counter() - self.started
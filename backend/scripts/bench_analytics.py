@@ -0,0 +1,115 @@
+"""
+Measure GET /households/<id>/analytics latency on a large household.
+
+Seeds a throwaway SQLite database with one household holding --tasks tasks
+(100k by default), then reports median and p95 latency over --runs requests
+with the analytics cache cleared before each, as after any task write, and
+the median of cached requests. Exits non-zero if the uncached p95 exceeds
+--budget-ms.
+
+Usage:
+    python scripts/bench_analytics.py [--tasks 100000] [--runs 20] [--budget-ms 500]
+"""
+
+import argparse
+import os
+import sys
+
+import _common
+
+DB_PATH = _common.configure("analytics.db")
+
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Task
+from app.utils.analytics_utils import analytics_cache
+
+
+def seed(task_count, member_count=12, chunk=10000):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+
+    member_ids = _common.create_users(member_count)
+    household_id = _common.create_household(member_ids, "Large")
+
+    for start in range(0, task_count, chunk):
+        rows = []
+        for _ in range(min(chunk, task_count - start)):
+            created_at = now - timedelta(minutes=rng.randrange(525600))
+            completed = rng.random() < 0.75
+            rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "title": "Chore",
+                    "frequency": "one_time",
+                    "household_id": household_id,
+                    "created_by": member_ids[0],
+                    "assigned_to": rng.choice(member_ids),
+                    "due_date": created_at + timedelta(days=2),
+                    "completed": completed,
+                    "completed_at": (
+                        created_at + timedelta(hours=rng.randrange(72))
+                        if completed
+                        else None
+                    ),
+                    "created_at": created_at,
+                }
+            )
+        db.session.execute(Task.__table__.insert(), rows)
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+
+    return household_id, member_ids[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        print(f"Seeding {args.tasks} tasks...")
+        household_id, user_id = seed(args.tasks)
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+        url = f"/households/{household_id}/analytics"
+
+        timings, cached = [], []
+        for _ in range(args.runs):
+            # Every task write moves the household version, so the next
+            # request misses the cache; time that path
+            analytics_cache.clear()
+            for samples in (timings, cached):
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                samples.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.get_json()
+
+    os.remove(DB_PATH)
+
+    timings.sort()
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(
+        f"analytics over {args.tasks} tasks: "
+        f"uncached median {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms "
+        f"(budget {args.budget_ms:.0f} ms); "
+        f"cached median {statistics.median(cached):.1f} ms"
+    )
+    return 0 if p95 <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
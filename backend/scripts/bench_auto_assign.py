@@ -0,0 +1,95 @@
+"""
+Measure auto-assignment latency as task history grows.
+
+Seeds an in-memory SQLite database with a household of 6 members and grows
+its task history to each of the --sizes totals, then times
+auto_assign_task() for a new task. Assignment reads only the members'
+assignment state, so the p50 should stay flat across sizes.
+
+Usage:
+    python scripts/bench_auto_assign.py [--sizes 1000 10000 100000] [--repeat 200]
+"""
+
+import argparse
+import sys
+
+import _common
+
+_common.configure()
+
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Task, User
+from app.utils.assignment_utils import auto_assign_task, recount_open_tasks
+
+MEMBERS = 6
+
+
+def seed_household():
+    household_id, member_ids = _common.seed_household(MEMBERS)
+    # One member likes cooking, so preferences take part in the choice
+    db.session.execute(
+        User.__table__.update()
+        .where(User.id == member_ids[0])
+        .values(preferences={"likes": ["cooking"]})
+    )
+    db.session.commit()
+    return household_id, member_ids
+
+
+def grow_history(household_id, member_ids, start, stop):
+    created = datetime.utcnow() - timedelta(days=365)
+    db.session.execute(
+        Task.__table__.insert(),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"Chore {n}",
+                "household_id": household_id,
+                "created_by": member_ids[0],
+                "assigned_to": member_ids[n % MEMBERS],
+                # Most of the history is done; every tenth task is still open
+                "completed": n % 10 != 0,
+                "created_at": created + timedelta(seconds=n),
+            }
+            for n in range(start, stop)
+        ],
+    )
+    # Core inserts bypass the flush hook, so count them here
+    recount_open_tasks([household_id])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        household_id, member_ids = seed_household()
+
+        print(f"{'tasks':>8} {'p50':>9}")
+        seeded = 0
+        for size in sorted(args.sizes):
+            grow_history(household_id, member_ids, seeded, size)
+            seeded = size
+
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                auto_assign_task(household_id, "Cook dinner")
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{size:>8} {statistics.median(timings):>7.3f}ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Compare bulk task endpoints with one request per task.
+
+Seeds an in-memory SQLite database with a household of 4 members, then
+creates --count tasks and completes them, once with one request per task
+(POST /households/<id>/tasks, PATCH /tasks/<id>/complete) and once with
+the bulk endpoints (POST and PATCH /households/<id>/tasks/bulk). Prints
+the wall time and number of SQL statements of each.
+
+Usage:
+    python scripts/bench_bulk_tasks.py [--count 1000]
+"""
+
+import argparse
+import sys
+
+import _common
+
+_common.configure()
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+
+
+def report(name, counter):
+    print(f"{name:22} {counter.elapsed * 1000:>9.0f}ms {counter.count:>8} statements")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        household_id, member_ids = _common.seed_household(4, "Benchmark")
+        user_id = member_ids[0]
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+        items = [
+            {"title": f"Chore {n}", "preferred_assignee": user_id}
+            for n in range(args.count)
+        ]
+
+        with _common.StatementCounter(db.engine) as counter:
+            task_ids = []
+            for item in items:
+                response = client.post(
+                    f"/households/{household_id}/tasks", headers=headers, json=item
+                )
+                assert response.status_code == 201, response.get_json()
+                task_ids.append(response.get_json()["task_id"])
+        report("create, per task", counter)
+
+        with _common.StatementCounter(db.engine) as counter:
+            for task_id in task_ids:
+                response = client.patch(f"/tasks/{task_id}/complete", headers=headers)
+                assert response.status_code == 200, response.get_json()
+        report("complete, per task", counter)
+
+        with _common.StatementCounter(db.engine) as counter:
+            response = client.post(
+                f"/households/{household_id}/tasks/bulk",
+                headers=headers,
+                json={"tasks": items},
+            )
+        assert response.get_json()["created"] == args.count, response.get_json()
+        report("create, bulk", counter)
+
+        task_ids = [result["task_id"] for result in response.get_json()["results"]]
+        with _common.StatementCounter(db.engine) as counter:
+            response = client.patch(
+                f"/households/{household_id}/tasks/bulk",
+                headers=headers,
+                json={
+                    "tasks": [
+                        {"id": task_id, "completed": True} for task_id in task_ids
+                    ]
+                },
+            )
+        assert response.get_json()["completed"] == args.count, response.get_json()
+        report("complete, bulk", counter)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Measure chat message throughput with and without group commit.
+
+Seeds a throwaway SQLite database with one household, then runs 1, 8, 32
+and 128 concurrent senders (override with --senders) as greenlets, the way
+the gevent server runs socket handlers. Each sender writes --messages chat
+messages through store_message(), either committing each one (the previous
+write path) or through group_commit.submit(). Reports messages per second
+and the average number of messages per commit.
+
+Usage:
+    python scripts/bench_chat_group_commit.py [--senders 1 8 32 128]
+        [--messages 20] [--delay-ms 5] [--max-batch 50] [--wait-threshold 16]
+"""
+
+import argparse
+import os
+import sys
+
+import _common
+
+DB_PATH = _common.configure("chat.db")
+
+import time
+
+import gevent
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.models import User
+from app.routes.chat_routes import store_message
+from app.utils.db_utils import group_commit
+
+
+def seed(sender_count):
+    household_id, sender_ids = _common.seed_household(
+        sender_count, prefix=f"sender{sender_count}."
+    )
+    senders = User.query.filter(User.id.in_(sender_ids)).all()
+    return household_id, [{"id": u.id, "email": u.email} for u in senders]
+
+
+def send_per_commit(*args):
+    store_message(*args)
+    db.session.commit()
+
+
+def send_group_commit(*args):
+    group_commit.submit(store_message, *args)
+
+
+def run(app, send, household_id, users, messages):
+    def sender(user):
+        with app.app_context():
+            for n in range(messages):
+                send(household_id, user["id"], user["email"], f"Message {n}", False)
+
+    started = time.perf_counter()
+    gevent.joinall([gevent.spawn(sender, user) for user in users], raise_error=True)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--senders", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=5)
+    parser.add_argument("--max-batch", type=int, default=50)
+    parser.add_argument("--wait-threshold", type=int, default=16)
+    args = parser.parse_args()
+
+    app = create_app()
+    group_commit.max_delay = args.delay_ms / 1000
+    group_commit.max_batch = args.max_batch
+    group_commit.wait_threshold = args.wait_threshold
+
+    commits = 0
+
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    with app.app_context():
+        event.listen(db.engine, "commit", count_commit)
+        print(
+            f"{'senders':>8} {'per-commit':>12} {'group':>12} "
+            f"{'speedup':>8} {'msgs/commit':>12}"
+        )
+        for sender_count in args.senders:
+            household_id, users = seed(sender_count)
+            total = sender_count * args.messages
+            run(app, send_per_commit, household_id, users, 1)  # Warm caches
+
+            per_commit = run(app, send_per_commit, household_id, users, args.messages)
+            commits = 0
+            grouped = run(app, send_group_commit, household_id, users, args.messages)
+
+            print(
+                f"{sender_count:>8} "
+                f"{total / per_commit:>10.0f}/s {total / grouped:>10.0f}/s "
+                f"{per_commit / grouped:>7.1f}x {total / commits:>12.1f}"
+            )
+
+    os.remove(DB_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
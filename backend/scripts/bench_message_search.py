@@ -0,0 +1,137 @@
+"""
+Measure chat search latency as message history grows.
+
+Seeds a throwaway SQLite database with 20 households and grows their chat
+history, written with a Zipf-distributed vocabulary, to each of the --sizes
+totals. Messages are inserted into the messages table, so the FTS5 triggers
+index them as the app would. At every size it times
+GET /households/<id>/messages/search for common and rare words and compares
+the p50 against a LIKE scan that reads the same number of newest matching
+messages from the household.
+
+Usage:
+    python scripts/bench_message_search.py [--sizes 10000 100000 500000]
+        [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+
+import _common
+
+DB_PATH = _common.configure("search.db")
+
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Message
+
+HOUSEHOLDS = 20
+# Everyday words followed by a long tail, drawn with Zipf frequencies
+WORDS = (
+    "milk eggs bread trash dishes laundry rent groceries vacuum plants dog "
+    "walk dinner lunch fridge bathroom kitchen recycling bills keys car "
+    "party weekend tonight tomorrow please thanks sorry done cleaned bought"
+).split() + [f"word{n}" for n in range(5000)]
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+QUERIES = ("milk", "trash tonight", "dog walk weekend", "word50", "word3000")
+
+
+def seed_households():
+    (user_id,) = _common.create_users(1, "searcher")
+    households = [_common.create_household([user_id]) for _ in range(HOUSEHOLDS)]
+    db.session.commit()
+    return user_id, households
+
+
+def grow_history(user_id, households, start, stop, rng):
+    started = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for n in range(start, stop):
+        batch.append(
+            {
+                "id": str(uuid.uuid4()),
+                "content": " ".join(rng.choices(WORDS, WEIGHTS, k=rng.randint(3, 15))),
+                "household_id": households[n % HOUSEHOLDS],
+                "user_id": user_id,
+                "created_at": started + timedelta(seconds=n),
+                "seq": n // HOUSEHOLDS + 1,
+            }
+        )
+        if len(batch) == 10000:
+            db.session.execute(Message.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Message.__table__.insert(), batch)
+    db.session.commit()
+
+
+def p50_ms(call, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    rng = random.Random(42)
+
+    with app.app_context():
+        user_id, households = seed_households()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+        household_id = households[0]
+        window = app.config["MESSAGE_SEARCH_WINDOW"]
+
+        print(f"{'messages':>9} {'query':>18} {'search p50':>11} {'LIKE p50':>10}")
+        seeded = 0
+        for size in sorted(args.sizes):
+            grow_history(user_id, households, seeded, size, rng)
+            seeded = size
+
+            for query in QUERIES:
+                url = f"/households/{household_id}/messages/search?q={query}"
+
+                def search():
+                    response = client.get(url, headers=headers)
+                    assert response.status_code == 200, response.get_json()
+
+                def like_scan():
+                    scan = db.select(Message.id).where(
+                        Message.household_id == household_id
+                    )
+                    for word in query.split():
+                        scan = scan.where(Message.content.like(f"%{word}%"))
+                    db.session.execute(
+                        scan.order_by(Message.created_at.desc()).limit(window)
+                    ).all()
+
+                search()  # Warm caches
+                print(
+                    f"{size:>9} {query:>18} "
+                    f"{p50_ms(search, args.repeat):>9.2f}ms "
+                    f"{p50_ms(like_scan, args.repeat):>8.2f}ms"
+                )
+
+    os.remove(DB_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
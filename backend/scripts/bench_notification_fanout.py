@@ -0,0 +1,102 @@
+"""
+Measure notification fan-out throughput for households of different sizes.
+
+Seeds a throwaway SQLite database with households of 10, 100 and 1,000
+members (override with --sizes), then times notifying every member once
+per run with fan_out_notification() against the previous pattern of adding
+one ORM Notification per member. Each run includes its commit.
+
+Usage:
+    python scripts/bench_notification_fanout.py [--sizes 10 100 1000] [--runs 20]
+"""
+
+import argparse
+import os
+import sys
+
+import _common
+
+DB_PATH = _common.configure("fanout.db")
+
+import statistics
+import time
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Household, Notification
+from app.utils.notification_utils import fan_out_notification
+
+
+def seed(member_count):
+    household_id, member_ids = _common.seed_household(
+        member_count, prefix=f"member{member_count}."
+    )
+    return household_id, member_ids[0]
+
+
+def notify_per_row(household_id, sender_id):
+    """The previous pattern: one ORM object per member"""
+    household = Household.query.get(household_id)
+    for member in household.members:
+        if member.id != sender_id:
+            db.session.add(
+                Notification(
+                    type="bench",
+                    content="Benchmark notification",
+                    user_id=member.id,
+                    household_id=household_id,
+                )
+            )
+    db.session.commit()
+
+
+def notify_bulk(household_id, sender_id):
+    fan_out_notification(
+        household_id,
+        "bench",
+        "Benchmark notification",
+        exclude_user_ids=[sender_id],
+    )
+    db.session.commit()
+
+
+def measure(notify, household_id, sender_id, runs):
+    timings = []
+    for _ in range(runs):
+        db.session.expire_all()
+        started = time.perf_counter()
+        notify(household_id, sender_id)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        print(f"{'members':>8} {'per-row':>20} {'bulk':>20} {'speedup':>8}")
+        for size in args.sizes:
+            household_id, sender_id = seed(size)
+            recipients = size - 1
+
+            per_row = measure(notify_per_row, household_id, sender_id, args.runs)
+            bulk = measure(notify_bulk, household_id, sender_id, args.runs)
+
+            print(
+                f"{size:>8} "
+                f"{per_row * 1000:>8.2f} ms {recipients / per_row:>7.0f}/s "
+                f"{bulk * 1000:>8.2f} ms {recipients / bulk:>7.0f}/s "
+                f"{per_row / bulk:>7.1f}x"
+            )
+
+    os.remove(DB_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Measure Socket.IO fan-out across worker processes sharing a message queue.
+
+Starts the local broker and 1, 2, 4 and 8 worker processes (override with
+--workers), each serving the app on its own port against one throwaway
+SQLite database. Clients are spread round-robin over the workers and join
+the same household room. Polls are created over REST on the workers in
+turn, so every new_poll event has to cross the broker to reach clients on
+the other workers. Reports the median time from the request until the last
+client has the event, and deliveries per second for a burst of polls.
+
+Clients use the long-polling transport, so absolute latencies include
+polling overhead; compare the rows against each other.
+
+Usage:
+    python scripts/bench_socketio_workers.py [--workers 1 2 4 8] [--clients 16]
+        [--messages 20] [--burst 50]
+"""
+
+import argparse
+import os
+import sys
+
+import _common
+
+# Workers are started from this file too and share the first run's database
+DB_PATH = _common.configure("socketio.db", os.environ.get("BENCH_SOCKETIO_DB"))
+os.environ["BENCH_SOCKETIO_DB"] = DB_PATH
+
+import socket
+import statistics
+import subprocess
+import threading
+import time
+
+import requests
+import socketio as socketio_client
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_broker(port):
+    from app.utils.message_queue_utils import run_local_broker
+
+    run_local_broker("127.0.0.1", port)
+
+
+def serve_worker(port):
+    from app import create_app
+    from app.extensions import socketio
+
+    app = create_app()
+    socketio.run(app, host="127.0.0.1", port=port)
+
+
+def seed(client_count):
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        household_id, user_ids = _common.seed_household(client_count, prefix="client")
+        tokens = [create_access_token(identity=user_id) for user_id in user_ids]
+
+    return household_id, tokens
+
+
+def spawn(mode, port, env):
+    return subprocess.Popen(
+        [sys.executable, __file__, f"--{mode}", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port}")
+
+
+class Deliveries:
+    """Records when each client receives each poll"""
+
+    def __init__(self, client_count):
+        self.client_count = client_count
+        self.lock = threading.Lock()
+        self.received = {}  # question -> [perf_counter timestamps]
+        self.complete = {}  # question -> Event
+
+    def expect(self, question):
+        with self.lock:
+            self.received.setdefault(question, [])
+            return self.complete.setdefault(question, threading.Event())
+
+    def record(self, question):
+        now = time.perf_counter()
+        with self.lock:
+            times = self.received.setdefault(question, [])
+            times.append(now)
+            event = self.complete.setdefault(question, threading.Event())
+            if len(times) == self.client_count:
+                event.set()
+
+    def last(self, question):
+        with self.lock:
+            return max(self.received[question])
+
+
+def connect_clients(ports, household_id, tokens, deliveries):
+    clients = []
+    for i, token in enumerate(tokens):
+        client = socketio_client.Client(reconnection=False)
+        client.on("new_poll", lambda data: deliveries.record(data["question"]))
+        client.connect(
+            f"http://127.0.0.1:{ports[i % len(ports)]}",
+            auth={"token": token},
+            transports=["polling"],
+            wait_timeout=30,
+        )
+        client.emit("join_household", {"household_id": household_id})
+        clients.append(client)
+    return clients
+
+
+def create_poll(port, household_id, token, question):
+    response = requests.post(
+        f"http://127.0.0.1:{port}/households/{household_id}/polls",
+        json={"question": question, "options": ["yes", "no"]},
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=30,
+    )
+    response.raise_for_status()
+
+
+def run(worker_count, args, household_id, tokens):
+    broker_port = free_port()
+    ports = [free_port() for _ in range(worker_count)]
+    env = dict(
+        os.environ,
+        SOCKETIO_MESSAGE_QUEUE=f"local://127.0.0.1:{broker_port}",
+    )
+
+    processes = [spawn("broker", broker_port, env)]
+    clients = []
+    try:
+        wait_for_port(broker_port)
+        processes += [spawn("worker", port, env) for port in ports]
+        for port in ports:
+            wait_for_port(port)
+
+        deliveries = Deliveries(len(tokens))
+        clients = connect_clients(ports, household_id, tokens, deliveries)
+
+        # Retry until every client has joined the room on its worker
+        for attempt in range(50):
+            question = f"warmup-{attempt}"
+            done = deliveries.expect(question)
+            create_poll(ports[0], household_id, tokens[0], question)
+            if done.wait(1):
+                break
+        else:
+            raise RuntimeError("Clients never received the warm-up poll")
+
+        latencies = []
+        for n in range(args.messages):
+            question = f"latency-{n}"
+            done = deliveries.expect(question)
+            started = time.perf_counter()
+            create_poll(ports[n % worker_count], household_id, tokens[0], question)
+            if not done.wait(30):
+                raise RuntimeError(f"{question} was not delivered to every client")
+            latencies.append(deliveries.last(question) - started)
+
+        questions = [f"burst-{n}" for n in range(args.burst)]
+        events = [deliveries.expect(question) for question in questions]
+        started = time.perf_counter()
+        for n, question in enumerate(questions):
+            create_poll(ports[n % worker_count], household_id, tokens[0], question)
+        for event in events:
+            if not event.wait(60):
+                raise RuntimeError("Burst was not delivered to every client")
+        elapsed = max(deliveries.last(q) for q in questions) - started
+
+        return statistics.median(latencies), args.burst * len(tokens) / elapsed
+    finally:
+        for client in clients:
+            client.disconnect()
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--broker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.broker:
+        serve_broker(args.broker)
+        return 0
+    if args.worker:
+        serve_worker(args.worker)
+        return 0
+
+    household_id, tokens = seed(args.clients)
+
+    print(f"{'workers':>8} {'fan-out p50':>12} {'deliveries/s':>13}")
+    for worker_count in args.workers:
+        latency, rate = run(worker_count, args, household_id, tokens)
+        print(f"{worker_count:>8} {latency * 1000:>9.1f} ms {rate:>13.0f}")
+
+    os.remove(DB_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Check that bulk task requests report bad items without failing the batch.
+
+Seeds an in-memory SQLite database with a household of 2 members and sends
+POST and PATCH /households/<id>/tasks/bulk with valid items mixed with
+malformed ones (wrong types, unparseable dates, missing fields). Prints
+the code of every item and exits non-zero unless each request returns
+200, the valid items are written and every bad item gets a 4xx result.
+
+Usage:
+    python scripts/check_bulk_tasks.py
+"""
+
+import sys
+
+import _common
+
+_common.configure()
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Task
+
+# (item, expected code)
+CREATE_ITEMS = [
+    ({"title": "Dishes"}, 201),
+    ({"title": "Trash", "due_date": 5}, 400),
+    ({"title": "Laundry", "due_date": "next tuesday"}, 400),
+    ({"title": "Plants", "due_date": "2030-01-01T09:00:00"}, 201),
+    (
+        {
+            "title": "Bins",
+            "is_recurring": True,
+            "interval_days": 7,
+            "end_date": 20300101,
+        },
+        400,
+    ),
+    ({"title": "Vacuum", "frequency": {"weekly": True}}, 400),
+    ({"title": "Mop", "preferred_assignee": ["someone"]}, 400),
+    ({"title": ""}, 400),
+    ({"due_date": "2030-01-01"}, 400),
+    ("Dust", 400),
+    ({"title": "Groceries", "is_recurring": True, "interval_days": 7}, 201),
+]
+
+
+def check(name, response, expected):
+    body = response.get_json()
+    if response.status_code != 200:
+        print(f"{name}: HTTP {response.status_code} {body}")
+        return False
+
+    codes = [result["code"] for result in body["results"]]
+    for (item, want), code in zip(expected, codes):
+        print(f"{name:6} {code} (want {want}) {item!r}")
+    return codes == [want for _, want in expected]
+
+
+def main():
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        household_id, member_ids = _common.seed_household(2, "Check")
+        token = create_access_token(identity=member_ids[0])
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"/households/{household_id}/tasks/bulk"
+
+        response = client.post(
+            url, headers=headers, json={"tasks": [item for item, _ in CREATE_ITEMS]}
+        )
+        ok = check("create", response, CREATE_ITEMS)
+        created = [
+            result["task_id"]
+            for result in response.get_json().get("results", [])
+            if result["code"] == 201
+        ]
+        ok = ok and Task.query.count() == len(created)
+
+        update_items = [
+            ({"id": created[0], "title": "Dishes and pans"}, 200),
+            ({"id": created[1], "due_date": 5}, 400),
+            ({"id": created[1], "assigned_to": ["someone"]}, 400),
+            ({"id": ["not", "an", "id"]}, 400),
+            ({"id": "missing"}, 404),
+            ({"id": created[2], "completed": "yes"}, 400),
+        ]
+        response = client.patch(
+            url, headers=headers, json={"tasks": [item for item, _ in update_items]}
+        )
+        ok = check("update", response, update_items) and ok
+        ok = ok and db.session.get(Task, created[0]).title == "Dishes and pans"
+
+    print("ok" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Print SQLite query plans for the hot route queries, with and without the
+secondary indexes declared in app/models/models.py.
+
+Seeds a throwaway SQLite database, drops every ix_* index, prints
+EXPLAIN QUERY PLAN for each query, then recreates the indexes, runs ANALYZE
+and prints the plans again.
+
+Usage:
+    python scripts/explain_hot_queries.py [--tasks 20000]
+"""
+
+import argparse
+import os
+
+import _common
+
+DB_PATH = _common.configure("explain.db")
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, text
+
+from app import create_app
+from app.extensions import db
+from app.models.models import (
+    Event,
+    Message,
+    Notification,
+    Poll,
+    Task,
+    Vote,
+    user_households,
+)
+
+
+def seed(households=10, members_per_household=8, tasks=20000):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    members = [
+        _common.create_users(members_per_household, f"house{h}.member")
+        for h in range(households)
+    ]
+    household_ids = [
+        _common.create_household(members[h], f"House {h}") for h in range(households)
+    ]
+
+    def member_of(household_index):
+        return members[household_index][rng.randrange(members_per_household)]
+
+    task_rows, message_rows, notification_rows, event_rows = [], [], [], []
+    for i in range(tasks):
+        h = rng.randrange(households)
+        completed = rng.random() < 0.7
+        created_at = now - timedelta(days=rng.randrange(365))
+        task_rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"Task {i}",
+                "frequency": "one_time",
+                "household_id": household_ids[h],
+                "created_by": member_of(h),
+                "assigned_to": member_of(h),
+                "due_date": created_at + timedelta(days=3),
+                "completed": completed,
+                "completed_at": (
+                    created_at + timedelta(hours=rng.randrange(96))
+                    if completed
+                    else None
+                ),
+                "created_at": created_at,
+            }
+        )
+        message_rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "content": f"Message {i}",
+                "household_id": household_ids[h],
+                "user_id": member_of(h),
+                "created_at": created_at,
+            }
+        )
+        notification_rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "type": "new_message",
+                "content": f"Notification {i}",
+                "is_read": rng.random() < 0.8,
+                "user_id": member_of(h),
+                "household_id": household_ids[h],
+                "created_at": created_at,
+            }
+        )
+        if i % 10 == 0:
+            event_rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "title": f"Event {i}",
+                    "start_time": created_at,
+                    "end_time": created_at + timedelta(hours=1),
+                    "privacy": "public",
+                    "household_id": household_ids[h],
+                    "user_id": member_of(h),
+                    "created_at": created_at,
+                }
+            )
+
+    db.session.execute(Task.__table__.insert(), task_rows)
+    db.session.execute(Message.__table__.insert(), message_rows)
+    db.session.execute(Notification.__table__.insert(), notification_rows)
+    db.session.execute(Event.__table__.insert(), event_rows)
+    db.session.commit()
+
+    return household_ids[0], members[0][0]
+
+
+def hot_queries(household_id, user_id):
+    now = datetime.utcnow()
+    return {
+        "household tasks (pending)": db.select(Task.id)
+        .where(Task.household_id == household_id, Task.completed == False)
+        .limit(10),
+        "overdue tasks": db.select(func.count())
+        .select_from(Task)
+        .where(
+            Task.household_id == household_id,
+            Task.completed == False,
+            Task.due_date < now,
+        ),
+        "streak history": db.select(Task.completed_at)
+        .where(Task.assigned_to == user_id, Task.completed == True)
+        .order_by(Task.completed_at.desc()),
+        "household members": db.select(user_households.c.user_id).where(
+            user_households.c.household_id == household_id
+        ),
+        "chat history (cursor)": db.select(Message.id)
+        .where(
+            Message.household_id == household_id,
+            or_(
+                Message.created_at < now,
+                and_(Message.created_at == now, Message.id < "ffff"),
+            ),
+        )
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(51),
+        "unread notifications": db.select(func.count())
+        .select_from(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False),
+        "notification feed": db.select(Notification.id)
+        .where(Notification.user_id == user_id)
+        .order_by(Notification.created_at.desc())
+        .limit(20),
+        "household events": db.select(Event.id)
+        .where(Event.household_id == household_id, Event.start_time <= now)
+        .order_by(Event.start_time.asc()),
+        "household polls": db.select(Poll.id)
+        .where(Poll.household_id == household_id)
+        .order_by(Poll.created_at.desc())
+        .limit(10),
+        "user votes": db.select(Vote.poll_id, Vote.selected_option).where(
+            Vote.user_id == user_id
+        ),
+    }
+
+
+def print_plans(title, queries):
+    print(f"\n=== {title} ===")
+    for name, statement in queries.items():
+        sql = str(
+            statement.compile(
+                dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+            )
+        )
+        plan = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        print(f"\n{name}:")
+        for row in plan:
+            print(f"  {row[-1]}")
+
+
+def secondary_indexes():
+    return [
+        index
+        for table in db.metadata.sorted_tables
+        for index in table.indexes
+        if index.name and index.name.startswith("ix_")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        household_id, user_id = seed(tasks=args.tasks)
+        queries = hot_queries(household_id, user_id)
+
+        for index in secondary_indexes():
+            index.drop(db.engine, checkfirst=True)
+        db.session.execute(text("ANALYZE"))
+        print_plans("before (primary keys only)", queries)
+
+        for index in secondary_indexes():
+            index.create(db.engine, checkfirst=True)
+        db.session.execute(text("ANALYZE"))
+        print_plans("after (composite indexes)", queries)
+
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Count the SQL statements each scheduled job issues per run.
+
+Seeds an in-memory SQLite database with --households households of 4
+members, each with a daily recurring task, an overdue task and an expired
+poll, then runs every job once through the scheduler and counts the
+statements it sends. Repeats at each --households size and exits non-zero
+if a job's statement count grows with the number of households, i.e. if
+any job works row by row.
+
+Usage:
+    python scripts/job_statement_counts.py [--households 10 100 1000]
+"""
+
+import argparse
+import sys
+
+import _common
+
+_common.configure()
+
+import uuid
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Poll, RecurringTaskRule, ScheduledJob, Task
+from app.utils.scheduler_utils import scheduler
+
+MEMBERS = 4
+
+
+def seed(count):
+    now = datetime.utcnow()
+    tasks, rules, polls = [], [], []
+    for h in range(count):
+        member_ids = _common.create_users(MEMBERS, f"member{h}.")
+        household_id = _common.create_household(member_ids)
+
+        parent_id = str(uuid.uuid4())
+        common = {"household_id": household_id, "created_by": member_ids[0]}
+        tasks.append(
+            {
+                "id": parent_id,
+                "title": "Dishes",
+                "due_date": now - timedelta(days=2),
+                "is_recurring": True,
+                "assigned_to": member_ids[0],
+                **common,
+            }
+        )
+        tasks.append(
+            {
+                "id": str(uuid.uuid4()),
+                "title": "Fix the sink",
+                "due_date": now - timedelta(seconds=1),
+                "assigned_to": member_ids[1],
+                **common,
+            }
+        )
+        rules.append(
+            {
+                "id": str(uuid.uuid4()),
+                "task_id": parent_id,
+                "interval_days": 1,
+                "anchor_date": now - timedelta(days=2),
+                "next_due_at": now - timedelta(days=1),
+            }
+        )
+        polls.append(
+            {
+                "id": str(uuid.uuid4()),
+                "question": "Pizza?",
+                "options": {"yes": 0, "no": 0},
+                "expires_at": now - timedelta(seconds=1),
+                **common,
+            }
+        )
+
+    for table, rows in (
+        (Task.__table__, tasks),
+        (RecurringTaskRule.__table__, rules),
+        (Poll.__table__, polls),
+    ):
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--households", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    app = create_app()
+    counts = {}
+    print(f"{'households':>10} {'job':>24} {'rows':>6} {'statements':>11}")
+    for size in sorted(args.households):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed(size)
+            # Let every job's window cover the seeded rows
+            db.session.execute(
+                ScheduledJob.__table__.insert(),
+                [
+                    {"name": name, "last_run_at": datetime.utcnow() - timedelta(days=1)}
+                    for name in scheduler.jobs
+                ],
+            )
+            db.session.commit()
+
+            for name in scheduler.jobs:
+                with _common.StatementCounter(db.engine) as counter:
+                    rows = scheduler.run_job(name, force=True)
+                counts.setdefault(name, []).append(counter.count)
+                print(f"{size:>10} {name:>24} {rows:>6} {counter.count:>11}")
+
+    return 0 if all(len(set(seen)) == 1 for seen in counts.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Report queries and payload size of chat history pages.
+
+Seeds an in-memory SQLite database with a household of 6 members who
+exchanged 500 messages, then requests GET /households/<id>/messages in
+cursor and page mode, with the full and the compact (?compact=true)
+response shapes, for pages of 50 and 200 messages. Exits non-zero if the
+number of queries grows with the page size.
+
+Usage:
+    python scripts/message_history_payload.py
+"""
+
+import sys
+
+import _common
+
+_common.configure()
+
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Message
+
+PAGE_SIZES = (50, 200)
+
+
+def seed(member_count=6, message_count=500):
+    member_ids = _common.create_users(member_count)
+    household_id = _common.create_household(member_ids, "Benchmark")
+
+    started = datetime.utcnow() - timedelta(days=1)
+    for i in range(message_count):
+        db.session.add(
+            Message(
+                content=f"Message {i} about the chores",
+                household_id=household_id,
+                user_id=member_ids[i % member_count],
+                created_at=started + timedelta(seconds=i),
+            )
+        )
+    db.session.commit()
+
+    return household_id, member_ids[0]
+
+
+def main():
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        household_id, user_id = seed()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+        base = f"/households/{household_id}/messages"
+        variants = {
+            "cursor": f"{base}?cursor=&per_page={{size}}",
+            "cursor compact": f"{base}?cursor=&per_page={{size}}&compact=true",
+            "page": f"{base}?per_page={{size}}",
+            "page compact": f"{base}?per_page={{size}}&compact=true",
+        }
+
+        # Warm the membership cache so every measured request does the same work
+        client.get(variants["cursor"].format(size=1), headers=headers)
+
+        failed = False
+        for name, url in variants.items():
+            counts = {}
+            sizes = {}
+            for size in PAGE_SIZES:
+                db.session.expunge_all()
+                with _common.StatementCounter(db.engine) as counter:
+                    response = client.get(url.format(size=size), headers=headers)
+                assert response.status_code == 200, response.get_json()
+                counts[size] = counter.count
+                sizes[size] = len(response.data)
+
+            stable = len(set(counts.values())) == 1
+            failed = failed or not stable
+            print(
+                f"{name:15} "
+                + "  ".join(
+                    f"per_page={s}: {counts[s]} queries {sizes[s] / 1024:6.1f} KiB"
+                    for s in PAGE_SIZES
+                )
+                + ("" if stable else "  <-- grows with page size")
+            )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Count the writes it takes to create recurring tasks.
+
+Seeds an in-memory SQLite database with a household of 4 members, then
+creates a daily, a weekly and a one-off task through
+POST /households/<id>/tasks and counts the INSERT and UPDATE statements of
+each request. Also lists the next 180 days of occurrences through
+GET /households/<id>/tasks/occurrences to show they exist without rows.
+Exits non-zero if a recurring task costs more writes than a one-off task
+plus inserting its rule and bumping the household version once more.
+
+Usage:
+    python scripts/recurring_task_writes.py
+"""
+
+import sys
+
+import _common
+
+_common.configure()
+
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Task
+
+
+def main():
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        household_id, member_ids = _common.seed_household(4, "Benchmark")
+        token = create_access_token(identity=member_ids[0])
+        headers = {"Authorization": f"Bearer {token}"}
+        due_date = (datetime.utcnow() + timedelta(days=2)).isoformat()
+        variants = {
+            "one-off": {"title": "Fix the sink"},
+            "daily": {"title": "Dishes", "is_recurring": True, "interval_days": 1},
+            "weekly": {"title": "Trash", "is_recurring": True, "interval_days": 7},
+        }
+
+        writes = {}
+        for name, body in variants.items():
+            with _common.StatementCounter(
+                db.engine, prefixes=("INSERT", "UPDATE")
+            ) as counter:
+                response = client.post(
+                    f"/households/{household_id}/tasks",
+                    headers=headers,
+                    json={**body, "due_date": due_date},
+                )
+            assert response.status_code == 201, response.get_json()
+            writes[name] = counter.count
+            print(f"{name:8} {counter.count} writes")
+
+        start = datetime.utcnow()
+        response = client.get(
+            f"/households/{household_id}/tasks/occurrences"
+            f"?start={start.isoformat()}"
+            f"&end={(start + timedelta(days=180)).isoformat()}",
+            headers=headers,
+        )
+        assert response.status_code == 200, response.get_json()
+        listed = response.get_json()["tasks"]
+        print(
+            f"next 180 days: {len(listed)} occurrences, "
+            f"{sum(task['is_virtual'] for task in listed)} virtual, "
+            f"{Task.query.count()} task rows"
+        )
+
+    # The rule is the only extra row a recurring task needs
+    return 0 if writes["daily"] <= writes["one-off"] + 2 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
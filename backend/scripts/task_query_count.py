@@ -0,0 +1,87 @@
+"""
+Verify that the task list endpoints run a fixed number of queries.
+
+Seeds an in-memory SQLite database with tasks spread across many assignees,
+then counts the SQL statements issued by GET /households/<id>/tasks and
+GET /users/<id>/tasks for several page sizes. Exits non-zero if the count
+grows with the page size.
+
+Usage:
+    python scripts/task_query_count.py
+"""
+
+import sys
+
+import _common
+
+_common.configure()
+
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.models.models import Task
+
+PAGE_SIZES = (5, 25, 100)
+
+
+def seed(member_count=20, task_count=200):
+    member_ids = _common.create_users(member_count)
+    household_id = _common.create_household(member_ids, "Benchmark")
+
+    now = datetime.utcnow()
+    for i in range(task_count):
+        db.session.add(
+            Task(
+                title=f"Task {i}",
+                frequency="one_time",
+                household_id=household_id,
+                created_by=member_ids[0],
+                assigned_to=member_ids[i % member_count],
+                due_date=now + timedelta(days=i % 7 - 3),
+            )
+        )
+    db.session.commit()
+
+    return household_id, member_ids[0]
+
+
+def main():
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        household_id, user_id = seed()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+        endpoints = {
+            "household tasks": f"/households/{household_id}/tasks?per_page={{size}}",
+            "user tasks": f"/users/{user_id}/tasks?per_page={{size}}",
+        }
+
+        failed = False
+        for name, url in endpoints.items():
+            # Warm the membership cache so every measured request does the same work
+            client.get(url.format(size=1), headers=headers)
+
+            counts = {}
+            for size in PAGE_SIZES:
+                with _common.StatementCounter(db.engine) as counter:
+                    response = client.get(url.format(size=size), headers=headers)
+                assert response.status_code == 200, response.get_json()
+                counts[size] = counter.count
+
+            stable = len(set(counts.values())) == 1
+            failed = failed or not stable
+            print(
+                f"{name:16} "
+                + "  ".join(f"per_page={s}: {c} queries" for s, c in counts.items())
+                + ("" if stable else "  <-- grows with page size")
+            )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())